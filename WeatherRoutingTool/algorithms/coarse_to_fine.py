@@ -0,0 +1,113 @@
+import copy
+import logging
+import os
+
+import numpy as np
+
+import WeatherRoutingTool.utils.formatting as form
+from WeatherRoutingTool.algorithms.isofuel import IsoFuel
+from WeatherRoutingTool.algorithms.routingalg import RoutingAlg
+from WeatherRoutingTool.constraints.constraints import ConstraintsList, RouteCorridor
+from WeatherRoutingTool.routeparams import RouteParams
+from WeatherRoutingTool.ship.ship import Boat
+from WeatherRoutingTool.weather import WeatherCond
+
+logger = logging.getLogger('WRT.CoarseToFine')
+
+
+class CoarseToFineIsoFuel(RoutingAlg):
+    """
+    Two-pass isofuel routing. A coarse pass with few courses and a large amount of fuel per routing step provides a
+    first guess of the route. The refined pass runs with the configured resolution but is restricted to a corridor
+    around the result of the coarse pass. Both passes are performed by IsoFuel; the corridor is added as RouteCorridor
+    constraint to the constraints list.
+    """
+
+    coarse_alg: IsoFuel  # routing algorithm for the coarse pass
+    fine_alg: IsoFuel  # routing algorithm for the refined pass
+    corridor_half_width: float  # half width of the corridor around the coarse route (m)
+
+    def __init__(self, config):
+        super().__init__(config)
+        self.corridor_half_width = config.ISOCHRONE_COARSE_CORRIDOR_WIDTH / 2
+        self.coarse_alg = IsoFuel(self.get_coarse_config(config))
+        self.fine_alg = IsoFuel(config)
+
+    @staticmethod
+    def get_coarse_config(config):
+        """
+        Return a copy of the config for the coarse pass. The number of courses is reduced to
+        ISOCHRONE_COARSE_HDGS_SEGMENTS whereby the angular range of the courses is kept, and the amount of fuel per
+        routing step is increased by ISOCHRONE_COARSE_DELTA_FUEL_FACTOR. Checkpoints are neither written nor read by the
+        coarse pass.
+        """
+        coarse_config = copy.copy(config)
+        fan_width = config.ROUTER_HDGS_SEGMENTS * config.ROUTER_HDGS_INCREMENTS_DEG
+        coarse_config.ROUTER_HDGS_SEGMENTS = config.ISOCHRONE_COARSE_HDGS_SEGMENTS
+        coarse_config.ROUTER_HDGS_INCREMENTS_DEG = fan_width / config.ISOCHRONE_COARSE_HDGS_SEGMENTS
+        coarse_config.ROUTER_HDGS_SEGMENTS_MIN = min(config.ROUTER_HDGS_SEGMENTS_MIN,
+                                                     config.ISOCHRONE_COARSE_HDGS_SEGMENTS)
+        coarse_config.ROUTER_HDGS_INCREMENTS_DEG_MIN = min(config.ROUTER_HDGS_INCREMENTS_DEG_MIN,
+                                                           coarse_config.ROUTER_HDGS_INCREMENTS_DEG)
+        coarse_config.DELTA_FUEL = config.DELTA_FUEL * config.ISOCHRONE_COARSE_DELTA_FUEL_FACTOR
+        coarse_config.ISOCHRONE_NUMBER_OF_ROUTES = 1
+        # checkpoints only apply to the refined pass as both passes would use the same file names
+        coarse_config.ISOCHRONE_CHECKPOINT_STEPS = 0
+        coarse_config.ISOCHRONE_RESUME_FILE = None
+        return coarse_config
+
+    def print_init(self):
+        RoutingAlg.print_init(self)
+        logger.info(form.get_log_step('coarse-to-fine routing, corridor half width: ' +
+                                      str(self.corridor_half_width / 1000) + ' km', 1))
+        logger.info(form.get_log_step('coarse pass:', 1))
+        self.coarse_alg.print_init()
+        logger.info(form.get_log_step('refined pass:', 1))
+        self.fine_alg.print_init()
+
+    def init_fig(self, water_depth, map_size, showDepth=True):
+        # figures of the coarse pass are written to a subfolder as both passes use the same file names
+        if self.coarse_alg.figure_path is not None:
+            self.coarse_alg.figure_path = os.path.join(self.coarse_alg.figure_path, 'coarse')
+            os.makedirs(self.coarse_alg.figure_path, exist_ok=True)
+        self.coarse_alg.init_fig(water_depth, map_size, showDepth)
+        return self.fine_alg.init_fig(water_depth, map_size, showDepth)
+
+    def disable_figures(self):
+        RoutingAlg.disable_figures(self)
+        self.coarse_alg.disable_figures()
+        self.fine_alg.disable_figures()
+
+    def close_fig(self):
+        self.coarse_alg.close_fig()
+        self.fine_alg.close_fig()
+
+    def execute_routing(self, boat: Boat, wt: WeatherCond, constraints_list: ConstraintsList, verbose=False):
+        corridor = None
+        try:
+            logger.info(form.get_line_string())
+            logger.info('Starting coarse routing pass')
+            coarse_route = self.coarse_alg.execute_routing(boat, wt, constraints_list, verbose)
+
+            if self.reached_destination(coarse_route):
+                corridor = RouteCorridor(coarse_route.lats_per_step, coarse_route.lons_per_step,
+                                         self.corridor_half_width)
+                constraints_list.add_neg_constraint(corridor)
+                corridor.print_info()
+            else:
+                logger.warning('Coarse routing pass did not reach the destination. Refined pass is performed without '
+                               'route corridor.')
+
+            logger.info(form.get_line_string())
+            logger.info('Starting refined routing pass')
+            return self.fine_alg.execute_routing(boat, wt, constraints_list, verbose)
+        finally:
+            # the constraints list can be shared by several routings (e.g. departure sweep, batch routing)
+            if corridor is not None:
+                constraints_list.remove_neg_constraint(corridor)
+            # the figure renderer of the refined pass is still running if the coarse pass raises
+            self.close_fig()
+
+    def reached_destination(self, route: RouteParams):
+        return np.isclose(route.lats_per_step[-1], self.finish[0]) and np.isclose(route.lons_per_step[-1],
+                                                                                  self.finish[1])
@@ -1,6 +1,5 @@
 import logging
 import os
-from datetime import timedelta
 
 import numpy as np
 import matplotlib
@@ -68,6 +67,7 @@ class Genetic(RoutingAlg):
         crossover = CrossoverFactory.get_crossover()
         duplicates = RouteDuplicateElimination()
         res = self.optimize(problem, initial_population, crossover, mutation, duplicates)
+        constraints_list.print_cache_statistics()
 
         result = self.terminate(result_object=res, problem=problem)
         return result
@@ -112,7 +112,7 @@ class Genetic(RoutingAlg):
         courses = waypoint_coors['courses']
         start_times = waypoint_coors['start_times']
         travel_times = waypoint_coors['travel_times']
-        arrival_time = start_times[-1] + timedelta(seconds=dists[-1].value/speed.value)
+        arrival_time = start_times[-1] + np.timedelta64(round(dists[-1].value/speed.value), 's')
 
         dists = np.append(dists, -99 * u.meter)
         courses = np.append(courses, -99 * u.degree)
@@ -1,5 +1,5 @@
 import logging
-from datetime import timedelta
+import os
 
 import matplotlib.pyplot as plt
 import numpy as np
@@ -11,6 +11,7 @@ from astropy import units as u
 import WeatherRoutingTool.utils.formatting as form
 import WeatherRoutingTool.utils.graphics as graphics
 import WeatherRoutingTool.utils.unit_conversion as units
+from WeatherRoutingTool.utils.geodesics import GeodesicSolver
 from WeatherRoutingTool.algorithms.routingalg import RoutingAlg
 from WeatherRoutingTool.constraints.constraints import *
 from WeatherRoutingTool.routeparams import RouteParams
@@ -49,23 +50,38 @@ class IsoBased(RoutingAlg):
     course_per_step: np.ndarray  # course (0 - 360°)
     dist_per_step: np.ndarray  # geodesic distance traveled per time stamp:
     shipparams_per_step: ShipParams  # object storing ship parameters (fuel rate, power consumption ...)
-    starttime_per_step: np.ndarray  # start time for every routing step (datetime object)
+    starttime_per_step: np.ndarray  # start time for every routing step (datetime64[s])
     absolutefuel_per_step: np.ndarray   # (kg)
 
     current_course: np.ndarray  # current course (0-360°)
+    front_geometry: dict  # geodesics between current front and temporary start/destination
+    geodesic: GeodesicSolver  # solver for the direct and inverse geodesic problem of the routing steps
 
     # the lenght of the following arrays depends on the number of courses (course segments)
     full_dist_traveled: np.ndarray  # full geodesic distance since start for all courses
     full_time_traveled: np.ndarray  # time elapsed since start for all courses
-    time: np.ndarray  # current datetime for all courses
+    time: np.ndarray  # current datetime for all courses (datetime64[s])
 
     course_segments: int  # number of course segments in the range of -180° to 180°
     course_increments_deg: int  # increment between different variants
+    adaptive_courses: bool  # adapt width and resolution of the course fan to the courses that survive the pruning
+    course_segments_min: int  # minimal number of course segments for adaptive course fan
+    course_segments_max: int  # maximal number of course segments for adaptive course fan
+    course_increments_deg_min: float  # minimal increment between courses for adaptive course fan
+    course_increments_deg_max: float  # maximal increment between courses for adaptive course fan
+    course_offsets: np.ndarray  # offsets of the current courses from the gcr towards the (temporary) destination
     prune_sector_deg_half: int  # angular range of course that is considered for pruning (only one half, 0-180°)
     prune_segments: int  # number of course bins that are used for pruning
     prune_symmetry_axis: str  # method to define pruning symmetry axis
     prune_groups: str   # method to define grouping of route segments before the pruning
     minimisation_criterion: str  # minimisation criterion
+    bound_pruning: bool  # discard route segments that can not beat the best complete route known so far
+    fuel_upper_bound: float  # fuel consumption of the best complete route known so far (kg)
+    fuel_per_dist_lower_bound: float  # lower bound on the fuel consumption per distance (kg/m)
+    checkpoint_steps: int  # write a checkpoint of the routing state every checkpoint_steps routing steps (0: off)
+    checkpoint_count: int  # routing step of the last checkpoint that has been written or read
+    resume_file: str  # path to checkpoint from which the routing is resumed
+    figure_renderer: graphics.FigureRenderer  # renders the figures of the routing steps in the background
 
     desired_number_of_routes: int
     current_number_of_routes: int
@@ -85,16 +101,20 @@ class IsoBased(RoutingAlg):
         self.course_per_step = np.array([[0]]) * u.degree
         self.dist_per_step = np.array([[0]]) * u.meter
         self.shipparams_per_step = ShipParams.set_default_array()
-        self.starttime_per_step = np.array([[self.departure_time]])
+        self.starttime_per_step = np.array([[self.departure_time]], dtype='datetime64[s]')
         self.absolutefuel_per_step = np.array([[0]]) * u.kg
 
-        self.time = np.array([self.departure_time])
+        self.time = np.array([self.departure_time], dtype='datetime64[s]')
         self.full_time_traveled = np.array([0]) * u.s
         self.full_dist_traveled = np.array([0]) * u.m
 
         self.route_reached_destination = False
         self.route_reached_waypoint = False
         self.pruning_error = False
+        self.front_geometry = None
+
+        self.geodesic = GeodesicSolver(config.GEODESIC_METHOD, config.GEODESIC_APPROX_MAX_DIST)
+        self.geodesic.set_exact_points([self.finish[0]], [self.finish[1]])
 
         self.finish_temp = self.finish
         self.start_temp = self.start
@@ -112,9 +132,23 @@ class IsoBased(RoutingAlg):
                                   seg=config.ISOCHRONE_PRUNE_SEGMENTS, prune_groups=config.ISOCHRONE_PRUNE_GROUPS,
                                   prune_symmetry_axis=config.ISOCHRONE_PRUNE_SYMMETRY_AXIS)
         self.set_course_segments(config.ROUTER_HDGS_SEGMENTS, config.ROUTER_HDGS_INCREMENTS_DEG)
+        self.adaptive_courses = config.ROUTER_HDGS_ADAPTIVE
+        self.course_segments_min = config.ROUTER_HDGS_SEGMENTS_MIN
+        self.course_segments_max = config.ROUTER_HDGS_SEGMENTS
+        self.course_increments_deg_min = config.ROUTER_HDGS_INCREMENTS_DEG_MIN * u.degree
+        self.course_increments_deg_max = config.ROUTER_HDGS_INCREMENTS_DEG * u.degree
+        self.course_offsets = np.array([0]) * u.degree
         self.set_minimisation_criterion(config.ISOCHRONE_MINIMISATION_CRITERION)
 
+        self.bound_pruning = config.ISOCHRONE_BOUND_PRUNING
+        self.fuel_upper_bound = np.inf * u.kg
+        self.fuel_per_dist_lower_bound = 0 * u.kg / u.meter
+
         self.path_to_route_folder = config.ROUTE_PATH
+        self.checkpoint_steps = config.ISOCHRONE_CHECKPOINT_STEPS
+        self.checkpoint_count = -1
+        self.resume_file = config.ISOCHRONE_RESUME_FILE
+        self.figure_renderer = None
 
     def print_init(self):
         RoutingAlg.print_init(self)
@@ -124,8 +158,19 @@ class IsoBased(RoutingAlg):
         logger.info(form.get_log_step('ISOCHRONE_PRUNE_SYMMETRY_AXIS: ' + str(self.prune_symmetry_axis), 2))
         logger.info(form.get_log_step('ISOCHRONE_PRUNE_GROUPS: ' + str(self.prune_groups), 2))
         logger.info(form.get_log_step('ISOCHRONE_MINIMISATION_CRITERION: ' + str(self.minimisation_criterion), 2))
+        logger.info(form.get_log_step('ISOCHRONE_BOUND_PRUNING: ' + str(self.bound_pruning), 2))
         logger.info(form.get_log_step('ROUTER_HDGS_SEGMENTS: ' + str(self.course_segments), 2))
         logger.info(form.get_log_step('ROUTER_HDGS_INCREMENTS_DEG: ' + str(self.course_increments_deg), 2))
+        logger.info(form.get_log_step('ROUTER_HDGS_ADAPTIVE: ' + str(self.adaptive_courses), 2))
+        if self.adaptive_courses:
+            logger.info(form.get_log_step('ROUTER_HDGS_SEGMENTS_MIN: ' + str(self.course_segments_min), 2))
+            logger.info(form.get_log_step('ROUTER_HDGS_INCREMENTS_DEG_MIN: ' + str(self.course_increments_deg_min),
+                                          2))
+        if self.checkpoint_steps > 0:
+            logger.info(form.get_log_step('ISOCHRONE_CHECKPOINT_STEPS: ' + str(self.checkpoint_steps), 2))
+        if self.resume_file is not None:
+            logger.info(form.get_log_step('ISOCHRONE_RESUME_FILE: ' + str(self.resume_file), 2))
+        self.geodesic.print_init()
 
     def print_current_status(self):
         logger.info('PRINTING ALG SETTINGS')
@@ -174,10 +219,7 @@ class IsoBased(RoutingAlg):
         # branch out for multiple headings
         nof_input_routes = self.lats_per_step.shape[1]
 
-        new_finish_one = np.repeat(self.finish_temp[0], nof_input_routes)
-        new_finish_two = np.repeat(self.finish_temp[1], nof_input_routes)
-
-        new_course = geod.inverse(self.lats_per_step[0], self.lons_per_step[0], new_finish_one, new_finish_two)
+        new_course = self.get_front_geometry('to_dest')
 
         self.lats_per_step = np.repeat(self.lats_per_step, self.course_segments + 1, axis=1)
         self.lons_per_step = np.repeat(self.lons_per_step, self.course_segments + 1, axis=1)
@@ -191,12 +233,14 @@ class IsoBased(RoutingAlg):
         self.full_time_traveled = np.repeat(self.full_time_traveled, self.course_segments + 1, axis=0)
         self.full_dist_traveled = np.repeat(self.full_dist_traveled, self.course_segments + 1, axis=0)
         self.time = np.repeat(self.time, self.course_segments + 1, axis=0)
+        self.repeat_front_geometry(self.course_segments + 1)
         self.check_course_def()
 
         # determine new headings - centered around gcrs X0 -> X_prev_step
         delta_hdgs = np.linspace(-self.course_segments / 2 * self.course_increments_deg,
                                  +self.course_segments / 2 * self.course_increments_deg, self.course_segments + 1)
         delta_hdgs = np.tile(delta_hdgs, nof_input_routes)
+        self.course_offsets = -delta_hdgs
 
         self.current_course = new_course['azi1'] * u.degree  # center courses around gcr
         self.current_course = np.repeat(self.current_course, self.course_segments + 1)
@@ -225,92 +269,108 @@ class IsoBased(RoutingAlg):
             Returns:
                 iso (Isochrone) - next isochrone
         """
-        self.check_settings()
-        self.check_for_positive_constraints(constraints_list)
-        self.define_initial_variants()
-        # start_time=time.time()
-        # self.print_shape()
+        try:
+            self.check_settings()
+            self.check_for_positive_constraints(constraints_list)
+            if self.bound_pruning:
+                self.init_fuel_bounds(boat, constraints_list)
+            if self.resume_file is not None:
+                self.read_checkpoint(self.resume_file, constraints_list)
+            else:
+                self.define_initial_variants()
+            # start_time=time.time()
+            # self.print_shape()
+
+            # Note: self.count starts at 0
+            while self.count < self.ncount:
+                logger.info(form.get_line_string())
+                logger.info('Step ' + str(self.count))
+                if (self.checkpoint_steps > 0 and self.count > 0 and self.count % self.checkpoint_steps == 0
+                        and self.count != self.checkpoint_count):
+                    self.write_checkpoint(constraints_list)
+
+                self.define_courses_per_step()
+                self.move_boat_direct(wt, boat, constraints_list)
+
+                # Distinguish situations where the ship reached the final destination and where it reached a waypoint
+                if self.route_reached_destination:
+                    logger.info('Initiating last step at routing step ' + str(self.count))
+
+                    if (self.desired_number_of_routes > 1
+                            and self.current_number_of_routes < self.desired_number_of_routes):
+                        self.find_every_route_reaching_destination()
+                        number_of_possible_routes = self.current_number_of_routes + self.current_step_routes.shape[0]
+
+                        if self.desired_number_of_routes <= number_of_possible_routes:
+                            remaining_routes = self.desired_number_of_routes - self.current_number_of_routes
+                            self.find_routes_reaching_destination_in_current_step(remaining_routes)
+                            break
+                        else:
+                            self.find_routes_reaching_destination_in_current_step(number_of_possible_routes)
+                            if self.next_step_routes.shape[0] == 0:
+                                logger.warning('No routes left for execution, terminating!')
+                                break
+
+                            self.set_next_step_routes()
+                            self.pruning_per_step(True)
+                            if self.pruning_error:
+                                break
+                            self.route_reached_destination = False
+                            self.update_fig('p')
+                            self.count += 1
+                            continue
+                    else:
+                        break
 
-        # Note: self.count starts at 0
-        while self.count < self.ncount:
-            logger.info(form.get_line_string())
-            logger.info('Step ' + str(self.count))
+                elif self.route_reached_waypoint:
+                    logger.info('Initiating pruning for intermediate waypoint at routing step' + str(self.count))
+                    self.final_pruning()
+                    self.expand_axis_for_intermediate()
+                    constraints_list.reached_positive()
+                    self.finish_temp = constraints_list.get_current_destination()
+                    self.start_temp = constraints_list.get_current_start()
+                    self.gcr_course_temp = self.calculate_gcr(self.start_temp, self.finish_temp) * u.degree
+                    self.route_reached_waypoint = False
 
-            self.define_courses_per_step()
-            self.move_boat_direct(wt, boat, constraints_list)
+                    logger.info('Initiating routing for next segment going from ' + str(self.start_temp) + ' to ' + str(
+                        self.finish_temp))
+                    self.update_fig('p')
+                    self.count += 1
+                    continue
 
-            # Distinguish situations where the ship reached the final destination and where it reached a waypoint
-            if self.route_reached_destination:
-                logger.info('Initiating last step at routing step ' + str(self.count))
+                self.pruning_per_step(True)
 
-                if self.desired_number_of_routes > 1 and self.current_number_of_routes < self.desired_number_of_routes:
-                    self.find_every_route_reaching_destination()
-                    number_of_possible_routes = self.current_number_of_routes + self.current_step_routes.shape[0]
+                if self.pruning_error:
+                    break
+                else:
+                    self.update_fig('p')
+                    self.count += 1
 
-                    if self.desired_number_of_routes <= number_of_possible_routes:
-                        remaining_routes = self.desired_number_of_routes - self.current_number_of_routes
-                        self.find_routes_reaching_destination_in_current_step(remaining_routes)
-                        break
-                    else:
-                        self.find_routes_reaching_destination_in_current_step(number_of_possible_routes)
-                        if self.next_step_routes.shape[0] == 0:
-                            logger.warning('No routes left for execution, terminating!')
-                            break
+            if self.pruning_error and self.count > 0:
+                self.count = self.count - 1
+                self.revert_to_previous_step()
 
-                        self.set_next_step_routes()
-                        self.pruning_per_step(True)
-                        if self.pruning_error:
-                            break
-                        self.route_reached_destination = False
-                        self.update_fig('p')
-                        self.count += 1
-                        continue
-                else:
-                    break
+            self.geodesic.print_error_summary()
+            constraints_list.print_cache_statistics()
 
-            elif self.route_reached_waypoint:
-                logger.info('Initiating pruning for intermediate waypoint at routing step' + str(self.count))
-                self.final_pruning()
-                self.expand_axis_for_intermediate()
-                constraints_list.reached_positive()
-                self.finish_temp = constraints_list.get_current_destination()
-                self.start_temp = constraints_list.get_current_start()
-                self.gcr_course_temp = self.calculate_gcr(self.start_temp, self.finish_temp) * u.degree
-                self.route_reached_waypoint = False
-
-                logger.info('Initiating routing for next segment going from ' + str(self.start_temp) + ' to ' + str(
-                    self.finish_temp))
-                self.update_fig('p')
-                self.count += 1
-                continue
-
-            self.pruning_per_step(True)
-
-            if self.pruning_error:
-                break
-            else:
-                self.update_fig('p')
-                self.count += 1
-
-        if self.pruning_error and self.count > 0:
-            self.count = self.count - 1
-            self.revert_to_previous_step()
-
-        # ToDo: harmonize with above/merge with loop over routing steps
-        if self.desired_number_of_routes == 1:
-            self.final_pruning()
-            route = self.terminate()
-            return route
-        else:
-            if not self.route_list:
-                if self.pruning_error:
-                    self.routes_from_previous_step()
+            # ToDo: harmonize with above/merge with loop over routing steps
+            if self.desired_number_of_routes == 1:
                 self.final_pruning()
                 route = self.terminate()
                 return route
             else:
-                self.route_list.sort(key=lambda x: x.get_full_fuel())
-                return self.route_list[0]
+                if not self.route_list:
+                    if self.pruning_error:
+                        self.routes_from_previous_step()
+                    self.final_pruning()
+                    route = self.terminate()
+                    return route
+                else:
+                    self.route_list.sort(key=lambda x: x.get_full_fuel())
+                    return self.route_list[0]
+        finally:
+            # close the figure renderer after the last figure, also if the routing raises, to join its thread
+            self.close_fig()
 
     def move_boat_direct(self, wt: WeatherCond, boat: Boat, constraint_list: ConstraintsList):
         """
@@ -358,6 +418,7 @@ class IsoBased(RoutingAlg):
                 dist = dist_last_step
 
         is_constrained = self.check_constraints(move, constraint_list)
+        self.adapt_step_size(ship_params, is_constrained)
 
         self.update_position(move, is_constrained, dist)
         self.update_time(delta_time)
@@ -381,42 +442,33 @@ class IsoBased(RoutingAlg):
         'next_step_routes' dataframe. In this case, all routes originating from the same origin point are stored in
         the dataframe.
         """
-        df_current_last_step = pd.DataFrame()
-        df_current_last_step['st_lat'] = self.lats_per_step[1, :]
-        df_current_last_step['st_lon'] = self.lons_per_step[1, :]
-        df_current_last_step['dist'] = self.current_last_step_dist.value    # pandas struggles with units
-        df_current_last_step['dist_dest'] = self.current_last_step_dist_to_dest.value
-        df_current_last_step['fuel'] = self.absolutefuel_per_step[0, :].value
-
-        len_df = df_current_last_step.shape[0]
-
-        df_current_last_step.set_index(pd.RangeIndex(start=0, stop=len_df), inplace=True)
-        df_current_last_step.rename_axis('st_index', inplace=True)
-        df_current_last_step = df_current_last_step.reset_index()
-        df_current_last_step.set_index(['st_lat', 'st_lon'], inplace=True, drop=False)
-        df_grouped_by_routes_has_same_origin = df_current_last_step.groupby(level=['st_lat', 'st_lon'])
-
-        unique_origins = df_grouped_by_routes_has_same_origin.groups.keys()
-
-        self.current_step_routes = pd.DataFrame()
-        self.next_step_routes = pd.DataFrame()
-
-        for unique_key in unique_origins:
-            specific_route_group = df_grouped_by_routes_has_same_origin.get_group(unique_key)
-
-            df_reaching_destination = specific_route_group[
-                specific_route_group['dist'] >= specific_route_group['dist_dest']
-            ]
-            num_rows = df_reaching_destination.shape[0]
-
-            if num_rows > 0:
-                min_fuel = df_reaching_destination['fuel'].min()
-                rows_min_fuel = df_reaching_destination[df_reaching_destination['fuel'] == min_fuel]
-                # Make sure we keep only one route (ToDo: which one do we want to keep?)
-                row_min_fuel = rows_min_fuel.drop_duplicates('fuel')
-                self.current_step_routes = pd.concat([self.current_step_routes, row_min_fuel], ignore_index=True)
-            else:
-                self.next_step_routes = pd.concat([self.next_step_routes, specific_route_group], ignore_index=True)
+        nof_segments = self.lats_per_step.shape[1]
+        df_current_last_step = pd.DataFrame({
+            'st_index': np.arange(nof_segments),
+            'st_lat': self.lats_per_step[1, :],
+            'st_lon': self.lons_per_step[1, :],
+            'dist': self.current_last_step_dist.value,    # pandas struggles with units
+            'dist_dest': self.current_last_step_dist_to_dest.value,
+            'fuel': self.absolutefuel_per_step[0, :].value
+        })
+
+        group_ids, order, group_starts = self.get_origin_groups()
+        group_sizes = np.diff(np.append(group_starts, nof_segments))
+
+        reaching_dest = (df_current_last_step['dist'].to_numpy() >= df_current_last_step['dist_dest'].to_numpy())[order]
+        fuel = df_current_last_step['fuel'].to_numpy()[order]
+
+        # per branch, keep only the first route segment reaching the destination with minimal fuel
+        group_reaches_dest = np.logical_or.reduceat(reaching_dest, group_starts)
+        min_fuel = np.minimum.reduceat(np.where(reaching_dest, fuel, np.inf), group_starts)
+        is_min_fuel = reaching_dest & (fuel == np.repeat(min_fuel, group_sizes))
+        first_min_fuel = self.get_first_in_groups(is_min_fuel, group_starts)
+
+        current_step_idxs = order[first_min_fuel[group_reaches_dest]]
+        next_step_idxs = order[~np.repeat(group_reaches_dest, group_sizes)]
+
+        self.current_step_routes = df_current_last_step.iloc[current_step_idxs].reset_index(drop=True)
+        self.next_step_routes = df_current_last_step.iloc[next_step_idxs].reset_index(drop=True)
 
     def find_routes_reaching_destination_in_current_step(self, remaining_routes=0):
         """
@@ -429,6 +481,8 @@ class IsoBased(RoutingAlg):
 
         for idxs in route_df:
             self.current_number_of_routes = self.current_number_of_routes + 1
+            if self.bound_pruning:
+                self.update_fuel_upper_bound(np.sum(self.absolutefuel_per_step[:, idxs]))
             route_object = self.make_route_object(idxs)
             self.check_status(route_object.ship_params_per_step.get_status(), str(self.current_number_of_routes))
             self.route_list.append(route_object)
@@ -480,53 +534,14 @@ class IsoBased(RoutingAlg):
         """
         Plot every complete individual route that is reaching the destination
         """
-        fig = self.fig
-        fig, ax = graphics.generate_basemap(self.fig, self.depth, self.start,
-                                            self.finish)
-
         lats_per_step = self.lats_per_step[:, idxs]
         lons_per_step = self.lons_per_step[:, idxs]
 
-        route, = ax.plot(lons_per_step,
-                         lats_per_step, color="orange", linewidth=2.5)
-
-        route_ensemble = []
-        route_ensemble.append(route)
-
-        route.set_xdata(lons_per_step)
-        route.set_ydata(lats_per_step)
-        fig.canvas.draw()
-        fig.canvas.flush_events()
-
         final_path = self.figure_path + '/fig' + str(
             self.count) + '_route_' + str(idxs) + '.png'
         logger.info('Save updated figure to ' + final_path)
-        plt.savefig(final_path)
-
-    def plot_route_with_depth(self, colour, label, linestyle=False):
-
-        fig = self.fig
-        fig, ax = graphics.generate_basemap(self.fig, self.depth, self.start,
-                                            self.finish)
-
-        lats = self.lats_per_step
-        lons = self.lons_per_step
-
-        if linestyle:
-            ax.plot(lons, lats, color=colour, label=label, linewidth=2, linestyle='dashdot')
-        else:
-            ax.plot(lons, lats, color=colour, label=label, linewidth=2)
-
-        ax.plot(self.start[1], self.start[0], marker="o", markerfacecolor=colour, markeredgecolor=colour, markersize=10)
-        ax.plot(self.finish[1], self.finish[0], marker="o", markerfacecolor=colour, markeredgecolor=colour,
-                markersize=10)
-
-        fig.canvas.draw()
-        fig.canvas.flush_events()
-        final_path = self.figure_path + '/fig' + str(
-            self.count) + '_route_' + '.png'
-        logger.info('Save updated figure to ' + final_path)
-        plt.savefig(final_path)
+        self.figure_renderer.submit(final_path, [(lons_per_step, lats_per_step,
+                                                  {'color': 'orange', 'linewidth': 2.5})])
 
     def set_next_step_routes(self):
         """
@@ -547,9 +562,11 @@ class IsoBased(RoutingAlg):
             self.starttime_per_step = self.starttime_per_step[:, idxs]
 
             self.current_course = self.current_course[idxs]
+            self.course_offsets = self.course_offsets[idxs]
             self.full_dist_traveled = self.full_dist_traveled[idxs]
             self.full_time_traveled = self.full_time_traveled[idxs]
             self.time = self.time[idxs]
+            self.select_front_geometry(idxs)
         except IndexError:
             raise Exception('Pruned indices running out of bounds.')
 
@@ -576,7 +593,7 @@ class IsoBased(RoutingAlg):
             self.current_course = np.full(col_len, -99)
             self.full_dist_traveled = np.full(col_len, -99)
             self.full_time_traveled = np.full(col_len, -99)
-            self.time = np.full(col_len, -99)
+            self.time = np.full(col_len, np.datetime64('NaT'), dtype='datetime64[s]')
 
         except IndexError:
             raise Exception('Pruned indices running out of bounds.')
@@ -587,37 +604,17 @@ class IsoBased(RoutingAlg):
         routing step are found here. Then, the unique routes are written into json files
         and plotted.
         '''
-        df_current_last_step = pd.DataFrame()
-        df_current_last_step['st_lat'] = self.lats_per_step[1, :]
-        df_current_last_step['st_lon'] = self.lons_per_step[1, :]
-        df_current_last_step['fuel'] = self.shipparams_per_step.get_fuel()[0, :]
-
-        len_df = df_current_last_step.shape[0]
-
-        df_current_last_step.set_index(pd.RangeIndex(start=0, stop=len_df),
-                                       inplace=True)
-        df_current_last_step.rename_axis('st_index', inplace=True)
-        df_current_last_step = df_current_last_step.reset_index()
-        df_current_last_step.set_index(['st_lat', 'st_lon'], inplace=True,
-                                       drop=False)
-        df_grouped_by_routes_has_same_origin = df_current_last_step.groupby(
-            level=['st_lat', 'st_lon'])
-
-        unique_origins = df_grouped_by_routes_has_same_origin.groups.keys()
-
-        current_step_routes = pd.DataFrame()
-
-        for unique_key in unique_origins:
-            specific_route_group = df_grouped_by_routes_has_same_origin.get_group(
-                unique_key)
-            row_min_fuel = specific_route_group.drop_duplicates(subset=['fuel'])
-            current_step_routes = pd.concat(
-                    [current_step_routes, row_min_fuel],
-                    ignore_index=True)
-        current_step_routes_sort_by_fuel = current_step_routes.sort_values(by=['fuel'])
-        route_df = current_step_routes_sort_by_fuel['st_index']
-
-        for idx in route_df:
+        group_ids, _, _ = self.get_origin_groups()
+        fuel = self.shipparams_per_step.get_fuel_rate()[0, :].value
+
+        # drop route segments of the same branch with identical fuel, keep the first occurrence
+        idxs = np.lexsort((np.arange(fuel.shape[0]), fuel, group_ids))
+        is_duplicate = (group_ids[idxs][1:] == group_ids[idxs][:-1]) & (fuel[idxs][1:] == fuel[idxs][:-1])
+        idxs = idxs[np.insert(~is_duplicate, 0, True)]
+
+        route_idxs = idxs[np.lexsort((idxs, group_ids[idxs], fuel[idxs]))]
+
+        for idx in route_idxs:
             route_object = self.make_route_object(idx)
             self.route_list.append(route_object)
             if self.path_to_route_folder is not None:
@@ -739,6 +736,10 @@ class IsoBased(RoutingAlg):
             logger.info('Executing branch-based pruning.')
             idxs = self.branch_based_pruning()
             is_pruned = True
+        if self.prune_groups == 'grid':
+            logger.info('Executing grid-based pruning.')
+            idxs = self.grid_based_pruning()
+            is_pruned = True
 
         if not is_pruned:
             raise ValueError('The selected pruning option is not available!')
@@ -770,58 +771,189 @@ class IsoBased(RoutingAlg):
             self.starttime_per_step = self.starttime_per_step[:, idxs]
 
             self.current_course = self.current_course[idxs]
+            self.course_offsets = self.course_offsets[idxs]
             self.full_dist_traveled = self.full_dist_traveled[idxs]
             self.full_time_traveled = self.full_time_traveled[idxs]
             self.time = self.time[idxs]
+            self.select_front_geometry(idxs)
         except IndexError:
             raise Exception('Pruned indices running out of bounds.')
 
+        if self.adaptive_courses:
+            self.adapt_course_fan()
+
     def courses_based_pruning(self, bins):
         bin_stat, bin_edges, bin_number = binned_statistic(self.current_course, self.full_dist_traveled,
                                                            statistic=np.nanmax, bins=bins)
         return bin_stat, bin_edges, bin_number
 
     def larger_direction_based_pruning(self, bins):
-        start_lats = np.repeat(self.start_temp[0], self.lats_per_step.shape[1])
-        start_lons = np.repeat(self.start_temp[1], self.lons_per_step.shape[1])
-        larger_direction = geod.inverse(start_lats, start_lons, self.lats_per_step[0], self.lons_per_step[0])
-        larger_direction = larger_direction['azi1']
+        larger_direction = self.get_front_geometry('from_start')['azi1']
         bin_stat, bin_edges, bin_number = binned_statistic(larger_direction, self.full_dist_traveled,
                                                            statistic=np.nanmax, bins=bins)
         return bin_stat, bin_edges, bin_number
 
     def branch_based_pruning(self):
-        df_current_last_step = pd.DataFrame()
-        df_current_last_step['st_lat'] = self.lats_per_step[1, :]
-        df_current_last_step['st_lon'] = self.lons_per_step[1, :]
-        df_current_last_step['dist'] = self.full_dist_traveled
+        """
+        For every branch (route segments originating from the same point), select the route segment that maximises
+        the minimisation criterion. Branches for which all route segments are constrained are discarded.
+        """
+        group_ids, order, group_starts = self.get_origin_groups()
+        group_sizes = np.diff(np.append(group_starts, order.shape[0]))
 
-        len_df = df_current_last_step.shape[0]
+        dist = np.asarray(self.full_dist_traveled)[order]
+        max_dist = np.fmax.reduceat(dist, group_starts)
+        first_max_dist = self.get_first_in_groups(dist == np.repeat(max_dist, group_sizes), group_starts)
 
-        df_current_last_step.set_index(pd.RangeIndex(start=0, stop=len_df), inplace=True)
-        df_current_last_step.rename_axis('st_index', inplace=True)
-        df_current_last_step = df_current_last_step.reset_index()
-        df_current_last_step.set_index(['st_lat', 'st_lon'], inplace=True, drop=False)
-        df_grouped_by_routes_has_same_origin = df_current_last_step.groupby(level=['st_lat', 'st_lon'])
+        keep = (max_dist != 0.) & (first_max_dist < order.shape[0])
+        idxs = order[first_max_dist[keep]]
+        return idxs.tolist()
 
-        unique_origins = df_grouped_by_routes_has_same_origin.groups.keys()
-        idxs = []
+    def grid_based_pruning(self):
+        """
+        Hash the end points of the route segments into a lat/lon grid and select the route segment that maximises the
+        minimisation criterion for every occupied grid cell. The grid adapts to the extent of the current isochrone:
+        the cell size is chosen such that the largest extent of the isochrone is covered by 'prune_segments' cells.
+        Longitudes are scaled with the cosine of the mean latitude to obtain approximately square cells. Route
+        segments that are constrained are discarded.
+        """
+        dist = np.asarray(self.full_dist_traveled)
+        valid_idxs = np.flatnonzero(dist != 0)
+        if valid_idxs.shape[0] == 0:
+            return []
+
+        lats = self.get_current_lats()[valid_idxs]
+        lons = self.get_current_lons()[valid_idxs]
+        lons = (lons - lons[0] + 180) % 360 - 180  # avoid jumps at the antimeridian
+        lons = lons * np.cos(np.deg2rad(np.mean(lats)))
+
+        # the grid is anchored at the south-western corner of the isochrone
+        lats = lats - np.min(lats)
+        lons = lons - np.min(lons)
+        extent = max(np.max(lats), np.max(lons))
+        cell_size = extent / self.prune_segments if extent > 0 else 1.
+        cells = np.column_stack((np.floor(lats / cell_size), np.floor(lons / cell_size)))
+        cells = np.minimum(cells, self.prune_segments - 1)
+        _, cell_ids = np.unique(cells, axis=0, return_inverse=True)
+        cell_ids = cell_ids.reshape(-1)
+
+        # sort by cell and decreasing minimisation criterion; the first entry of every cell is selected
+        order = np.lexsort((-dist[valid_idxs], cell_ids))
+        is_first = np.diff(cell_ids[order], prepend=-1) != 0
+        idxs = np.sort(valid_idxs[order[is_first]])
+        return idxs.tolist()
+
+    def get_origin_groups(self):
+        """
+        Group the route segments of the current routing step according to their point of origin.
+
+        Returns:
+            group_ids (np.ndarray) - integer id of the point of origin for every route segment; ids are assigned in
+                lexicographical order of (lat, lon)
+            order (np.ndarray) - indices of the route segments sorted by group id; the original order is kept within
+                every group
+            group_starts (np.ndarray) - positions in 'order' at which the individual groups start
+        """
+        origins = np.column_stack((self.lats_per_step[1, :], self.lons_per_step[1, :]))
+        _, group_ids = np.unique(origins, axis=0, return_inverse=True)
+        group_ids = group_ids.reshape(-1)
 
-        for unique_key in unique_origins:
-            specific_route_group = df_grouped_by_routes_has_same_origin.get_group(unique_key)
+        order = np.argsort(group_ids, kind='stable')
+        group_starts = np.flatnonzero(np.diff(group_ids[order], prepend=-1))
+        return group_ids, order, group_starts
 
-            max_dist = specific_route_group['dist'].max()
-            if max_dist == 0.:
-                continue
+    def get_first_in_groups(self, mask, group_starts):
+        """
+        Return the position of the first True element of 'mask' for every group. Groups are defined by 'group_starts'
+        as returned by get_origin_groups. If a group does not contain any True element, the length of 'mask' is
+        returned instead.
+        """
+        positions = np.where(mask, np.arange(mask.shape[0]), mask.shape[0])
+        return np.minimum.reduceat(positions, group_starts)
 
-            max_dist_indxs = specific_route_group[specific_route_group['dist'] == max_dist]['st_index']
-            max_dist_indxs = max_dist_indxs.values
-            max_dist_indxs = max_dist_indxs.astype('int32')
+    def init_fuel_bounds(self, boat: Boat, constraints_list: ConstraintsList):
+        """
+        Initialise the bounds for bound-based pruning. The lower bound on the fuel consumption per distance is
+        obtained from the lower bound on the fuel rate of the boat model which holds for all weather conditions of the
+        loaded weather data. If the boat model can not guarantee such a bound, the lower bound is zero. The initial
+        upper bound is the fuel consumption of the great circle route if it is not constrained.
+        """
+        fuel_rate_lower_bound = boat.get_fuel_rate_lower_bound()
+        if fuel_rate_lower_bound is None:
+            logger.warning('Boat model does not provide a lower bound on the fuel rate. Bound-based pruning will '
+                           'only use the fuel already consumed.')
+        else:
+            self.fuel_per_dist_lower_bound = (fuel_rate_lower_bound / boat.get_boat_speed()).to(u.kg / u.meter)
 
-            idxs.append(max_dist_indxs[0])
-        return idxs
+        self.update_fuel_upper_bound(self.get_gcr_fuel(boat, constraints_list))
+
+        logger.info(form.get_log_step('lower bound on fuel per distance: ' + str(self.fuel_per_dist_lower_bound), 1))
+        logger.info(form.get_log_step('initial upper bound on fuel: ' + str(self.fuel_upper_bound), 1))
+
+    def get_gcr_fuel(self, boat: Boat, constraints_list: ConstraintsList):
+        """
+        Estimate the fuel consumption of the great circle route from the start to the destination. Returns infinity
+        if the great circle route is constrained or needs to pass intermediate waypoints.
+        """
+        if constraints_list.have_positive():
+            return np.inf * u.kg
+
+        # split the great circle route into legs of approximately 10 km
+        gcr = geod.inverse([self.start[0]], [self.start[1]], [self.finish[0]], [self.finish[1]])
+        nof_legs = max(int(np.ceil(gcr['s12'][0] / 10000.)), 1)
+        points = geod.direct(np.full(nof_legs + 1, self.start[0]), np.full(nof_legs + 1, self.start[1]),
+                             np.full(nof_legs + 1, gcr['azi1'][0]), np.linspace(0, gcr['s12'][0], nof_legs + 1))
+        points['lat2'][-1] = self.finish[0]
+        points['lon2'][-1] = self.finish[1]
+
+        waypoint_coors = RouteParams.get_per_waypoint_coords(points['lon2'], points['lat2'], self.departure_time,
+                                                             boat.get_boat_speed())
+        is_constrained = [False for i in range(0, nof_legs)]
+        is_constrained = constraints_list.safe_crossing(points['lat2'][:-1], points['lon2'][:-1], points['lat2'][1:],
+                                                        points['lon2'][1:], waypoint_coors['start_times'],
+                                                        is_constrained)
+        if np.any(is_constrained):
+            logger.info(form.get_log_step('Great circle route is constrained and not used as upper bound.', 1))
+            return np.inf * u.kg
+
+        ship_params = boat.get_ship_parameters(waypoint_coors['courses'], waypoint_coors['start_lats'],
+                                               waypoint_coors['start_lons'], waypoint_coors['start_times'])
+        fuel = np.sum(ship_params.get_fuel_rate() * waypoint_coors['travel_times'])
+        return fuel.to(u.kg)
+
+    def update_fuel_upper_bound(self, fuel):
+        if fuel < self.fuel_upper_bound:
+            self.fuel_upper_bound = fuel
+
+    def bound_based_pruning(self):
+        """
+        Discard all route segments for which the fuel that has already been consumed plus a lower bound on the fuel
+        that is needed to reach the destination exceeds the fuel consumption of the best complete route known so
+        far. The lower bound is the distance to the (temporary) destination multiplied with the minimal fuel
+        consumption per distance. Discarded route segments are treated like constrained route segments by the
+        subsequent pruning. If no route segment could beat the upper bound, no route segment is discarded.
+        """
+        if np.isinf(self.fuel_upper_bound):
+            return
+
+        fuel_consumed = np.sum(self.absolutefuel_per_step, axis=0)
+        dist_to_dest = self.get_front_geometry('to_dest')['s12'] * u.meter
+        fuel_estimate = fuel_consumed + dist_to_dest * self.fuel_per_dist_lower_bound
+
+        is_discarded = fuel_estimate > self.fuel_upper_bound
+        is_valid = np.asarray(self.full_dist_traveled) != 0
+        if not np.any(is_valid & ~is_discarded):
+            logger.warning('No route segment can beat the upper bound on fuel for step ' + str(self.count) +
+                           '. Skipping bound-based pruning.')
+            return
+
+        logger.info(form.get_log_step('Bound-based pruning discards ' + str(np.sum(is_valid & is_discarded)) +
+                                      ' of ' + str(np.sum(is_valid)) + ' route segments.', 1))
+        self.full_dist_traveled = np.where(is_discarded, 0, self.full_dist_traveled)
 
     def pruning_per_step(self, trim=True):
+        if self.bound_pruning:
+            self.bound_based_pruning()
         if self.prune_symmetry_axis == 'gcr':
             self.pruning_gcr_centered(trim)
         else:
@@ -845,9 +977,7 @@ class IsoBased(RoutingAlg):
         # of the course defined by the distance between the start point and the destination for the mean distance
         # travelled
         # during the current routing step.
-        start_lats = np.repeat(self.start_temp[0], self.lats_per_step.shape[1])
-        start_lons = np.repeat(self.start_temp[1], self.lons_per_step.shape[1])
-        full_travel_dist = geod.inverse(start_lats, start_lons, self.lats_per_step[0], self.lons_per_step[0])
+        full_travel_dist = self.get_front_geometry('from_start')
         mean_dist = np.mean(full_travel_dist['s12'])
         gcr_point = geod.direct([self.start_temp[0]], [self.start_temp[1]], self.gcr_course_temp.value, mean_dist)
 
@@ -861,10 +991,6 @@ class IsoBased(RoutingAlg):
             print('current temporary destination: ', self.finish_temp)
             print('mean course', new_course['azi1'])
 
-            fig = self.fig
-            self.ax.remove()
-            fig, self.ax = graphics.generate_basemap(fig, self.depth, self.start, self.finish)
-
             # plot symmetry axis and boundaries of pruning area
             symmetry_axis = geod.direct([self.start_temp[0]], [self.start_temp[1]], new_course['azi1'], 1000000)
             lower_bound = geod.direct([self.start_temp[0]], [self.start_temp[1]],
@@ -872,17 +998,11 @@ class IsoBased(RoutingAlg):
             upper_bound = geod.direct([self.start_temp[0]], [self.start_temp[1]],
                                       new_course['azi1'] + self.prune_sector_deg_half, 1000000)
 
-            self.ax.plot([self.start_temp[1], symmetry_axis["lon2"]],
-                         [self.start_temp[0], symmetry_axis["lat2"]], color="blue")
-            self.ax.plot([self.start_temp[1], lower_bound["lon2"]],
-                         [self.start_temp[0], lower_bound["lat2"]], color="blue")
-            self.ax.plot([self.start_temp[1], upper_bound["lon2"]],
-                         [self.start_temp[0], upper_bound["lat2"]], color="blue")
-
             if self.figure_path is not None:
                 final_path = self.figure_path + '/fig' + str(self.count) + '_gcr_symmetry_axis.png'
                 logger.info('Saving updated figure to ' + str(final_path))
-                plt.savefig(final_path)
+                self.figure_renderer.submit(final_path, self.get_pruning_area_lines(symmetry_axis, lower_bound,
+                                                                                    upper_bound))
 
         # define pruning area
         azi0s = np.repeat(new_course['azi1'], self.prune_segments + 1)
@@ -907,13 +1027,8 @@ class IsoBased(RoutingAlg):
 
         # propagate current end points towards temporary destination
         non_zero_idxs = np.where(self.full_dist_traveled != 0)[0]
-        cat_lats = self.lats_per_step[0][non_zero_idxs]
-        cat_lons = self.lons_per_step[0][non_zero_idxs]
-        new_finish_one = np.repeat(self.finish_temp[0], cat_lats.shape[0])
-        new_finish_two = np.repeat(self.finish_temp[1], cat_lats.shape[0])
-
-        new_course = geod.inverse(cat_lats, cat_lons, new_finish_one, new_finish_two)
-        mean_course = np.median(new_course['azi1']) * u.degree
+        new_course = self.get_front_geometry('to_dest')['azi1'][non_zero_idxs]
+        mean_course = np.median(new_course) * u.degree
 
         if debug:
             print('mean course: ', mean_course)
@@ -925,17 +1040,11 @@ class IsoBased(RoutingAlg):
             upper_bound = geod.direct([self.start_temp[0]], [self.start_temp[1]],
                                       mean_course + self.prune_sector_deg_half, 1000000)
 
-            self.ax.plot([self.start_temp[1], symmetry_axis["lon2"]],
-                         [self.start_temp[0], symmetry_axis["lat2"]], color="blue")
-            self.ax.plot([self.start_temp[1], lower_bound["lon2"]],
-                         [self.start_temp[0], lower_bound["lat2"]], color="blue")
-            self.ax.plot([self.start_temp[1], upper_bound["lon2"]],
-                         [self.start_temp[0], upper_bound["lat2"]], color="blue")
-
             if self.figure_path is not None:
                 final_path = self.figure_path + '/fig' + str(self.count) + '_median.png'
                 logger.info('Saving updated figure to ' + final_path)
-                plt.savefig(final_path)
+                self.figure_renderer.submit(final_path, self.get_pruning_area_lines(symmetry_axis, lower_bound,
+                                                                                    upper_bound))
 
         # define pruning area
         bins = units.get_angle_bins(mean_course - self.prune_sector_deg_half,
@@ -965,6 +1074,38 @@ class IsoBased(RoutingAlg):
         self.course_segments = seg
         self.course_increments_deg = inc * u.degree
 
+    def adapt_course_fan(self):
+        """
+        Adapt the course fan of the next routing step to the courses that survived the pruning. If surviving courses
+        lie at the edge of the current fan, the fan is widened by a factor of two. Otherwise, it is narrowed to the
+        largest surviving course offset plus one increment. The course increment is kept at ROUTER_HDGS_INCREMENTS_DEG
+        unless the narrowed fan would consist of less than ROUTER_HDGS_SEGMENTS_MIN segments; in this case the
+        resolution is refined down to ROUTER_HDGS_INCREMENTS_DEG_MIN. The number of segments never exceeds
+        ROUTER_HDGS_SEGMENTS.
+        """
+        inc = self.course_increments_deg.to(u.degree).value
+        inc_min = self.course_increments_deg_min.to(u.degree).value
+        inc_max = self.course_increments_deg_max.to(u.degree).value
+        half_width = self.course_segments / 2 * inc
+        max_offset = np.max(np.abs(self.course_offsets.to(u.degree).value))
+
+        if max_offset >= half_width - inc / 2:
+            half_width = 2 * half_width
+        else:
+            half_width = max_offset + inc
+        half_width = np.clip(half_width, self.course_segments_min / 2 * inc_min, self.course_segments_max / 2 * inc_max)
+
+        new_inc = inc_max
+        new_seg = 2 * int(np.ceil(half_width / new_inc - 1e-6))
+        if new_seg < self.course_segments_min:
+            new_seg = self.course_segments_min
+            new_inc = max(half_width / (self.course_segments_min / 2), inc_min)
+        new_seg = min(new_seg, self.course_segments_max)
+
+        self.set_course_segments(new_seg, new_inc)
+        logger.info(form.get_log_step('course fan for next step: ' + str(self.course_segments) + ' segments with '
+                                      + 'increment ' + str(self.course_increments_deg), 1))
+
     def get_current_course(self):
         return self.current_course
 
@@ -996,9 +1137,19 @@ class IsoBased(RoutingAlg):
         if ((self.course_segments % 2) != 0):
             raise ValueError(
                 'Please provide an even number of course segments, you chose: ' + str(self.course_segments))
+        if self.adaptive_courses:
+            if ((self.course_segments_min % 2) != 0) or (self.course_segments_min > self.course_segments_max):
+                raise ValueError('Please provide an even minimal number of course segments that does not exceed the '
+                                 'number of course segments, you chose: ' + str(self.course_segments_min))
+            if self.course_increments_deg_min > self.course_increments_deg_max:
+                raise ValueError('The minimal course increment must not exceed the course increment, you chose: '
+                                 + str(self.course_increments_deg_min))
 
         if ((self.prune_segments % 2) != 0):
             raise ValueError('Please provide an even number of prune segments, you chose: ' + str(self.prune_segments))
+        if self.checkpoint_steps > 0 and self.path_to_route_folder is None:
+            logger.warning('No ROUTE_PATH is set, no checkpoints are written.')
+            self.checkpoint_steps = 0
 
     def get_final_index(self):
         idx = np.argmax(self.full_dist_traveled)
@@ -1039,9 +1190,25 @@ class IsoBased(RoutingAlg):
                                                           'of the route segments are successful for Route '
                                                           + route_name+'!')
 
+    def adapt_step_size(self, ship_params, is_constrained):
+        pass
+
     def update_time(self, delta_time):
         self.full_time_traveled += delta_time
-        self.time += timedelta(seconds=delta_time)
+        self.time = self.time + self.get_timedelta64(delta_time)
+
+    @staticmethod
+    def get_timedelta64(delta_time):
+        """
+        Convert time intervals to a timedelta64 array that can be added to the datetime64 arrays 'time' and
+        'starttime_per_step'. Intervals are rounded to full seconds.
+
+        Parameters:
+            delta_time (astropy.units.Quantity or np.ndarray) - time intervals; plain arrays are interpreted as seconds
+        """
+        if isinstance(delta_time, u.Quantity):
+            delta_time = delta_time.to(u.second).value
+        return np.rint(delta_time).astype('timedelta64[s]')
 
     def check_bearing(self, dist):
         """
@@ -1052,8 +1219,7 @@ class IsoBased(RoutingAlg):
         debug = False
 
         ncourses = self.get_current_lons().shape[0]
-        dist_to_dest = geod.inverse(self.get_current_lats(), self.get_current_lons(),
-                                    np.full(ncourses, self.finish_temp[0]), np.full(ncourses, self.finish_temp[1]))
+        dist_to_dest = dict(self.get_front_geometry('to_dest'))
         dist_to_dest["s12"] = dist_to_dest["s12"] * u.meter
         dist_to_dest["azi1"] = dist_to_dest["azi1"] * u.degree
     # ToDo: use logger.debug and args.debug
@@ -1063,8 +1229,8 @@ class IsoBased(RoutingAlg):
 
         reaching_dest = np.any(dist_to_dest['s12'] < dist)
 
-        move = geod.direct(self.get_current_lats(), self.get_current_lons(),
-                           self.current_course.value, dist.value)
+        move = self.geodesic.direct(self.get_current_lats(), self.get_current_lons(),
+                                    self.current_course.value, dist.value)
 
         if reaching_dest:
             reached_final = (self.finish_temp[0] == self.finish[0]) & (self.finish_temp[1] == self.finish[1])
@@ -1124,15 +1290,17 @@ class IsoBased(RoutingAlg):
 
         start_lats = np.repeat(self.start_temp[0], self.lats_per_step.shape[1])
         start_lons = np.repeat(self.start_temp[1], self.lons_per_step.shape[1])
-        travel_dist = geod.inverse(start_lats, start_lons, move['lat2'], move['lon2'])  # calculate full distance
+        travel_dist = self.geodesic.inverse(start_lats, start_lons, move['lat2'], move['lon2'])  # full distance
         end_lats = np.repeat(self.finish_temp[0], self.lats_per_step.shape[1])
         end_lons = np.repeat(self.finish_temp[1], self.lons_per_step.shape[1])
-        dist_to_dest = geod.inverse(move['lat2'], move['lon2'], end_lats, end_lons)  # calculate full distance
+        dist_to_dest = self.geodesic.inverse(move['lat2'], move['lon2'], end_lats, end_lons)  # full distance
+        self.set_front_geometry(travel_dist, dist_to_dest)
 
         # traveled, azimuth of gcr connecting start and new position
         # self.current_variant = gcrs['azi1']
         # self.current_azimuth = gcrs['azi1']
         # gcrs['s12'][is_constrained] = 0
+        travel_dist = {'s12': travel_dist['s12'].copy()}
         travel_dist['s12'][is_constrained] = 0
 
         concatenated_distance = np.sum(self.dist_per_step, axis=0)
@@ -1149,6 +1317,64 @@ class IsoBased(RoutingAlg):
         if debug:
             print('full_dist_traveled:', self.full_dist_traveled)
 
+    def get_front_geometry(self, key):
+        """
+        Return the geodesics between the current front (self.lats_per_step[0], self.lons_per_step[0]) and the
+        temporary start point (key='from_start') or the temporary destination (key='to_dest') as returned by
+        GeodesicSolver.inverse. The inverse problem is solved at most once per front; the results are reused by all
+        phases of a routing step (definition of courses, bearing check, pruning) and follow the front through
+        repeat_front_geometry and select_front_geometry.
+        """
+        front_lats = self.lats_per_step[0]
+        front_lons = self.lons_per_step[0]
+
+        if not self.is_front_geometry_valid(front_lats, front_lons):
+            self.front_geometry = {'lats': front_lats.copy(), 'lons': front_lons.copy(), 'start': self.start_temp,
+                                   'finish': self.finish_temp, 'from_start': None, 'to_dest': None}
+
+        if self.front_geometry[key] is None:
+            if key == 'from_start':
+                self.front_geometry[key] = self.geodesic.inverse(np.full(front_lats.shape, self.start_temp[0]),
+                                                                 np.full(front_lons.shape, self.start_temp[1]),
+                                                                 front_lats, front_lons)
+            elif key == 'to_dest':
+                self.front_geometry[key] = self.geodesic.inverse(front_lats, front_lons,
+                                                                 np.full(front_lats.shape, self.finish_temp[0]),
+                                                                 np.full(front_lons.shape, self.finish_temp[1]))
+            else:
+                raise ValueError('Front geometry ' + str(key) + ' is not available!')
+        return self.front_geometry[key]
+
+    def set_front_geometry(self, from_start, to_dest):
+        self.front_geometry = {'lats': self.lats_per_step[0].copy(), 'lons': self.lons_per_step[0].copy(),
+                               'start': self.start_temp, 'finish': self.finish_temp, 'from_start': from_start,
+                               'to_dest': to_dest}
+
+    def is_front_geometry_valid(self, front_lats, front_lons):
+        if self.front_geometry is None:
+            return False
+        return ((self.front_geometry['start'] == self.start_temp) and
+                (self.front_geometry['finish'] == self.finish_temp) and
+                np.array_equal(self.front_geometry['lats'], front_lats) and
+                np.array_equal(self.front_geometry['lons'], front_lons))
+
+    def select_front_geometry(self, idxs):
+        self.transform_front_geometry(lambda arr: arr[idxs])
+
+    def repeat_front_geometry(self, nof_repetitions):
+        self.transform_front_geometry(lambda arr: np.repeat(arr, nof_repetitions))
+
+    def transform_front_geometry(self, transform):
+        if self.front_geometry is None:
+            return
+
+        self.front_geometry['lats'] = transform(self.front_geometry['lats'])
+        self.front_geometry['lons'] = transform(self.front_geometry['lons'])
+        for key in ['from_start', 'to_dest']:
+            if self.front_geometry[key] is not None:
+                self.front_geometry[key] = {var: transform(val) if isinstance(val, np.ndarray) else val
+                                            for var, val in self.front_geometry[key].items()}
+
     def update_fuel(self, delta_fuel, fuel_rate):
         self.shipparams_per_step.set_fuel_rate(np.vstack((fuel_rate, self.shipparams_per_step.get_fuel_rate())))
         self.absolutefuel_per_step = np.vstack((delta_fuel, self.absolutefuel_per_step))
@@ -1164,9 +1390,7 @@ class IsoBased(RoutingAlg):
             return
         self.showDepth = showDepth
         plt.rcParams['font.size'] = graphics.get_standard('font_size')
-        self.fig, self.ax = plt.subplots(figsize=graphics.get_standard('fig_size'))
-        self.ax.axis('off')
-        self.ax.xaxis.set_tick_params(labelsize='large')
+        self.depth = None
 
         if (self.showDepth):
             # decrease resolution and extend of depth data to prevent memory issues when plotting
@@ -1179,37 +1403,42 @@ class IsoBased(RoutingAlg):
                 (ds_depth_coarsened.longitude > map_size.lon1) & (ds_depth_coarsened.longitude < map_size.lon2) &
                 (ds_depth_coarsened.z < 0), drop=True)
 
-        self.fig, self.ax = graphics.generate_basemap(self.fig, self.depth, self.start, self.finish)
+        # the basemap is rendered once by the figure renderer and reused for the figures of all routing steps
+        self.figure_renderer = graphics.FigureRenderer(self.depth, self.start, self.finish, self.showDepth)
 
         final_path = self.figure_path + '/fig0.png'
         logger.info('Save start figure to ' + final_path)
-        plt.savefig(final_path)
+        self.figure_renderer.submit(final_path)
         return self.depth
 
     def update_fig(self, status):
         if self.figure_path is None:
             return
-        fig = self.fig
-        self.ax.remove()
-        fig, self.ax = graphics.generate_basemap(fig, self.depth, self.start, self.finish)
-
-        latitudes = self.lats_per_step.copy()
-        longitudes = self.lons_per_step.copy()
 
-        latitudes_T = latitudes.T
-        longitudes_T = longitudes.T
-        # Plotting each route
-        for lat_segment, lon_segment in zip(latitudes_T, longitudes_T):
-            self.ax.plot(lon_segment, lat_segment, color="orange", linestyle='-', linewidth=2.5)
-            # fig.canvas.draw()
-            # fig.canvas.flush_events()
+        # every column of lats_per_step/lons_per_step is plotted as one route
+        route_kwargs = {'color': 'orange', 'linestyle': '-', 'linewidth': 2.5}
 
         if self.pruning_error:
             final_path = self.figure_path + '/fig' + str(self.count) + status + '_error.png'
         else:
             final_path = self.figure_path + '/fig' + str(self.count) + status + '.png'
         logger.info('Save updated figure to ' + final_path)
-        plt.savefig(final_path)
+        self.figure_renderer.submit(final_path, [(self.lons_per_step, self.lats_per_step, route_kwargs)])
+
+    def close_fig(self):
+        """
+        Wait until all figures of the routing steps are written.
+        """
+        if self.figure_renderer is not None:
+            self.figure_renderer.close()
+            self.figure_renderer = None
+
+    def get_pruning_area_lines(self, symmetry_axis, lower_bound, upper_bound):
+        lines = []
+        for end_point in [symmetry_axis, lower_bound, upper_bound]:
+            lines.append(([self.start_temp[1], end_point['lon2'][0]], [self.start_temp[0], end_point['lat2'][0]],
+                          {'color': 'blue'}))
+        return lines
 
     def expand_axis_for_intermediate(self):
         self.lats_per_step = np.expand_dims(self.lats_per_step, axis=1)
@@ -1227,6 +1456,145 @@ class IsoBased(RoutingAlg):
     def update_dist(self, delta_time, bs):
         pass
 
+    def get_checkpoint_state(self, constraints_list):
+        """
+        Return the state of the routing at the start of the current routing step as dictionary of numpy arrays and
+        astropy quantities.
+        """
+        state = {
+            'count': self.count,
+            'start': np.array(self.start),
+            'finish': np.array(self.finish),
+            'start_temp': np.array(self.start_temp),
+            'finish_temp': np.array(self.finish_temp),
+            'gcr_course_temp': self.gcr_course_temp,
+            'current_positive': constraints_list.current_positive if constraints_list.have_positive() else -1,
+            'current_number_of_routes': self.current_number_of_routes,
+            'course_segments': self.course_segments,
+            'course_increments_deg': self.course_increments_deg,
+            'course_offsets': self.course_offsets,
+            'fuel_upper_bound': self.fuel_upper_bound,
+            'lats_per_step': self.lats_per_step,
+            'lons_per_step': self.lons_per_step,
+            'course_per_step': self.course_per_step,
+            'dist_per_step': self.dist_per_step,
+            'starttime_per_step': self.starttime_per_step,
+            'absolutefuel_per_step': self.absolutefuel_per_step,
+            'time': self.time,
+            'full_time_traveled': self.full_time_traveled,
+            'full_dist_traveled': self.full_dist_traveled,
+        }
+        for key, value in vars(self.shipparams_per_step).items():
+            if key != 'fuel_type':
+                state['shipparams_' + key] = value
+        return state
+
+    def set_checkpoint_state(self, state, constraints_list):
+        """
+        Restore the routing state from a checkpoint. Pruning settings are not part of the checkpoint and are taken
+        from the current config. The course fan is only restored if it is adapted during the routing.
+        """
+        if not (np.allclose(state['start'], self.start) and np.allclose(state['finish'], self.finish)):
+            raise ValueError('Checkpoint was written for a route from ' + str(tuple(state['start'])) + ' to ' +
+                             str(tuple(state['finish'])) + ' and can not be used for a route from ' +
+                             str(self.start) + ' to ' + str(self.finish) + '.')
+        current_positive = int(state['current_positive'])
+        if (current_positive >= 0) != constraints_list.have_positive():
+            raise ValueError('Intermediate waypoints of the checkpoint do not match the current config.')
+
+        self.count = int(state['count'])
+        self.start_temp = tuple(state['start_temp'])
+        self.finish_temp = tuple(state['finish_temp'])
+        self.gcr_course_temp = state['gcr_course_temp']
+        if current_positive >= 0:
+            constraints_list.current_positive = current_positive
+        self.current_number_of_routes = int(state['current_number_of_routes'])
+        if self.adaptive_courses:
+            self.set_course_segments(int(state['course_segments']), state['course_increments_deg'].to(u.degree).value)
+        self.course_offsets = state['course_offsets']
+        self.fuel_upper_bound = min(self.fuel_upper_bound, state['fuel_upper_bound'])
+
+        self.lats_per_step = state['lats_per_step']
+        self.lons_per_step = state['lons_per_step']
+        self.course_per_step = state['course_per_step']
+        self.dist_per_step = state['dist_per_step']
+        self.starttime_per_step = state['starttime_per_step']
+        self.absolutefuel_per_step = state['absolutefuel_per_step']
+        self.time = state['time']
+        self.full_time_traveled = state['full_time_traveled']
+        self.full_dist_traveled = state['full_dist_traveled']
+        for key in vars(self.shipparams_per_step):
+            if key != 'fuel_type':
+                setattr(self.shipparams_per_step, key, state['shipparams_' + key])
+        self.front_geometry = None
+
+    def write_checkpoint(self, constraints_list):
+        """
+        Write the routing state to <ROUTE_PATH>/checkpoints/isochrone_step_<count>.npz. Astropy quantities are stored
+        as values plus unit string. Routes that already reached the destination are written to
+        isochrone_step_<count>_route_<n>.json next to the checkpoint.
+        """
+        arrays = {}
+        for key, value in self.get_checkpoint_state(constraints_list).items():
+            if isinstance(value, u.Quantity):
+                arrays[key] = value.value
+                arrays[key + '__unit'] = str(value.unit)
+            elif key == 'shipparams_message':
+                arrays[key] = np.asarray(value, dtype=str)
+            else:
+                arrays[key] = value
+
+        checkpoint_folder = os.path.join(self.path_to_route_folder, 'checkpoints')
+        os.makedirs(checkpoint_folder, exist_ok=True)
+        basename = 'isochrone_step_' + str(self.count)
+        route_files = []
+        for iroute, route in enumerate(self.route_list):
+            route_file = basename + '_route_' + str(iroute + 1) + '.json'
+            route.return_route_to_API(os.path.join(checkpoint_folder, route_file))
+            route_files.append(route_file)
+        arrays['route_files'] = np.asarray(route_files, dtype=str)
+        arrays['route_counts'] = np.array([route.count for route in self.route_list], dtype=int)
+
+        filename = os.path.join(checkpoint_folder, basename + '.npz')
+        np.savez_compressed(filename, **arrays)
+        self.checkpoint_count = self.count
+        logger.info(form.get_log_step('Checkpoint written to ' + filename, 1))
+
+    def read_checkpoint(self, filename, constraints_list):
+        """
+        Resume the routing from a checkpoint written by write_checkpoint.
+        """
+        state = {}
+        with np.load(filename) as data:
+            for key in data.files:
+                if key.endswith('__unit'):
+                    continue
+                value = data[key]
+                if key + '__unit' in data.files:
+                    value = value * u.Unit(str(data[key + '__unit']))
+                state[key] = value
+
+        route_files = state.pop('route_files', np.array([], dtype=str))
+        route_counts = state.pop('route_counts', np.array([], dtype=int))
+        if len(route_files) != int(state['current_number_of_routes']):
+            raise ValueError('Checkpoint ' + filename + ' does not contain the ' +
+                             str(state['current_number_of_routes']) + ' routes that already reached the destination.')
+        checkpoint_folder = os.path.dirname(filename)
+        route_list = []
+        for route_file, route_count in zip(route_files, route_counts):
+            route_path = os.path.join(checkpoint_folder, str(route_file))
+            if not os.path.isfile(route_path):
+                raise ValueError('Route ' + route_path + ' of checkpoint ' + filename + ' is missing.')
+            route = RouteParams.from_file(route_path)
+            # from_file counts the last leg to the destination as routing step, the routing does not
+            route.count = int(route_count)
+            route_list.append(route)
+
+        self.set_checkpoint_state(state, constraints_list)
+        self.route_list = route_list
+        self.checkpoint_count = self.count
+        logger.info('Resuming routing at step ' + str(self.count) + ' from checkpoint ' + filename)
+
     def check_for_positive_constraints(self, constraint_list):
         have_pos_points = constraint_list.have_positive()
         if not have_pos_points:
@@ -1236,6 +1604,8 @@ class IsoBased(RoutingAlg):
             return
 
         constraint_list.init_positive_lists(self.start, self.finish)
+        self.geodesic.set_exact_points(constraint_list.positive_point_dict['lat'][1:],
+                                       constraint_list.positive_point_dict['lon'][1:])
         self.finish_temp = constraint_list.get_current_destination()
         self.start_temp = constraint_list.get_current_start()
         self.gcr_course_temp = self.calculate_gcr(self.start_temp, self.finish_temp) * u.degree
@@ -1,7 +1,5 @@
-import datetime as dt
 import logging
 
-from geovectorslib import geod
 import numpy as np
 from astropy import units as u
 
@@ -14,14 +12,76 @@ logger = logging.getLogger('WRT.routingalg')
 
 class IsoFuel(IsoBased):
     delta_fuel: float  # fuel available to the boat per routing step and segment (kg)
+    delta_fuel_base: float  # configured fuel per routing step (kg)
+    delta_fuel_adaptive: bool  # adapt the fuel per routing step to constraints and weather
+    delta_fuel_factor: float  # current ratio of delta_fuel and delta_fuel_base
+    delta_fuel_factor_min: float  # minimal ratio of delta_fuel and delta_fuel_base
+    delta_fuel_factor_max: float  # maximal ratio of delta_fuel and delta_fuel_base
+    wind_speed_tolerance: float  # change of wind speed per routing step that triggers a smaller step size
+    wave_height_tolerance: float  # change of wave height per routing step that triggers a smaller step size
 
     def __init__(self, config):
         self.delta_fuel = config.DELTA_FUEL * u.kg
+        self.delta_fuel_base = self.delta_fuel
+        self.delta_fuel_adaptive = config.DELTA_FUEL_ADAPTIVE
+        self.delta_fuel_factor = 1.
+        self.delta_fuel_factor_min = config.DELTA_FUEL_FACTOR_MIN
+        self.delta_fuel_factor_max = config.DELTA_FUEL_FACTOR_MAX
+        self.wind_speed_tolerance = 2 * u.meter / u.second
+        self.wave_height_tolerance = 0.5 * u.meter
         super().__init__(config)
 
     def print_init(self):
         IsoBased.print_init(self)
         logger.info(form.get_log_step('Fuel minimisation, delta power: ' + str(self.delta_fuel), 1))
+        if self.delta_fuel_adaptive:
+            logger.info(form.get_log_step('adaptive delta power between ' +
+                                          str(self.delta_fuel_base * self.delta_fuel_factor_min) + ' and ' +
+                                          str(self.delta_fuel_base * self.delta_fuel_factor_max), 1))
+
+    def adapt_step_size(self, ship_params, is_constrained):
+        """
+        Adapt the fuel per routing step for the next routing step. The step size is halved if route segments of the
+        current step are constrained, i.e. if the isochrone is close to land, shallow water or other constraints, or
+        if the weather changes strongly along the route segments of the previous step. The latter is measured by the
+        change of wind speed and wave height between the start points of the previous and the current routing step.
+        If no route segment is constrained and the weather changes by less than half of the tolerances, the step
+        size is doubled. The step size is kept within DELTA_FUEL_FACTOR_MIN and DELTA_FUEL_FACTOR_MAX times
+        DELTA_FUEL.
+        """
+        if not self.delta_fuel_adaptive or self.count == 0:
+            return
+
+        is_constrained = np.asarray(is_constrained)
+        wind_speed = np.hypot(ship_params.get_u_wind_speed(), ship_params.get_v_wind_speed())
+        wind_speed_prev = np.hypot(self.shipparams_per_step.get_u_wind_speed()[0, :],
+                                   self.shipparams_per_step.get_v_wind_speed()[0, :])
+        wave_height_change = np.abs(ship_params.get_wave_height() - self.shipparams_per_step.get_wave_height()[0, :])
+
+        weather_change = max(np.nanmax(np.abs(wind_speed - wind_speed_prev) / self.wind_speed_tolerance),
+                             np.nanmax(wave_height_change / self.wave_height_tolerance))
+        weather_change = weather_change.to(u.dimensionless_unscaled).value
+
+        if np.any(is_constrained) or weather_change > 1:
+            self.delta_fuel_factor = max(self.delta_fuel_factor / 2, self.delta_fuel_factor_min)
+        elif weather_change < 0.5:
+            self.delta_fuel_factor = min(self.delta_fuel_factor * 2, self.delta_fuel_factor_max)
+        self.delta_fuel = self.delta_fuel_base * self.delta_fuel_factor
+
+        logger.info(form.get_log_step('constrained route segments: ' + str(np.sum(is_constrained)) +
+                                      ', relative weather change: ' + str(round(weather_change, 2)) +
+                                      ', delta power for next step: ' + str(self.delta_fuel), 1))
+
+    def get_checkpoint_state(self, constraints_list):
+        state = super().get_checkpoint_state(constraints_list)
+        state['delta_fuel_factor'] = self.delta_fuel_factor
+        return state
+
+    def set_checkpoint_state(self, state, constraints_list):
+        super().set_checkpoint_state(state, constraints_list)
+        if self.delta_fuel_adaptive:
+            self.delta_fuel_factor = float(state['delta_fuel_factor'])
+            self.delta_fuel = self.delta_fuel_base * self.delta_fuel_factor
 
     def check_isochrones(self, route: RouteParams):
         logger.info('To be implemented')
@@ -64,14 +124,11 @@ class IsoFuel(IsoBased):
     # returns fuel (= power) [W], dist [m], delta_time [s], delta_fuel [Ws]
     def get_delta_variables_netCDF_last_step(self, ship_params, bs):
         fuel_rate = ship_params.get_fuel_rate()
-        dist = geod.inverse(self.get_current_lats(), self.get_current_lons(),
-                            np.full(self.get_current_lats().shape, self.finish_temp[0]),
-                            np.full(self.get_current_lons().shape, self.finish_temp[1]))
-        dist['s12'] = dist['s12'] * u.meter
-        delta_time = self.get_time(bs, dist['s12'])
+        dist = self.get_front_geometry('to_dest')['s12'] * u.meter
+        delta_time = self.get_time(bs, dist)
         delta_fuel = fuel_rate * delta_time
 
-        return delta_time, delta_fuel, dist['s12']
+        return delta_time, delta_fuel, dist
 
     def determine_timespread(self, delta_time):
         stddev = np.std(delta_time)
@@ -82,9 +139,8 @@ class IsoFuel(IsoBased):
     def update_time(self, delta_time):
         if not ((self.full_time_traveled.shape == delta_time.shape) and (self.time.shape == delta_time.shape)):
             raise ValueError('shapes of delta_time, time and full_time_traveled not matching!')
-        for i in range(0, self.full_time_traveled.shape[0]):
-            self.full_time_traveled[i] += delta_time[i]
-            self.time[i] += dt.timedelta(seconds=delta_time[i].value)
+        self.full_time_traveled = self.full_time_traveled + delta_time
+        self.time = self.time + self.get_timedelta64(delta_time)
         self.starttime_per_step = np.vstack((self.time, self.starttime_per_step))
 
     def final_pruning(self):
@@ -110,6 +166,7 @@ class IsoFuel(IsoBased):
             self.shipparams_per_step.select(idxs)
 
             self.current_course = self.current_course[idxs]
+            self.course_offsets = self.course_offsets[idxs]
             self.full_dist_traveled = self.full_dist_traveled[idxs]
             self.full_time_traveled = self.full_time_traveled[idxs]
             self.time = self.time[idxs]
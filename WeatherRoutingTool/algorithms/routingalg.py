@@ -54,6 +54,12 @@ class RoutingAlg:
     def init_fig(self, **kwargs):
         pass
 
+    def disable_figures(self):
+        """
+        Do not write any figures, e.g. if several routings share the figure folder.
+        """
+        self.figure_path = None
+
     def update_fig(self):
         pass
 
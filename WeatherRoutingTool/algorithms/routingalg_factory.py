@@ -1,6 +1,7 @@
 import logging
 
 import WeatherRoutingTool.utils.formatting as form
+from WeatherRoutingTool.algorithms.coarse_to_fine import CoarseToFineIsoFuel
 from WeatherRoutingTool.algorithms.genetic import Genetic
 from WeatherRoutingTool.algorithms.isofuel import IsoFuel
 
@@ -18,7 +19,10 @@ class RoutingAlgFactory:
         form.print_line()
 
         if (config.ALGORITHM_TYPE == 'isofuel') or (config.ALGORITHM_TYPE == 'speedy_isobased'):
-            ra = IsoFuel(config)
+            if config.ISOCHRONE_COARSE_TO_FINE:
+                ra = CoarseToFineIsoFuel(config)
+            else:
+                ra = IsoFuel(config)
 
         if config.ALGORITHM_TYPE == 'genetic':
             ra = Genetic(config)
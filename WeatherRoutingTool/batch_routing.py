@@ -0,0 +1,170 @@
+import copy
+import json
+import logging
+import multiprocessing
+import os
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+import WeatherRoutingTool.utils.formatting as form
+from WeatherRoutingTool.algorithms.routingalg_factory import RoutingAlgFactory
+from WeatherRoutingTool.constraints.constraints import ConstraintsListFactory
+from WeatherRoutingTool.ship.ship_factory import ShipFactory
+from WeatherRoutingTool.utils.maps import Map
+from WeatherRoutingTool.weather_factory import WeatherFactory
+
+logger = logging.getLogger('WRT.BatchRouting')
+
+# environment shared with the worker processes; set before the process pool is forked such that the workers access
+# the data loaded by the parent process via copy-on-write
+_shared_env = None
+
+
+class BatchRouting:
+    """
+    Routing for a list of origin-destination pairs within the same DEFAULT_MAP and weather data.
+
+    Weather data, boat and constraints are loaded once by the parent process. The routes are distributed across a pool
+    of forked worker processes that inherit the loaded environment. The route of every origin-destination pair is
+    written to ROUTE_PATH/batch and a summary of all routes to ROUTE_PATH/batch_summary.csv. A route for which the
+    routing fails is marked in the summary and does not abort the batch.
+
+    The list of routes can be provided as CSV file with the columns lat_start, lon_start, lat_end, lon_end and an
+    optional column name, or as JSON file containing a list of objects with the same keys.
+    """
+
+    config: object
+    routes: pd.DataFrame  # origin-destination pairs
+    processes: int  # number of worker processes
+
+    def __init__(self, config, routes_file, processes=1):
+        self.config = config
+        self.routes = self.read_routes(routes_file)
+        self.processes = processes
+
+        if self.processes > 1 and 'fork' not in multiprocessing.get_all_start_methods():
+            logger.warning('Process start method "fork" is not available. Routes are processed sequentially.')
+            self.processes = 1
+
+    @staticmethod
+    def read_routes(routes_file):
+        if routes_file.endswith('.json'):
+            with open(routes_file) as file:
+                routes = pd.DataFrame(json.load(file))
+        else:
+            routes = pd.read_csv(routes_file)
+
+        missing = {'lat_start', 'lon_start', 'lat_end', 'lon_end'} - set(routes.columns)
+        if missing:
+            raise ValueError('The list of routes in ' + routes_file + ' misses the columns ' + str(sorted(missing)))
+        if 'name' not in routes.columns:
+            routes['name'] = ['route_' + str(i) for i in range(routes.shape[0])]
+        return routes
+
+    def load_environment(self):
+        """
+        Load weather data, boat and constraints which are shared by the routings of all origin-destination pairs.
+        """
+        lat1, lon1, lat2, lon2 = self.config.DEFAULT_MAP
+        default_map = Map(lat1, lon1, lat2, lon2)
+        departure_time = datetime.strptime(self.config.DEPARTURE_TIME, '%Y-%m-%dT%H:%MZ')
+
+        wt = WeatherFactory.get_weather(self.config.DATA_MODE, self.config.WEATHER_DATA, departure_time,
+                                        self.config.TIME_FORECAST, self.config.DELTA_TIME_FORECAST, default_map)
+        boat = ShipFactory.get_ship(self.config)
+        constraints_list = ConstraintsListFactory.from_config(self.config, boat)
+        return {'config': self.config, 'wt': wt, 'boat': boat, 'constraints_list': constraints_list,
+                'output_folder': os.path.join(self.config.ROUTE_PATH, 'batch')}
+
+    def execute_batch(self):
+        """
+        Run the routing for all origin-destination pairs.
+
+        :return: summary of all routes (pandas.DataFrame)
+        """
+        global _shared_env
+
+        logger.info('Batch routing for ' + str(self.routes.shape[0]) + ' routes with ' + str(self.processes) +
+                    ' process(es)')
+        _shared_env = self.load_environment()
+        os.makedirs(_shared_env['output_folder'], exist_ok=True)
+
+        od_columns = ['name', 'lat_start', 'lon_start', 'lat_end', 'lon_end']
+        od_pairs = list(self.routes[od_columns].itertuples(index=False, name=None))
+        try:
+            if self.processes > 1:
+                with multiprocessing.get_context('fork').Pool(self.processes) as pool:
+                    rows = pool.map(route_od_pair, od_pairs, chunksize=1)
+            else:
+                rows = [route_od_pair(od_pair) for od_pair in od_pairs]
+        finally:
+            _shared_env = None
+
+        summary = pd.DataFrame(rows)
+        summary_path = os.path.join(self.config.ROUTE_PATH, 'batch_summary.csv')
+        summary.to_csv(summary_path, index=False)
+        logger.info('Write summary of batch routing to ' + summary_path)
+        logger.info(form.get_log_step(str(int((summary['status'] == 'ok').sum())) + ' of ' + str(summary.shape[0]) +
+                                      ' routes calculated successfully', 1))
+        return summary
+
+
+def route_od_pair(od_pair):
+    """
+    Route a single origin-destination pair using the environment loaded by BatchRouting.load_environment.
+
+    :param od_pair: tuple (name, lat_start, lon_start, lat_end, lon_end)
+    :return: summary of the route (dict)
+    """
+    name, lat_start, lon_start, lat_end, lon_end = od_pair
+    row = {'name': name, 'lat_start': lat_start, 'lon_start': lon_start, 'lat_end': lat_end, 'lon_end': lon_end,
+           'fuel_kg': np.nan, 'travel_time_h': np.nan, 'distance_km': np.nan, 'reached_destination': False}
+
+    start_time = time.time()
+    courses_path = get_worker_courses_path(_shared_env['boat'])
+    try:
+        config = copy.copy(_shared_env['config'])
+        config.DEFAULT_ROUTE = [lat_start, lon_start, lat_end, lon_end]
+        alg = RoutingAlgFactory.get_routing_alg(config)
+        # per-step figures of the different routes would overwrite each other
+        alg.disable_figures()
+
+        # constraints that are added during the routing must not affect the routing of the other pairs
+        boat = _shared_env['boat']
+        constraints_list = _shared_env['constraints_list'].get_routing_copy()
+        if courses_path is not None:
+            boat = copy.copy(boat)
+            boat.set_courses_path(courses_path)
+            constraints_list.set_courses_path(courses_path)
+        route = alg.execute_routing(boat, _shared_env['wt'], constraints_list)
+        route.return_route_to_API(os.path.join(_shared_env['output_folder'], str(name) + '.json'))
+
+        row['fuel_kg'] = route.get_full_fuel().value
+        row['travel_time_h'] = np.sum(route.get_time_passed_per_step()).value / 3600
+        row['distance_km'] = route.get_full_dist().value / 1000
+        row['reached_destination'] = bool(np.isclose(route.lats_per_step[-1], lat_end) and
+                                          np.isclose(route.lons_per_step[-1], lon_end))
+        row['status'] = 'ok'
+    except Exception as err:
+        logger.error('Routing of ' + str(name) + ' failed: ' + repr(err))
+        row['status'] = 'failed: ' + repr(err)
+    finally:
+        if courses_path is not None and os.path.exists(courses_path):
+            os.remove(courses_path)
+    row['runtime_s'] = time.time() - start_time
+    return row
+
+
+def get_worker_courses_path(boat):
+    """
+    Return the path of the courses netCDF of the current worker process if the boat exchanges courses and ship
+    parameters with the hydrodynamic model via this file (Tanker). The worker processes would otherwise overwrite each
+    others files. Returns None for all other boats.
+    """
+    if not hasattr(boat, 'set_courses_path'):
+        return None
+    root, ext = os.path.splitext(boat.courses_path)
+    return root + '_' + str(os.getpid()) + ext
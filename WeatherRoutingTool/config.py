@@ -16,15 +16,32 @@ RECOMMENDED_CONFIG_VARIABLES = {
 OPTIONAL_CONFIG_VARIABLES = {
     'ALGORITHM_TYPE': 'isofuel',
     'CONSTRAINTS_LIST': ['land_crossing_global_land_mask', 'water_depth', 'on_map'],
+    'CONSTRAINT_CACHE_PRECISION': 1e-5,
+    'CONSTRAINT_CACHE_SIZE': 0,
+    'CONSTRAINT_RASTER_CACHE': None,
+    'CONSTRAINT_RASTER_RESOLUTION': None,
     'DATA_MODE': 'automatic',
     'DELTA_FUEL': 3000,
+    'DELTA_FUEL_ADAPTIVE': False,
+    'DELTA_FUEL_FACTOR_MAX': 4,
+    'DELTA_FUEL_FACTOR_MIN': 0.25,
     'DELTA_TIME_FORECAST': 3,
+    'DEPARTURE_TIME_SWEEP_INTERVAL': 6,
+    'DEPARTURE_TIME_SWEEP_SLOTS': 1,
+    'GEODESIC_APPROX_MAX_DIST': 50000,
+    'GEODESIC_METHOD': 'exact',
     'GENETIC_MUTATION_TYPE': 'grid_based',
     'GENETIC_NUMBER_GENERATIONS': 20,
     'GENETIC_NUMBER_OFFSPRINGS': 2,
     'GENETIC_POPULATION_SIZE': 20,
     'GENETIC_POPULATION_TYPE': 'grid_based',
     'INTERMEDIATE_WAYPOINTS': [],
+    'ISOCHRONE_BOUND_PRUNING': False,
+    'ISOCHRONE_CHECKPOINT_STEPS': 0,
+    'ISOCHRONE_COARSE_CORRIDOR_WIDTH': 200000,
+    'ISOCHRONE_COARSE_DELTA_FUEL_FACTOR': 4,
+    'ISOCHRONE_COARSE_HDGS_SEGMENTS': 10,
+    'ISOCHRONE_COARSE_TO_FINE': False,
     'ISOCHRONE_MAX_ROUTING_STEPS': 100,
     'ISOCHRONE_MINIMISATION_CRITERION': 'squareddist_over_disttodest',
     'ISOCHRONE_NUMBER_OF_ROUTES': 1,
@@ -32,9 +49,17 @@ OPTIONAL_CONFIG_VARIABLES = {
     'ISOCHRONE_PRUNE_SYMMETRY_AXIS': 'gcr',
     'ISOCHRONE_PRUNE_SECTOR_DEG_HALF': 91,
     'ISOCHRONE_PRUNE_SEGMENTS': 20,
+    'ISOCHRONE_RESUME_FILE': None,
+    'REROUTING_CORRIDOR_WIDTH': 200000,
+    'ROUTER_HDGS_ADAPTIVE': False,
     'ROUTER_HDGS_INCREMENTS_DEG': 6,
+    'ROUTER_HDGS_INCREMENTS_DEG_MIN': 1,
     'ROUTER_HDGS_SEGMENTS': 30,
+    'ROUTER_HDGS_SEGMENTS_MIN': 4,
     'ROUTE_POSTPROCESSING': False,
+    'SPATIAL_CACHE_OFFLINE': False,
+    'SPATIAL_CACHE_PATH': None,
+    'SPATIAL_DATA_VERSION': '',
     'TIME_FORECAST': 90,
 }
 
@@ -52,31 +77,56 @@ class Config:
         self.CONFIG_PATH = None  # path to config file
         self.CONSTRAINTS_LIST = None  # options: 'land_crossing_global_land_mask', 'land_crossing_polygons', 'seamarks',
         # 'water_depth', 'on_map', 'via_waypoints', 'status_error'
+        self.CONSTRAINT_CACHE_PRECISION = None  # precision of the segment coordinates in the constraint cache (degree)
+        self.CONSTRAINT_CACHE_SIZE = None  # max. number of segments in the cache of static constraints (0: off)
+        self.CONSTRAINT_RASTER_CACHE = None  # folder in which compiled constraint rasters are cached
+        self.CONSTRAINT_RASTER_RESOLUTION = None  # resolution of the raster of static constraints (degree; None: off)
         self.COURSES_FILE = None  # path to file that acts as intermediate storage for courses per routing step
         self.DATA_MODE = None  # options: 'automatic', 'from_file', 'odc'
         self.DEFAULT_MAP = None  # bbox in which route optimization is performed (lat_min, lon_min, lat_max, lon_max)
         self.DEFAULT_ROUTE = None  # start and end point of the route (lat_start, lon_start, lat_end, lon_end)
         self.DELTA_FUEL = None  # amount of fuel per routing step (kg)
+        self.DELTA_FUEL_ADAPTIVE = None  # adapt amount of fuel per routing step to constraints and weather
+        self.DELTA_FUEL_FACTOR_MAX = None  # maximal amount of fuel per routing step relative to DELTA_FUEL
+        self.DELTA_FUEL_FACTOR_MIN = None  # minimal amount of fuel per routing step relative to DELTA_FUEL
         self.DELTA_TIME_FORECAST = None  # time resolution of weather forecast (hours)
         self.DEPARTURE_TIME = None  # start time of travelling, format: 'yyyy-mm-ddThh:mmZ'
+        self.DEPARTURE_TIME_SWEEP_INTERVAL = None  # time between two departure times of the sweep (hours)
+        self.DEPARTURE_TIME_SWEEP_SLOTS = None  # number of departure times starting at DEPARTURE_TIME to compare
         self.DEPTH_DATA = None  # path to depth data
+        self.GEODESIC_APPROX_MAX_DIST = None  # max. leg length for 'local' geodesics & radius around waypoints (m)
+        self.GEODESIC_METHOD = None  # options: 'exact', 'haversine', 'local'
         self.GENETIC_MUTATION_TYPE = None  # type for mutation (options: 'grid_based')
         self.GENETIC_NUMBER_GENERATIONS = None  # number of generations for genetic algorithm
         self.GENETIC_NUMBER_OFFSPRINGS = None  # number of offsprings for genetic algorithm
         self.GENETIC_POPULATION_SIZE = None  # population size for genetic algorithm
         self.GENETIC_POPULATION_TYPE = None  # type for initial population (options: 'grid_based', 'from_geojson')
         self.INTERMEDIATE_WAYPOINTS = None  # [[lat_one,lon_one], [lat_two,lon_two] ... ]
+        self.ISOCHRONE_BOUND_PRUNING = None  # discard route segments that can not beat the best known complete route
+        self.ISOCHRONE_CHECKPOINT_STEPS = None  # write a checkpoint of the isochrone state every N steps (0: off)
+        self.ISOCHRONE_COARSE_CORRIDOR_WIDTH = None  # width of the corridor around the coarse route (m)
+        self.ISOCHRONE_COARSE_DELTA_FUEL_FACTOR = None  # DELTA_FUEL of the coarse pass relative to DELTA_FUEL
+        self.ISOCHRONE_COARSE_HDGS_SEGMENTS = None  # number of headings of the coarse pass (put even number!!)
+        self.ISOCHRONE_COARSE_TO_FINE = None  # coarse routing pass followed by refined pass in a corridor around it
         self.ISOCHRONE_MAX_ROUTING_STEPS = None  # maximum number of routing steps
         self.ISOCHRONE_MINIMISATION_CRITERION = None  # options: 'dist', 'squareddist_over_disttodest'
         self.ISOCHRONE_NUMBER_OF_ROUTES = None  # integer specifying how many routes should be searched
-        self.ISOCHRONE_PRUNE_GROUPS = None  # can be 'courses', 'larger_direction', 'branch'
+        self.ISOCHRONE_PRUNE_GROUPS = None  # can be 'courses', 'larger_direction', 'branch', 'grid'
         self.ISOCHRONE_PRUNE_SECTOR_DEG_HALF = None  # half of the angular range of azimuth angle considered for pruning; not used for branch-based pruning  # noqa: E501
-        self.ISOCHRONE_PRUNE_SEGMENTS = None  # total number of azimuth bins used for pruning in prune sector; not used for branch-based pruning  # noqa: E501
+        self.ISOCHRONE_PRUNE_SEGMENTS = None  # total number of azimuth bins used for pruning in prune sector; number of grid cells along the largest extent of the isochrone for grid-based pruning; not used for branch-based pruning  # noqa: E501
         self.ISOCHRONE_PRUNE_SYMMETRY_AXIS = None  # symmetry axis for pruning. Can be 'gcr' or 'headings_based'; not used for branch-based pruning  # noqa: E501
-        self.ROUTER_HDGS_INCREMENTS_DEG = None  # increment of headings
-        self.ROUTER_HDGS_SEGMENTS = None  # total number of headings (put even number!!)
+        self.ISOCHRONE_RESUME_FILE = None  # path to checkpoint from which the isochrone routing is resumed
+        self.REROUTING_CORRIDOR_WIDTH = None  # width of the corridor around the previous route for re-routing (m)
+        self.ROUTER_HDGS_ADAPTIVE = None  # adapt number and increment of headings to the headings surviving the pruning
+        self.ROUTER_HDGS_INCREMENTS_DEG = None  # increment of headings (maximum for adaptive headings)
+        self.ROUTER_HDGS_INCREMENTS_DEG_MIN = None  # minimal increment of headings for adaptive headings
+        self.ROUTER_HDGS_SEGMENTS = None  # total number of headings (put even number!!) (maximum for adaptive headings)
+        self.ROUTER_HDGS_SEGMENTS_MIN = None  # minimal number of headings for adaptive headings (put even number!!)
         self.ROUTE_PATH = None  # path to json file to which the route will be written
         self.ROUTE_POSTPROCESSING = None  # Route is postprocessed with Traffic Separation Scheme
+        self.SPATIAL_CACHE_OFFLINE = None  # read seamark and land-polygon data only from SPATIAL_CACHE_PATH
+        self.SPATIAL_CACHE_PATH = None  # folder in which results of database queries are cached
+        self.SPATIAL_DATA_VERSION = None  # version of the data in the database; a new version invalidates the cache
         self.TIME_FORECAST = None  # forecast hours weather
         self.WEATHER_DATA = None  # path to weather data
 
@@ -1,5 +1,10 @@
+import copy
+import hashlib
+import json
 import os
 import logging
+import threading
+from collections import OrderedDict
 
 import cartopy.crs as ccrs
 import cartopy.feature as cf
@@ -8,6 +13,7 @@ import geopandas as gpd
 import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
+import shapely
 import sqlalchemy
 import xarray as xr
 from global_land_mask import globe
@@ -17,6 +23,7 @@ from shapely.strtree import STRtree
 import WeatherRoutingTool.utils.graphics as graphics
 import WeatherRoutingTool.utils.formatting as form
 from maridatadownloader import DownloaderFactory
+from WeatherRoutingTool.constraints.spatial_cache import SpatialQueryCache, get_spatial_cache
 from WeatherRoutingTool.routeparams import RouteParams
 from WeatherRoutingTool.utils.maps import Map
 from WeatherRoutingTool.weather import WeatherCond
@@ -113,10 +120,43 @@ class PositiveConstraintPoint(PositiveConstraint):
 
 
 class NegativeContraint(Constraint):
+    # True if the constraint does not depend on time: static discrete constraints can be combined in
+    # StaticConstraintRaster and the results of static constraints can be stored in the ConstraintResultCache
+    is_static = False
+    # relative computing time per point (segment for continuous constraints); cheaper constraints are checked first
+    relative_cost = 10
+    # False if the result for a point/segment depends on all points/segments passed at once; such constraints are
+    # always evaluated for all of them, otherwise only for points/segments that are not constrained yet
+    supports_masking = True
+
     def __init__(self, name):
         Constraint.__init__(self, name)
         self.message = "At least one point discarded as "
 
+    def get_static_key(self):
+        """
+        Return a string which identifies the settings of a static constraint, used to identify cached rasters.
+        """
+        return self.name
+
+    def classify_cells(self, lat_min, lat_max, lon_min, lon_max):
+        """
+        Classify the cells with the bounds lat_min[i], lat_max[i], lon_min[j], lon_max[j] (degree) at the resolution
+        of the source data of a static constraint: StaticConstraintRaster.FREE if no point of a cell is constrained,
+        StaticConstraintRaster.CONSTRAINED if all points are constrained and StaticConstraintRaster.BOUNDARY otherwise.
+
+        :return: numpy array of flags with shape (lat, lon) or None if the cells can not be classified from the
+            source data, in which case they are classified by sampling the constraint
+        """
+        return None
+
+    def get_source_spacing(self):
+        """
+        Return the spacing (degree) of the source data of a static constraint or None if the constraint does not
+        depend on gridded data.
+        """
+        return None
+
 
 class NegativeConstraintFromWeather(NegativeContraint):
     wt: WeatherCond
@@ -145,10 +185,85 @@ class ConstraintPars:
         logger.info(form.get_log_step("bCheckEndPoints=" + str(self.bCheckEndPoints), 1))
 
 
+class ConstraintResultCache:
+    """
+    LRU cache for the results of the static constraints on routing segments. Segments are identified by their start
+    and end coordinates rounded to multiples of precision (degree), such that segments which start and end within
+    the same rounding intervals share one entry. If the cache holds more than max_size segments, the least recently
+    used ones are discarded. The cache can be shared by several routings running in parallel threads.
+    """
+
+    max_size: int  # maximum number of cached segments
+    precision: float  # precision of the coordinates used as keys (degree)
+    results: OrderedDict  # cached results, from least to most recently used
+    hits: int
+    misses: int
+
+    def __init__(self, max_size, precision):
+        if max_size <= 0 or precision <= 0:
+            raise ValueError('Size and precision of the constraint cache need to be positive.')
+        self.max_size = max_size
+        self.precision = precision
+        self.results = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def get_keys(self, lat_start, lon_start, lat_end, lon_end):
+        coords = np.column_stack((lat_start, lon_start, lat_end, lon_end))
+        return list(map(tuple, np.round(coords / self.precision).astype(np.int64).tolist()))
+
+    def lookup(self, keys):
+        """
+        Return the cached results for the keys (False if not cached) and a mask of the keys which are not cached.
+        """
+        is_constrained = np.full(len(keys), False)
+        is_missing = np.full(len(keys), True)
+        with self.lock:
+            for ikey, key in enumerate(keys):
+                result = self.results.get(key)
+                if result is not None:
+                    self.results.move_to_end(key)
+                    is_constrained[ikey] = result
+                    is_missing[ikey] = False
+            n_missing = int(is_missing.sum())
+            self.hits += len(keys) - n_missing
+            self.misses += n_missing
+        return is_constrained, is_missing
+
+    def store(self, keys, is_constrained):
+        with self.lock:
+            for key, result in zip(keys, is_constrained.tolist()):
+                self.results[key] = result
+                self.results.move_to_end(key)
+            while len(self.results) > self.max_size:
+                self.results.popitem(last=False)
+
+    def print_statistics(self):
+        n_requests = self.hits + self.misses
+        hit_rate = 100 * self.hits / n_requests if n_requests > 0 else 0
+        logger.info('Constraint cache: ' + str(self.hits) + ' hits, ' + str(self.misses) + ' misses (hit rate ' +
+                    '{:.1f}'.format(hit_rate) + '%), ' + str(len(self.results)) + ' cached segments')
+
+
 class ConstraintsListFactory:
     def __init__(self):
         pass
 
+    @staticmethod
+    def from_config(config, boat):
+        """
+        Return the constraints list for the constraints of config.CONSTRAINTS_LIST within config.DEFAULT_MAP.
+        """
+        lat1, lon1, lat2, lon2 = config.DEFAULT_MAP
+        return ConstraintsListFactory.get_constraints_list(
+            constraints_string_list=config.CONSTRAINTS_LIST, data_mode=config.DATA_MODE,
+            min_depth=boat.get_required_water_depth(), map_size=Map(lat1, lon1, lat2, lon2),
+            depthfile=config.DEPTH_DATA, waypoints=config.INTERMEDIATE_WAYPOINTS, courses_path=config.COURSES_FILE,
+            raster_resolution=config.CONSTRAINT_RASTER_RESOLUTION, raster_cache=config.CONSTRAINT_RASTER_CACHE,
+            spatial_cache=get_spatial_cache(config), cache_size=config.CONSTRAINT_CACHE_SIZE,
+            cache_precision=config.CONSTRAINT_CACHE_PRECISION)
+
     @staticmethod
     def get_constraints_list(constraints_string_list, **kwargs):
         pars = ConstraintPars()
@@ -156,12 +271,12 @@ class ConstraintsListFactory:
         is_stay_on_map = False
 
         if 'land_crossing_global_land_mask' in constraints_string_list:
-            land_crossing = LandCrossing()
+            land_crossing = LandCrossing(kwargs.get('map_size'))
             constraints_list.add_neg_constraint(land_crossing)
 
         if 'land_crossing_polygons' in constraints_string_list:
             map_size = kwargs.get('map_size')
-            land_crossing_polygons = LandPolygonsCrossing(map_size)
+            land_crossing_polygons = LandPolygonsCrossing(map_size, spatial_cache=kwargs.get('spatial_cache'))
             constraints_list.add_neg_constraint(land_crossing_polygons, 'continuous')
 
         if 'water_depth' in constraints_string_list:
@@ -193,11 +308,20 @@ class ConstraintsListFactory:
 
         if 'seamarks' in constraints_string_list:
             if is_stay_on_map:
-                seamarks = SeamarkCrossing(is_stay_on_map, map_size)
+                seamarks = SeamarkCrossing(is_stay_on_map, map_size, spatial_cache=kwargs.get('spatial_cache'))
             else:
-                seamarks = SeamarkCrossing()
+                seamarks = SeamarkCrossing(spatial_cache=kwargs.get('spatial_cache'))
             constraints_list.add_neg_constraint(seamarks, 'continuous')
 
+        if kwargs.get('raster_resolution'):
+            if 'map_size' not in kwargs:
+                raise ValueError('To use the constraint raster, you need to provide the map size.')
+            constraints_list.init_static_raster(kwargs.get('map_size'), kwargs.get('raster_resolution'),
+                                                kwargs.get('raster_cache'))
+
+        if kwargs.get('cache_size'):
+            constraints_list.init_result_cache(kwargs.get('cache_size'), kwargs.get('cache_precision', 1e-5))
+
         if 'via_waypoints' in constraints_string_list:
             if 'waypoints' not in kwargs:
                 raise ValueError('To use the waypoints constraint module, you need to provide the waypoints.')
@@ -224,6 +348,7 @@ class ConstraintsList:
 
     constraints_crossed: list
     weather: WeatherCond
+    result_cache: ConstraintResultCache  # cache for the results of static constraints (optional)
 
     def __init__(self, pars):
         self.pars = pars
@@ -231,10 +356,35 @@ class ConstraintsList:
         self.negative_constraints_discrete = []
         self.negative_constraints_continuous = []
         self.constraints_crossed = []
+        self.result_cache = None
         self.neg_dis_size = 0
         self.neg_cont_size = 0
         self.pos_size = 0
 
+    def get_routing_copy(self):
+        """
+        Return a copy of the constraints list which shares the (read-only) constraints but has its own lists of
+        constraints and its own routing state. Constraints that are added during a routing (e.g. the RouteCorridor
+        of CoarseToFineIsoFuel) do then not affect other routings that use the same constraints list.
+        """
+        constraints_list = copy.copy(self)
+        constraints_list.positive_constraints = list(self.positive_constraints)
+        constraints_list.negative_constraints_discrete = list(self.negative_constraints_discrete)
+        constraints_list.negative_constraints_continuous = list(self.negative_constraints_continuous)
+        constraints_list.constraints_crossed = []
+        return constraints_list
+
+    def set_courses_path(self, courses_path):
+        """
+        Let the StatusCodeError constraints read the courses netCDF from courses_path. The constraints are replaced
+        by copies such that other copies of the constraints list (see get_routing_copy) are not affected.
+        """
+        for iconst, constraint in enumerate(self.negative_constraints_continuous):
+            if isinstance(constraint, StatusCodeError):
+                constraint = copy.copy(constraint)
+                constraint.courses_path = courses_path
+                self.negative_constraints_continuous[iconst] = constraint
+
     def print_constraints_crossed(self):
         logger.info("Discarding point as:")
         for iConst in range(0, len(self.constraints_crossed)):
@@ -329,64 +479,130 @@ class ConstraintsList:
         return is_constrained
 
     def safe_crossing(self, lat_start, lon_start, lat_end, lon_end, current_time, is_constrained):
-        is_constrained_discrete = is_constrained
-        is_constrained_continuous = is_constrained
-        is_constrained_discrete = self.safe_crossing_discrete(lat_start, lon_start, lat_end, lon_end, current_time,
-                                                              is_constrained)
-        is_constrained_continuous = self.safe_crossing_continuous(lat_start, lon_start, lat_end, lon_end,
-                                                                  is_constrained)
-
-        # TO BE UPDATED
-        is_constrained_array = np.array(is_constrained) | np.array(is_constrained_discrete) \
-                                                        | np.array(is_constrained_continuous)
-        is_constrained = is_constrained_array.tolist()
+        """
+        Check whether there is a constraint on the way from the starting points to the destinations. The discrete
+        constraints are checked before the continuous constraints. Within both groups, the constraints are ordered by
+        their relative cost and every constraint is only evaluated for the segments that have not been constrained by a
+        cheaper one. If a ConstraintResultCache is set, the static constraints are only evaluated for segments which
+        are not cached; constraints that depend on time are always evaluated.
+        :return: numpy array of booleans with one element per segment
+        """
+        lat_start, lon_start, lat_end, lon_end = self.get_segment_coords(lat_start, lon_start, lat_end, lon_end)
+        constraints_discrete = self.negative_constraints_discrete
+        constraints_continuous = self.negative_constraints_continuous
+
+        is_constrained = np.array(is_constrained, dtype=bool)
+        if self.result_cache is not None:
+            is_constrained |= self.safe_crossing_static(lat_start, lon_start, lat_end, lon_end, current_time)
+            constraints_discrete = [constr for constr in constraints_discrete if not constr.is_static]
+            constraints_continuous = [constr for constr in constraints_continuous if not constr.is_static]
+
+        is_constrained = self.safe_crossing_discrete(lat_start, lon_start, lat_end, lon_end, current_time,
+                                                     is_constrained, constraints_discrete)
+        return self.safe_crossing_continuous(lat_start, lon_start, lat_end, lon_end, is_constrained,
+                                             constraints_continuous)
+
+    def safe_crossing_static(self, lat_start, lon_start, lat_end, lon_end, current_time):
+        """
+        Check the static constraints for all segments using the ConstraintResultCache. Only the segments which are not
+        cached are passed to the constraints; their results are added to the cache.
+        """
+        lat_start, lon_start, lat_end, lon_end = self.get_segment_coords(lat_start, lon_start, lat_end, lon_end)
+
+        keys = self.result_cache.get_keys(lat_start, lon_start, lat_end, lon_end)
+        is_constrained, is_missing = self.result_cache.lookup(keys)
+        if not is_missing.any():
+            return is_constrained
+
+        idx = np.flatnonzero(is_missing)
+        is_constrained_missing = self.safe_crossing_discrete(
+            lat_start[idx], lon_start[idx], lat_end[idx], lon_end[idx], self.get_segment_time(current_time, idx,
+                                                                                              lat_start.shape[0]),
+            np.full(idx.shape[0], False), [constr for constr in self.negative_constraints_discrete if constr.is_static])
+        is_constrained_missing = self.safe_crossing_continuous(
+            lat_start[idx], lon_start[idx], lat_end[idx], lon_end[idx], is_constrained_missing,
+            [constr for constr in self.negative_constraints_continuous if constr.is_static])
+
+        self.result_cache.store([keys[i] for i in idx], is_constrained_missing)
+        is_constrained[idx] = is_constrained_missing
         return is_constrained
 
-    def safe_crossing_continuous(self, lat_start, lon_start, lat_end, lon_end, is_constrained):
-        is_constrained = np.array(is_constrained)
+    def safe_crossing_continuous(self, lat_start, lon_start, lat_end, lon_end, is_constrained, constraints=None):
+        """
+        Check the continuous constraints for all segments, ordered by their relative cost. Every constraint is only
+        evaluated for the segments that are not constrained yet.
+        :return: numpy array of booleans with one element per segment
+        """
+        lat_start, lon_start, lat_end, lon_end = self.get_segment_coords(lat_start, lon_start, lat_end, lon_end)
+        is_constrained = np.array(is_constrained, dtype=bool)
+        if constraints is None:
+            constraints = self.negative_constraints_continuous
 
         logger.debug('Entering continuous checks')
         logger.debug('Length of latitudes: ' + str(len(lat_start)))
 
-        for constr in self.negative_constraints_continuous:
-            is_constrained_temp = constr.check_crossing(lat_start, lon_start, lat_end, lon_end)
-            is_constrained = np.array(is_constrained) | np.array(is_constrained_temp)
+        for constr in self.get_ordered_constraints(constraints):
+            idx = self.get_unconstrained_segments(constr, is_constrained)
+            if idx.shape[0] == 0:
+                continue
+            is_constrained_temp = constr.check_crossing(lat_start[idx], lon_start[idx], lat_end[idx], lon_end[idx])
+            is_constrained[idx] |= np.asarray(is_constrained_temp, dtype=bool)
 
-        return is_constrained.tolist()
+        return is_constrained
 
-    def safe_crossing_discrete(self, lat_start, lon_start, lat_end, lon_end, current_time, is_constrained):
+    def safe_crossing_discrete(self, lat_start, lon_start, lat_end, lon_end, current_time, is_constrained,
+                               constraints=None):
         """
         Check whether there is a constraint on the way from a starting point (lat_start, lon_start) to the destination
         (lat_end, lon_end).
-        To do so, the code segments the travel distance into steps (step length given by ConstraintPars.resolution) and
-        loops through all these steps calling ConstraintList.safe_endpoint()
+        To do so, the code segments the travel distance into K steps (step length given by ConstraintPars.resolution).
+        The K points of all N routing segments are collected in one (N x K) array which is passed to every discrete
+        constraint at once. A segment is constrained if at least one of its K points is constrained. Static
+        constraints that are combined in a StaticConstraintRaster are instead checked for all raster cells the
+        segments pass through. The constraints are ordered by their relative cost and every constraint is only
+        evaluated for the segments that are not constrained yet.
         :param lat_start:
         :param lon_start:
         :param lat_end:
         :param lon_end:
         :param current_time:
         :param is_constrained:
-        :return:
+        :param constraints: discrete constraints to be checked (default: all)
+        :return: numpy array of booleans with one element per segment
         """
         debug = False
 
-        delta_lats = (lat_end - lat_start) * self.pars.resolution
-        delta_lons = (lon_end - lon_start) * self.pars.resolution
-        x0 = lat_start
-        y0 = lon_start
+        lat_start, lon_start, lat_end, lon_end = self.get_segment_coords(lat_start, lon_start, lat_end, lon_end)
+        n_segments = lat_start.shape[0]
 
         # if (debug):
         # form.print_step('Constraints: Moving from (' + str(lat_start) + ',' + str(lon_start) + ') to (' + str(
         #        lat_end) + ',' + str(lon_end), 0)
 
         nSteps = int(1.0 / self.pars.resolution)
-        for iStep in range(0, nSteps):
-            x = x0 + delta_lats
-            y = y0 + delta_lons
-
-            is_constrained = self.safe_endpoint(x, y, current_time, is_constrained)
-            x0 = x
-            y0 = y
+        fractions = np.arange(1, nSteps + 1) * self.pars.resolution
+        x = lat_start[:, np.newaxis] + (lat_end - lat_start)[:, np.newaxis] * fractions
+        y = lon_start[:, np.newaxis] + (lon_end - lon_start)[:, np.newaxis] * fractions
+
+        if constraints is None:
+            constraints = self.negative_constraints_discrete
+
+        is_constrained = np.array(is_constrained, dtype=bool)
+        for constr in self.get_ordered_constraints(constraints):
+            idx = self.get_unconstrained_segments(constr, is_constrained)
+            if idx.shape[0] == 0:
+                continue
+            if isinstance(constr, StaticConstraintRaster):
+                is_constrained_temp = constr.check_crossing(lat_start[idx], lon_start[idx], lat_end[idx], lon_end[idx])
+            else:
+                substep_time = self.get_segment_time(current_time, idx, n_segments)
+                if np.ndim(substep_time) > 0:
+                    substep_time = np.repeat(substep_time, nSteps)
+                is_constrained_temp = constr.constraint_on_point(x[idx].ravel(), y[idx].ravel(), substep_time)
+                is_constrained_temp = self.reduce_substeps(is_constrained_temp, idx.shape[0], nSteps)
+            if is_constrained_temp.any():
+                self.constraints_crossed.append(constr.message)
+            is_constrained[idx] |= is_constrained_temp
 
         if debug:
             lat_start_constrained = lat_start[is_constrained == 1]
@@ -405,13 +621,55 @@ class ConstraintsList:
         #    exc = 'Did not check destination, only checked lat=' + str(x0) + ', lon=' + str(y0)
         #    raise ValueError(exc)
 
-        if not np.allclose(x, lat_end):
+        if not np.allclose(x[:, -1], lat_end):
             raise Exception("Constraints.land_crossing(): did not reach latitude of destination!")
-        if not np.allclose(y, lon_end):
+        if not np.allclose(y[:, -1], lon_end):
             raise Exception("Constraints.land_crossing(): did not reach longitude of destination!")
 
         return is_constrained
 
+    @staticmethod
+    def get_segment_coords(lat_start, lon_start, lat_end, lon_end):
+        return tuple(np.atleast_1d(np.asarray(coord)) for coord in (lat_start, lon_start, lat_end, lon_end))
+
+    @staticmethod
+    def get_segment_time(current_time, idx, n_segments):
+        """
+        Return the times of the segments with indices idx if one time per segment is provided and current_time
+        otherwise.
+        """
+        if np.ndim(current_time) > 0 and np.shape(current_time)[0] == n_segments:
+            return np.asarray(current_time)[idx]
+        return current_time
+
+    @staticmethod
+    def get_ordered_constraints(constraints):
+        """
+        Return the constraints ordered by their relative cost, cheapest first.
+        """
+        return sorted(constraints, key=lambda constr: constr.relative_cost)
+
+    @staticmethod
+    def get_unconstrained_segments(constraint, is_constrained):
+        """
+        Return the indices of the segments for which the constraint needs to be evaluated: all segments if the
+        constraint does not support masking and the segments that are not constrained yet otherwise.
+        """
+        if not constraint.supports_masking:
+            return np.arange(is_constrained.shape[0])
+        return np.flatnonzero(~is_constrained)
+
+    @staticmethod
+    def reduce_substeps(is_constrained_points, n_segments, n_steps):
+        """
+        Reduce the result of a discrete constraint for the (N x K) substep points to one value per segment. Constraints
+        that return one value per segment (or a single value) instead of one value per point are accepted as they are.
+        """
+        is_constrained_points = np.asarray(is_constrained_points, dtype=bool)
+        if is_constrained_points.size == n_segments * n_steps:
+            return is_constrained_points.reshape(n_segments, n_steps).any(axis=1)
+        return np.broadcast_to(is_constrained_points, (n_segments,))
+
     def add_pos_constraint(self, constraint):
         self.positive_constraints.append(constraint)
         self.pos_size += 1
@@ -431,18 +689,153 @@ class ConstraintsList:
             'You chose to add a negetive constraint with option ' + option + '. However only options -discrete- and '
                                                                              '-continuous- are implemented ')
 
+    def init_static_raster(self, map_size, resolution, cache_folder=None):
+        """
+        Replace all static discrete constraints by a StaticConstraintRaster which combines them on a grid with the
+        given resolution (degree).
+        """
+        static_constraints = [constr for constr in self.negative_constraints_discrete if constr.is_static]
+        if not static_constraints:
+            logger.info(form.get_log_step('No static constraints to combine in a constraint raster', 1))
+            return
+
+        raster = StaticConstraintRaster(static_constraints, map_size, resolution, cache_folder)
+        self.negative_constraints_discrete = [raster] + [constr for constr in self.negative_constraints_discrete if
+                                                         not constr.is_static]
+        self.neg_dis_size = len(self.negative_constraints_discrete)
+
+    def init_result_cache(self, max_size, precision=1e-5):
+        """
+        Cache the results of the static constraints for up to max_size segments, identified by their coordinates
+        rounded to multiples of precision (degree).
+        """
+        self.result_cache = ConstraintResultCache(max_size, precision)
+        logger.info(form.get_log_step('Caching results of static constraints for ' + str(max_size) +
+                                      ' segments with precision ' + str(precision) + ' degree', 1))
+
+    def print_cache_statistics(self):
+        if self.result_cache is not None:
+            self.result_cache.print_statistics()
+
+    def remove_neg_constraint(self, constraint, option='discrete'):
+        if option == 'discrete':
+            self.negative_constraints_discrete.remove(constraint)
+            self.neg_dis_size -= 1
+            return
+
+        if option == 'continuous':
+            self.negative_constraints_continuous.remove(constraint)
+            self.neg_cont_size -= 1
+            return
+
+        raise ValueError(
+            'You chose to remove a negetive constraint with option ' + option + '. However only options -discrete- '
+                                                                                'and -continuous- are implemented ')
+
     def check_weather(self):
         pass
 
 
 class LandCrossing(NegativeContraint):
-    def __init__(self):
+    """
+    Negative constraint for points on land according to the global land mask of global_land_mask.
+
+    If the map is provided, the part of the global mask that covers the map is extracted once (and shared by all
+    instances for the same map). Points on the map are checked by an index lookup on this sub-mask; only points
+    outside of it are passed to global_land_mask.globe.is_land.
+    """
+    is_static = True
+    relative_cost = 3
+    land_mask: np.ndarray  # land mask (True: land) covering the map, None if no map is provided
+    index_offset: tuple  # indices of land_mask[0, 0] in the global mask
+
+    _land_mask_cache = {}  # land masks per index range of the global mask
+
+    def __init__(self, map_size=None):
         NegativeContraint.__init__(self, "LandCrossing")
         self.message += "crossing land!"  # self.resource_type = 0
+        self.land_mask = None
+        self.index_offset = (0, 0)
+
+        if map_size is not None:
+            self.set_land_mask(map_size)
+
+    def set_land_mask(self, map_size):
+        if map_size.lon1 > map_size.lon2:
+            logger.info(form.get_log_step('Map crosses the antimeridian, using the global land mask', 1))
+            return
+
+        self.land_mask, self.index_offset = self.get_land_mask(map_size)
+
+    @staticmethod
+    def get_land_mask(map_size):
+        """
+        Return the part of the global land mask (True: land) that covers the map and the indices of its first element
+        in the global mask.
+        """
+        # latitudes of the global mask are descending
+        i_lat = globe.lat_to_index([map_size.lat2, map_size.lat1])
+        i_lon = globe.lon_to_index([map_size.lon1, map_size.lon2])
+        i_lat = (max(int(i_lat[0]) - 1, 0), min(int(i_lat[1]) + 2, globe._mask.shape[0]))
+        i_lon = (max(int(i_lon[0]) - 1, 0), min(int(i_lon[1]) + 2, globe._mask.shape[1]))
+
+        key = i_lat + i_lon
+        if key not in LandCrossing._land_mask_cache:
+            LandCrossing._land_mask_cache[key] = np.ascontiguousarray(
+                np.logical_not(globe._mask[i_lat[0]:i_lat[1], i_lon[0]:i_lon[1]]))
+        return LandCrossing._land_mask_cache[key], (i_lat[0], i_lon[0])
+
+    @staticmethod
+    def get_mask_index(lat, lon):
+        """
+        Return the indices of the points in the global land mask, same index calculation as in global_land_mask.
+        """
+        i_lat = ((lat - globe._lat[0]) / (globe._lat[1] - globe._lat[0])).astype('int')
+        i_lon = ((lon - globe._lon[0]) / (globe._lon[1] - globe._lon[0])).astype('int')
+        return i_lat, i_lon
+
+    def classify_cells(self, lat_min, lat_max, lon_min, lon_max):
+        if lat_min[0] < -90 or lat_max[-1] > 90 or lon_min[0] < -180 or lon_max[-1] >= 180:
+            return None
+        land_mask, index_offset = self.get_land_mask(Map(lat_min[0], lon_min[0], lat_max[-1], lon_max[-1]))
+
+        # latitudes of the global mask are descending, i.e. the upper bound of a cell has the lower index
+        i_first, j_first = self.get_mask_index(lat_max, lon_min)
+        i_last, j_last = self.get_mask_index(lat_min, lon_max)
+        i_first, i_last = i_first - index_offset[0], i_last - index_offset[0]
+        j_first, j_last = j_first - index_offset[1], j_last - index_offset[1]
+        if (i_first[-1] < 0 or i_last[0] >= land_mask.shape[0] or j_first[0] < 0 or
+                j_last[-1] >= land_mask.shape[1]):
+            return None
+
+        n_land = StaticConstraintRaster.count_in_index_ranges(land_mask, i_first, i_last, j_first, j_last)
+        n_pixels = np.outer(i_last - i_first + 1, j_last - j_first + 1)
+        cells = np.full(n_land.shape, StaticConstraintRaster.BOUNDARY, dtype=np.int8)
+        cells[n_land == 0] = StaticConstraintRaster.FREE
+        cells[n_land == n_pixels] = StaticConstraintRaster.CONSTRAINED
+        return cells
+
+    def get_source_spacing(self):
+        return abs(globe._lat[1] - globe._lat[0])
 
     def constraint_on_point(self, lat, lon, time):
         # self.print_debug('checking point: ' + str(lat) + ',' + str(lon))
-        return globe.is_land(lat, lon)
+        if self.land_mask is None:
+            return globe.is_land(lat, lon)
+
+        lat = np.atleast_1d(np.asarray(lat, dtype=float))
+        lon = np.atleast_1d(np.asarray(lon, dtype=float))
+        i_lat, i_lon = self.get_mask_index(lat, lon)
+        i_lat = i_lat - self.index_offset[0]
+        i_lon = i_lon - self.index_offset[1]
+        on_mask = ((i_lat >= 0) & (i_lat < self.land_mask.shape[0]) & (i_lon >= 0) &
+                   (i_lon < self.land_mask.shape[1]))
+
+        is_land = np.full(lat.shape, False)
+        is_land[on_mask] = self.land_mask[i_lat[on_mask], i_lon[on_mask]]
+        if not on_mask.all():
+            is_land[~on_mask] = globe.is_land(lat[~on_mask], lon[~on_mask])
+        return is_land
 
     def print_info(self):
         logger.info(form.get_log_step("no land crossing", 1))
@@ -455,6 +848,7 @@ class StatusCodeError(NegativeContraint):
         be more suitable/intuitive. However, this cannot be used at the moment because discrete constraints are checked
         on intermediate points between two consecutive routing points and the status code is not available for these.
     """
+    supports_masking = False  # the status codes are matched to all routing segments at once
     courses_path: str
 
     def __init__(self, courses_path):
@@ -481,6 +875,8 @@ class StatusCodeError(NegativeContraint):
 
 
 class WaveHeight(NegativeConstraintFromWeather):
+    relative_cost = 5
+    supports_masking = False  # current_wave_height is provided for all points at once
     current_wave_height: np.ndarray
     max_wave_height: float
 
@@ -502,8 +898,22 @@ class WaveHeight(NegativeConstraintFromWeather):
 
 
 class WaterDepth(NegativeContraint):
+    """
+    Negative constraint for points where the water depth is lower than the required water depth of the boat.
+
+    On initialisation, the depth data is cropped to the map. If the depth data is given on a regular grid, the depth
+    is additionally stored as contiguous float32 array (depth_grid) and points are checked by bilinear interpolation
+    on this array. Grid cells for which all four corners are too shallow (deep enough) are flagged in shallow_cells
+    such that only points in cells with both shallow and deep corners need to be interpolated.
+    """
+    is_static = True
+    relative_cost = 5
     map_size: Map
     depth_data: xr  # the xarray.Dataset is expected to have a variable called "z" (as in the original ETOPO dataset)
+    depth_grid: np.ndarray  # depth on a regular grid with ascending latitudes and longitudes (None if not regular)
+    grid_origin: tuple  # latitude and longitude of depth_grid[0, 0]
+    grid_spacing: tuple  # spacing of depth_grid in latitude and longitude
+    shallow_cells: np.ndarray  # 0: all corners deep enough, 1: all corners too shallow, 2: mixed or missing data
     current_depth: np.ndarray
     min_depth: float
 
@@ -513,8 +923,11 @@ class WaterDepth(NegativeContraint):
         self.current_depth = np.array([-99])
         self.min_depth = min_depth
         self.map_size = map_size
+        self.depth_path = depth_path
 
         self.depth_data = None
+        self.depth_grid = None
+        self.shallow_cells = None
 
         if data_mode == 'odc':
             self.depth_data = self.load_data_ODC(depth_path, 'global_relief', measurements=['z'])
@@ -525,6 +938,9 @@ class WaterDepth(NegativeContraint):
         else:
             raise ValueError('Option "' + data_mode + '" not implemented for download of depth data!')
 
+        self.depth_data = self.crop_to_map(self.depth_data)
+        self.set_depth_grid()
+
     def load_data_ODC(self, depth_path, product_name, measurements=None):
         logger.info(form.get_log_step('Obtaining depth data from ODC', 0))
 
@@ -570,7 +986,6 @@ class WaterDepth(NegativeContraint):
         return depth_data_chunked
 
     def load_data_from_file(self, depth_path):
-        # FIXME: if this loads the whole file into memory, apply subsetting already here
         logger.info(form.get_log_step('Downloading data from file: ' + depth_path, 0))
         ds_depth = None
         if graphics.get_figure_path():
@@ -579,16 +994,153 @@ class WaterDepth(NegativeContraint):
             ds_depth = xr.open_dataset(depth_path)
         return ds_depth
 
+    def crop_to_map(self, ds_depth):
+        """
+        Select the part of the depth data that covers the map including a margin of two grid points such that points
+        at the border of the map can be interpolated.
+        """
+        lats = ds_depth.latitude.values
+        lons = ds_depth.longitude.values
+        if lats.shape[0] < 2 or lons.shape[0] < 2:
+            return ds_depth
+
+        margin_lat = 2 * abs(lats[1] - lats[0])
+        margin_lon = 2 * abs(lons[1] - lons[0])
+        lat_slice = (self.map_size.lat1 - margin_lat, self.map_size.lat2 + margin_lat)
+        lon_slice = (self.map_size.lon1 - margin_lon, self.map_size.lon2 + margin_lon)
+        if lats[0] > lats[-1]:
+            lat_slice = lat_slice[::-1]
+        if lons[0] > lons[-1]:
+            lon_slice = lon_slice[::-1]
+        return ds_depth.sel(latitude=slice(*lat_slice), longitude=slice(*lon_slice))
+
+    def set_depth_grid(self):
+        """
+        Store the depth as contiguous float32 array with ascending coordinates if the depth data is given on a regular
+        grid. Otherwise, the depth is interpolated with xarray.
+        """
+        lats = self.depth_data.latitude.values
+        lons = self.depth_data.longitude.values
+        if lats.shape[0] < 2 or lons.shape[0] < 2:
+            logger.warning(form.get_log_step('Depth data does not cover the map, depth is interpolated with xarray', 1))
+            return
+        if not (np.allclose(np.diff(lats), lats[1] - lats[0]) and np.allclose(np.diff(lons), lons[1] - lons[0])):
+            logger.info(form.get_log_step('Depth data is not given on a regular grid, depth is interpolated with '
+                                          'xarray', 1))
+            return
+
+        depth = self.depth_data['z'].transpose('latitude', 'longitude').values
+        if lats[0] > lats[-1]:
+            lats = lats[::-1]
+            depth = depth[::-1, :]
+        if lons[0] > lons[-1]:
+            lons = lons[::-1]
+            depth = depth[:, ::-1]
+
+        self.depth_grid = np.ascontiguousarray(depth, dtype=np.float32)
+        self.grid_origin = (lats[0], lons[0])
+        self.grid_spacing = ((lats[-1] - lats[0]) / (lats.shape[0] - 1), (lons[-1] - lons[0]) / (lons.shape[0] - 1))
+        self.set_shallow_cells()
+
+    def set_shallow_cells(self):
+        is_shallow = self.depth_grid > -self.min_depth
+        is_deep = self.depth_grid <= -self.min_depth
+        n_shallow = (is_shallow[:-1, :-1].astype(np.int8) + is_shallow[1:, :-1] + is_shallow[:-1, 1:] +
+                     is_shallow[1:, 1:])
+        n_deep = is_deep[:-1, :-1].astype(np.int8) + is_deep[1:, :-1] + is_deep[:-1, 1:] + is_deep[1:, 1:]
+
+        self.shallow_cells = np.full(n_shallow.shape, 2, dtype=np.int8)
+        self.shallow_cells[n_deep == 4] = 0
+        self.shallow_cells[n_shallow == 4] = 1
+
+    def get_grid_cells(self, lat, lon):
+        """
+        Return the indices of the grid cells that contain the points, the relative position of the points within the
+        cells and a mask of the points which lie within the grid.
+        """
+        pos_lat = (np.asarray(lat, dtype=float) - self.grid_origin[0]) / self.grid_spacing[0]
+        pos_lon = (np.asarray(lon, dtype=float) - self.grid_origin[1]) / self.grid_spacing[1]
+        on_grid = ((pos_lat >= 0) & (pos_lat <= self.depth_grid.shape[0] - 1) & (pos_lon >= 0) &
+                   (pos_lon <= self.depth_grid.shape[1] - 1))
+
+        i_lat = np.clip(np.floor(np.nan_to_num(pos_lat)).astype(int), 0, self.depth_grid.shape[0] - 2)
+        i_lon = np.clip(np.floor(np.nan_to_num(pos_lon)).astype(int), 0, self.depth_grid.shape[1] - 2)
+        return i_lat, i_lon, pos_lat - i_lat, pos_lon - i_lon, on_grid
+
+    def interpolate_depth(self, i_lat, i_lon, w_lat, w_lon, on_grid):
+        """
+        Bilinear interpolation of the depth; points outside of the grid are assigned NaN.
+        """
+        depth = ((1 - w_lat) * (1 - w_lon) * self.depth_grid[i_lat, i_lon] +
+                 w_lat * (1 - w_lon) * self.depth_grid[i_lat + 1, i_lon] +
+                 (1 - w_lat) * w_lon * self.depth_grid[i_lat, i_lon + 1] +
+                 w_lat * w_lon * self.depth_grid[i_lat + 1, i_lon + 1])
+        return np.where(on_grid, depth, np.nan)
+
     def set_draught(self, depth):
         self.min_depth = depth
+        if self.depth_grid is not None:
+            self.set_shallow_cells()
+
+    def classify_cells(self, lat_min, lat_max, lon_min, lon_max):
+        if self.depth_grid is None:
+            return None
+
+        # cells of the depth grid that overlap the cells; points outside of the depth grid are not constrained
+        n_grid_cells = self.shallow_cells.shape
+        pos_lat_min = (lat_min - self.grid_origin[0]) / self.grid_spacing[0]
+        pos_lat_max = (lat_max - self.grid_origin[0]) / self.grid_spacing[0]
+        pos_lon_min = (lon_min - self.grid_origin[1]) / self.grid_spacing[1]
+        pos_lon_max = (lon_max - self.grid_origin[1]) / self.grid_spacing[1]
+        i_first = np.clip(np.floor(pos_lat_min).astype(int), 0, n_grid_cells[0] - 1)
+        i_last = np.clip(np.floor(pos_lat_max).astype(int), 0, n_grid_cells[0] - 1)
+        j_first = np.clip(np.floor(pos_lon_min).astype(int), 0, n_grid_cells[1] - 1)
+        j_last = np.clip(np.floor(pos_lon_max).astype(int), 0, n_grid_cells[1] - 1)
+        inside = np.outer((pos_lat_min >= 0) & (pos_lat_max <= n_grid_cells[0]),
+                          (pos_lon_min >= 0) & (pos_lon_max <= n_grid_cells[1]))
+        outside = np.outer((pos_lat_max < 0) | (pos_lat_min > n_grid_cells[0]),
+                           np.full(lon_min.shape, True)) | np.outer(
+            np.full(lat_min.shape, True), (pos_lon_max < 0) | (pos_lon_min > n_grid_cells[1]))
+
+        n_shallow = StaticConstraintRaster.count_in_index_ranges(self.shallow_cells == 1, i_first, i_last, j_first,
+                                                                 j_last)
+        n_deep = StaticConstraintRaster.count_in_index_ranges(self.shallow_cells == 0, i_first, i_last, j_first,
+                                                              j_last)
+        n_grid = np.outer(i_last - i_first + 1, j_last - j_first + 1)
+        cells = np.full(n_grid.shape, StaticConstraintRaster.BOUNDARY, dtype=np.int8)
+        cells[(n_deep == n_grid) | outside] = StaticConstraintRaster.FREE
+        cells[(n_shallow == n_grid) & inside] = StaticConstraintRaster.CONSTRAINED
+        return cells
+
+    def get_source_spacing(self):
+        if self.depth_grid is None:
+            return None
+        return min(self.grid_spacing)
+
+    def get_static_key(self):
+        return self.name + '_' + str(self.min_depth) + '_' + str(self.depth_path)
 
     def constraint_on_point(self, lat, lon, time):
-        self.check_depth(lat, lon, time)
-        return_value = self.current_depth > -self.min_depth
+        if self.depth_grid is None:
+            self.check_depth(lat, lon, time)
+            return self.current_depth > -self.min_depth
+
+        # only points in cells with shallow and deep corners need to be interpolated
+        i_lat, i_lon, w_lat, w_lon, on_grid = self.get_grid_cells(lat, lon)
+        cells = self.shallow_cells[i_lat, i_lon]
+        return_value = on_grid & (cells == 1)
+        mixed = on_grid & (cells == 2)
+        if mixed.any():
+            depth = self.interpolate_depth(i_lat[mixed], i_lon[mixed], w_lat[mixed], w_lon[mixed], on_grid[mixed])
+            return_value[mixed] = depth > -self.min_depth
         # form.print_step('current_depth:' + str(self.current_depth), 1)
         return return_value
 
     def check_depth(self, lat, lon, time):
+        if self.depth_grid is not None:
+            self.current_depth = self.interpolate_depth(*self.get_grid_cells(lat, lon))
+            return
+
         lat_da = xr.DataArray(lat, dims="dummy")
         lon_da = xr.DataArray(lon, dims="dummy")
         rounded_ds = self.depth_data["z"].interp(latitude=lat_da, longitude=lon_da, method="linear")
@@ -677,6 +1229,8 @@ class WaterDepth(NegativeContraint):
 
 
 class StayOnMap(NegativeContraint):
+    is_static = True
+    relative_cost = 1
     lat1: float
     lon1: float
     lat2: float
@@ -694,6 +1248,20 @@ class StayOnMap(NegativeContraint):
     def print_info(self):
         logger.info(form.get_log_step("stay on wheather map", 1))
 
+    def get_static_key(self):
+        return self.name + '_' + str([self.lat1, self.lon1, self.lat2, self.lon2])
+
+    def classify_cells(self, lat_min, lat_max, lon_min, lon_max):
+        on_map = np.outer((lat_min >= self.lat1) & (lat_max <= self.lat2),
+                          (lon_min >= self.lon1) & (lon_max <= self.lon2))
+        off_map = np.outer((lat_min > self.lat2) | (lat_max < self.lat1), np.full(lon_min.shape, True)) | np.outer(
+            np.full(lat_min.shape, True), (lon_min > self.lon2) | (lon_max < self.lon1))
+
+        cells = np.full(on_map.shape, StaticConstraintRaster.BOUNDARY, dtype=np.int8)
+        cells[on_map] = StaticConstraintRaster.FREE
+        cells[off_map] = StaticConstraintRaster.CONSTRAINED
+        return cells
+
     def set_map(self, lat1, lon1, lat2, lon2):
         self.lat1 = lat1
         self.lon1 = lon1
@@ -701,6 +1269,319 @@ class StayOnMap(NegativeContraint):
         self.lon2 = lon2
 
 
+class RouteCorridor(NegativeContraint):
+    """
+    Restrict the routing to a corridor around a given route, e.g. the result of a coarse routing run. Points are
+    constrained if their distance to the route exceeds the half width of the corridor. Distances are calculated in a
+    local equirectangular projection around every point which is sufficiently accurate for corridor widths of up to a
+    few hundred kilometres.
+    """
+    relative_cost = 20
+    lats: np.ndarray  # latitudes of the route (degree)
+    lons: np.ndarray  # longitudes of the route (degree)
+    half_width: float  # half width of the corridor (m)
+
+    earth_radius = 6371000.
+
+    def __init__(self, lats, lons, half_width):
+        NegativeContraint.__init__(self, "RouteCorridor")
+        self.message += "leaving route corridor!"
+        self.lats = np.asarray(lats, dtype=float)
+        self.lons = np.asarray(lons, dtype=float)
+        self.half_width = half_width
+
+    def constraint_on_point(self, lat, lon, time):
+        return self.get_dist_to_route(lat, lon) > self.half_width
+
+    def get_dist_to_route(self, lat, lon):
+        """
+        Return the minimal distance (m) of every point to the route.
+        """
+        lat = np.atleast_1d(np.asarray(lat, dtype=float))[:, np.newaxis]
+        lon = np.atleast_1d(np.asarray(lon, dtype=float))[:, np.newaxis]
+        scale_lon = np.deg2rad(self.earth_radius) * np.cos(np.deg2rad(lat))
+        scale_lat = np.deg2rad(self.earth_radius)
+
+        # coordinates of the route relative to every point, shape (points, route points)
+        x = ((self.lons[np.newaxis, :] - lon + 180) % 360 - 180) * scale_lon
+        y = (self.lats[np.newaxis, :] - lat) * scale_lat
+
+        if self.lats.shape[0] == 1:
+            return np.hypot(x[:, 0], y[:, 0])
+
+        # distance of the origin to every route segment
+        dx = x[:, 1:] - x[:, :-1]
+        dy = y[:, 1:] - y[:, :-1]
+        seg_len_sq = dx * dx + dy * dy
+        with np.errstate(divide='ignore', invalid='ignore'):
+            t = np.where(seg_len_sq > 0, -(x[:, :-1] * dx + y[:, :-1] * dy) / seg_len_sq, 0.)
+        t = np.clip(t, 0., 1.)
+        dist = np.hypot(x[:, :-1] + t * dx, y[:, :-1] + t * dy)
+        return np.min(dist, axis=1)
+
+    def print_info(self):
+        logger.info(form.get_log_step("stay within " + str(self.half_width / 1000) + " km of the route", 1))
+
+
+class StaticConstraintRaster(NegativeContraint):
+    """
+    Combination of all static discrete constraints (e.g. LandCrossing, WaterDepth, StayOnMap) on a regular grid over the
+    map. A cell is flagged as free (constrained) if all of its points are free (constrained) and as boundary cell
+    otherwise. Constraints that provide classify_cells are evaluated at the resolution of their source data (e.g. the
+    pixels of the land mask), such that features smaller than a grid cell are resolved. All other constraints are
+    evaluated on (oversampling + 1) x (oversampling + 1) points per grid cell (including its corners); as features
+    between these points can be missed, the neighbours of their boundary cells are flagged as boundary cells as well.
+    Points in free and constrained cells are answered by a single array lookup; only points in boundary cells and
+    outside of the grid are checked with the exact constraints.
+
+    If a cache folder is provided, the grid is written to/read from a file that is identified by the map, the
+    resolution and the settings of the static constraints.
+    """
+    is_static = True
+    relative_cost = 2
+    FREE = 0
+    CONSTRAINED = 1
+    BOUNDARY = 2
+
+    constraints: list  # static constraints which are combined in the raster
+    map_size: Map
+    resolution: float  # size of the grid cells (degree)
+    oversampling: int  # number of intervals per grid cell and dimension at which the constraints are sampled
+    sample_spacing: float  # maximum distance (degree) of the points at which segments are checked in boundary cells
+    cells: np.ndarray  # flags of the grid cells (FREE, CONSTRAINED or BOUNDARY), shape (lat, lon)
+
+    def __init__(self, constraints, map_size, resolution, cache_folder=None, oversampling=4):
+        NegativeContraint.__init__(self, "StaticConstraintRaster")
+        self.constraints = constraints
+        self.map_size = map_size
+        self.resolution = resolution
+        self.oversampling = oversampling
+        self.message += "crossing static constraints (" + ", ".join(c.name for c in constraints) + ")!"
+
+        self.n_lat = max(int(np.ceil(round((map_size.lat2 - map_size.lat1) / resolution, 6))), 1)
+        self.n_lon = max(int(np.ceil(round((map_size.lon2 - map_size.lon1) / resolution, 6))), 1)
+
+        # segments are sampled densely enough to resolve the source data of the constraints
+        self.sample_spacing = resolution / oversampling
+        for constr in constraints:
+            source_spacing = constr.get_source_spacing()
+            if source_spacing is not None:
+                self.sample_spacing = min(self.sample_spacing, source_spacing / 2)
+
+        cache_file = None
+        if cache_folder is not None:
+            cache_file = os.path.join(cache_folder, 'constraint_raster_' + self.get_cache_key() + '.npz')
+        if cache_file is not None and os.path.isfile(cache_file):
+            logger.info(form.get_log_step('Reading constraint raster from ' + cache_file, 0))
+            self.cells = np.load(cache_file)['cells']
+        else:
+            self.cells = self.compile_raster()
+            if cache_file is not None:
+                os.makedirs(cache_folder, exist_ok=True)
+                np.savez_compressed(cache_file, cells=self.cells)
+                logger.info(form.get_log_step('Writing constraint raster to ' + cache_file, 0))
+
+    def get_cache_key(self):
+        key = json.dumps({'map': [self.map_size.lat1, self.map_size.lon1, self.map_size.lat2, self.map_size.lon2],
+                          'resolution': self.resolution, 'oversampling': self.oversampling,
+                          'constraints': [c.get_static_key() for c in self.constraints], 'classification': 'source'})
+        return hashlib.sha1(key.encode()).hexdigest()[:16]
+
+    def compile_raster(self, chunk_size=1000000):
+        """
+        Classify the grid cells for every constraint and combine the flags: a cell is constrained if it is constrained
+        by any constraint, a boundary cell if it is a boundary cell of any constraint and free otherwise.
+        """
+        logger.info(form.get_log_step('Compiling constraint raster with ' + str(self.n_lat) + ' x ' +
+                                      str(self.n_lon) + ' cells', 0))
+        # cell bounds are widened by a small margin to account for rounding when points are assigned to cells
+        margin = 1e-9
+        lat_edges = self.map_size.lat1 + np.arange(self.n_lat + 1) * self.resolution
+        lon_edges = self.map_size.lon1 + np.arange(self.n_lon + 1) * self.resolution
+
+        is_constrained = np.full((self.n_lat, self.n_lon), False)
+        is_boundary = np.full((self.n_lat, self.n_lon), False)
+        sampled_constraints = []
+        for constr in self.constraints:
+            cells = constr.classify_cells(lat_edges[:-1] - margin, lat_edges[1:] + margin, lon_edges[:-1] - margin,
+                                          lon_edges[1:] + margin)
+            if cells is None:
+                sampled_constraints.append(constr)
+                continue
+            is_constrained |= cells == self.CONSTRAINED
+            is_boundary |= cells == self.BOUNDARY
+
+        if sampled_constraints:
+            cells = self.sample_cells(sampled_constraints, chunk_size)
+            is_constrained |= cells == self.CONSTRAINED
+            is_boundary |= cells == self.BOUNDARY
+
+        cells = np.full((self.n_lat, self.n_lon), self.FREE, dtype=np.int8)
+        cells[is_boundary] = self.BOUNDARY
+        cells[is_constrained] = self.CONSTRAINED
+        return cells
+
+    def sample_cells(self, constraints, chunk_size):
+        """
+        Evaluate the constraints on the sample points of the grid cells and flag the cells. Boundary cells and their
+        neighbours are flagged as boundary cells.
+        """
+        n_samples_lat = self.n_lat * self.oversampling + 1
+        n_samples_lon = self.n_lon * self.oversampling + 1
+        lats = self.map_size.lat1 + np.arange(n_samples_lat) * self.resolution / self.oversampling
+        lons = self.map_size.lon1 + np.arange(n_samples_lon) * self.resolution / self.oversampling
+        lat_nodes, lon_nodes = np.meshgrid(lats, lons, indexing='ij')
+        lat_nodes = lat_nodes.ravel()
+        lon_nodes = lon_nodes.ravel()
+
+        nodes_constrained = np.full(lat_nodes.shape, False)
+        for start in range(0, lat_nodes.shape[0], chunk_size):
+            chunk = slice(start, start + chunk_size)
+            for constr in constraints:
+                nodes_constrained[chunk] |= np.asarray(
+                    constr.constraint_on_point(lat_nodes[chunk], lon_nodes[chunk], None), dtype=bool)
+        nodes_constrained = nodes_constrained.reshape(n_samples_lat, n_samples_lon)
+
+        # number of constrained sample points per cell
+        n_constrained = np.zeros((self.n_lat, self.n_lon), dtype=np.int32)
+        for i_lat in range(self.oversampling + 1):
+            for i_lon in range(self.oversampling + 1):
+                n_constrained += nodes_constrained[i_lat:i_lat + self.n_lat * self.oversampling:self.oversampling,
+                                                   i_lon:i_lon + self.n_lon * self.oversampling:self.oversampling]
+
+        is_boundary = (n_constrained > 0) & (n_constrained < (self.oversampling + 1) ** 2)
+        is_boundary_padded = np.pad(is_boundary, 1)
+        is_boundary_dilated = np.full(is_boundary.shape, False)
+        for d_lat in range(3):
+            for d_lon in range(3):
+                is_boundary_dilated |= is_boundary_padded[d_lat:d_lat + self.n_lat, d_lon:d_lon + self.n_lon]
+
+        cells = np.full(n_constrained.shape, self.FREE, dtype=np.int8)
+        cells[n_constrained == (self.oversampling + 1) ** 2] = self.CONSTRAINED
+        cells[is_boundary_dilated] = self.BOUNDARY
+        return cells
+
+    @staticmethod
+    def count_in_index_ranges(mask, i_first, i_last, j_first, j_last):
+        """
+        Count the elements of a boolean array within the index ranges [i_first[k], i_last[k]] x [j_first[l],
+        j_last[l]] for all combinations of k and l by means of a summed-area table.
+
+        :return: numpy array of counts with shape (len(i_first), len(j_first))
+        """
+        table = np.zeros((mask.shape[0] + 1, mask.shape[1] + 1), dtype=np.int32)
+        np.cumsum(np.cumsum(mask, axis=0, dtype=np.int32), axis=1, out=table[1:, 1:])
+        return (table[np.ix_(i_last + 1, j_last + 1)] - table[np.ix_(i_first, j_last + 1)] -
+                table[np.ix_(i_last + 1, j_first)] + table[np.ix_(i_first, j_first)])
+
+    def get_cells(self, lat, lon):
+        """
+        Return the flags of the grid cells that contain the points. Points outside of the grid are flagged as boundary
+        cells.
+        """
+        i_lat = np.floor((lat - self.map_size.lat1) / self.resolution).astype(int)
+        i_lon = np.floor((lon - self.map_size.lon1) / self.resolution).astype(int)
+        on_grid = (i_lat >= 0) & (i_lat < self.n_lat) & (i_lon >= 0) & (i_lon < self.n_lon)
+
+        cells = np.full(lat.shape, self.BOUNDARY, dtype=np.int8)
+        cells[on_grid] = self.cells[i_lat[on_grid], i_lon[on_grid]]
+        return cells
+
+    def constraint_on_point(self, lat, lon, time):
+        lat = np.atleast_1d(np.asarray(lat, dtype=float))
+        lon = np.atleast_1d(np.asarray(lon, dtype=float))
+        cells = self.get_cells(lat, lon)
+
+        is_constrained = cells == self.CONSTRAINED
+        boundary = cells == self.BOUNDARY
+        if boundary.any():
+            is_constrained[boundary] = self.check_exact(lat[boundary], lon[boundary])
+        return is_constrained
+
+    def check_exact(self, lat, lon):
+        """
+        Check the points with the exact static constraints. As these do not depend on time, no time is passed.
+        """
+        is_constrained = np.full(lat.shape, False)
+        for constr in self.constraints:
+            is_constrained |= np.asarray(constr.constraint_on_point(lat, lon, None), dtype=bool)
+        return is_constrained
+
+    def check_crossing(self, lat_start, lon_start, lat_end, lon_end):
+        """
+        Check whether the segments from (lat_start, lon_start) to (lat_end, lon_end) cross constrained grid cells.
+
+        All grid cells a segment passes through are determined from the crossings of the segment with the grid lines
+        (supercover traversal), vectorised over all segments. A segment is constrained if it passes through a
+        constrained cell. The parts of the segments within boundary cells are sampled with a spacing of at most
+        sample_spacing and checked with the exact constraints.
+
+        :return: numpy array of booleans with one element per segment
+        """
+        n_segments = lat_start.shape[0]
+        u_start = (lon_start - self.map_size.lon1) / self.resolution
+        u_end = (lon_end - self.map_size.lon1) / self.resolution
+        v_start = (lat_start - self.map_size.lat1) / self.resolution
+        v_end = (lat_end - self.map_size.lat1) / self.resolution
+
+        # parameters t (0: start, 1: end) at which the segments enter a new cell, sorted per segment
+        segment_lon, t_lon = self.get_grid_line_crossings(u_start, u_end)
+        segment_lat, t_lat = self.get_grid_line_crossings(v_start, v_end)
+        segment = np.concatenate((np.arange(n_segments), segment_lon, segment_lat))
+        t = np.concatenate((np.zeros(n_segments), t_lon, t_lat))
+        order = np.lexsort((t, segment))
+        segment = segment[order]
+        t = t[order]
+        t_next = np.append(t[1:], 1.)
+        t_next[np.append(segment[1:] != segment[:-1], True)] = 1.
+
+        # the centre of every interval between two crossings lies within the cell that is passed in this interval
+        t_centre = 0.5 * (t + t_next)
+        cells = self.get_cells(lat_start[segment] + (lat_end - lat_start)[segment] * t_centre,
+                               lon_start[segment] + (lon_end - lon_start)[segment] * t_centre)
+
+        is_constrained = np.bincount(segment[cells == self.CONSTRAINED], minlength=n_segments) > 0
+        boundary = (cells == self.BOUNDARY) & ~is_constrained[segment]
+        if boundary.any():
+            segment_length = np.hypot(lat_end - lat_start, lon_end - lon_start)
+            interval_length = (t_next - t)[boundary] * segment_length[segment[boundary]]
+            n_samples = np.maximum(np.ceil(interval_length / self.sample_spacing).astype(int), 1) + 1
+            interval = np.repeat(np.arange(n_samples.shape[0]), n_samples)
+            sample_index = np.arange(interval.shape[0]) - np.repeat(np.cumsum(n_samples) - n_samples, n_samples)
+            t_samples = t[boundary][interval] + (t_next - t)[boundary][interval] * sample_index / (
+                n_samples[interval] - 1)
+            segment_samples = segment[boundary][interval]
+            is_sample_constrained = self.check_exact(
+                lat_start[segment_samples] + (lat_end - lat_start)[segment_samples] * t_samples,
+                lon_start[segment_samples] + (lon_end - lon_start)[segment_samples] * t_samples)
+            is_constrained |= np.bincount(segment_samples[is_sample_constrained], minlength=n_segments) > 0
+        return is_constrained
+
+    @staticmethod
+    def get_grid_line_crossings(coord_start, coord_end):
+        """
+        Return the crossings of the segments with the grid lines of one dimension in grid coordinates.
+
+        :return: index of the segment and parameter t (0: start, 1: end) of every crossing
+        """
+        index_start = np.floor(coord_start)
+        index_end = np.floor(coord_end)
+        n_crossings = np.abs(index_end - index_start).astype(int)
+
+        segment = np.repeat(np.arange(coord_start.shape[0]), n_crossings)
+        offset = np.arange(segment.shape[0]) - np.repeat(np.cumsum(n_crossings) - n_crossings, n_crossings)
+        grid_line = np.where(index_end[segment] > index_start[segment], index_start[segment] + 1 + offset,
+                             index_start[segment] - offset)
+        t = (grid_line - coord_start[segment]) / (coord_end - coord_start)[segment]
+        return segment, t
+
+    def print_info(self):
+        logger.info(form.get_log_step("static constraints combined on raster with resolution " +
+                                      str(self.resolution) + " deg:", 1))
+        for constr in self.constraints:
+            constr.print_info()
+
+
 class ContinuousCheck(NegativeContraint):
     """
     Contains various functions to test data connection,
@@ -722,11 +1603,17 @@ class ContinuousCheck(NegativeContraint):
 
     tags : list
         Values of the seamark tags that need to be considered
+
+    spatial_cache : SpatialQueryCache
+        local cache for the query results (optional); in offline mode, no database connection is established
     """
+    relative_cost = 100
     engine: sqlalchemy.engine
+    spatial_cache: SpatialQueryCache = None
 
-    def __init__(self, db_engine=None):
+    def __init__(self, db_engine=None, spatial_cache=None):
         NegativeContraint.__init__(self, "ContinuousChecks")
+        self.spatial_cache = spatial_cache
         if db_engine is not None:
             self.engine = db_engine
         else:
@@ -736,7 +1623,10 @@ class ContinuousCheck(NegativeContraint):
             self.password = os.getenv("WRT_DB_PASSWORD")
             self.schema = os.getenv("POSTGRES_SCHEMA")
             self.port = os.getenv("WRT_DB_PORT")
-            self.engine = self.connect_database()
+            if spatial_cache is not None and spatial_cache.offline:
+                self.engine = None
+            else:
+                self.engine = self.connect_database()
 
     def print_info(self):
         logger.info(form.get_log_step("no seamarks crossing", 1))
@@ -760,6 +1650,14 @@ class ContinuousCheck(NegativeContraint):
                                                                   db=self.database, port=self.port))
         return engine
 
+    def read_postgis(self, db_engine, query, **kwargs):
+        """
+        Return the result of the query as GeoDataFrame, using the spatial cache if available
+        """
+        if self.spatial_cache is not None:
+            return self.spatial_cache.read_postgis(query, db_engine, **kwargs)
+        return gpd.read_postgis(sql=query, con=db_engine, **kwargs)
+
     def set_map_bbox(self, map_size):
         if map_size.lon1 <= map_size.lon2:
             min_lon = map_size.lon1
@@ -780,8 +1678,46 @@ class ContinuousCheck(NegativeContraint):
         logger.debug('BBox in WKT: ', bbox_wkt)
         return bbox_wkt
 
+    @staticmethod
+    def check_segments_in_tree(tree, lat_start, lon_start, lat_end, lon_end):
+        """
+        Check for all routing segments at once whether they intersect any of the geometries of an STRtree
+
+        Parameters
+        ----------
+        tree : STRtree
+            tree of the geometries that must not be crossed
+
+        lat_start, lon_start, lat_end, lon_end : np.array
+            coordinates of the origins and destinations of the routing segments
+
+        Returns
+        ----------
+        query_tree : list
+            bool of spatial relation result (True or False) for every segment
+        """
+        lines = ContinuousCheck.get_segment_lines(lat_start, lon_start, lat_end, lon_end)
+
+        # indices of the segments and of the geometries of all intersecting pairs
+        segment_index, _ = tree.query(lines, predicate='intersects')
+        return (np.bincount(segment_index, minlength=lines.shape[0]) > 0).tolist()
+
+    @staticmethod
+    def get_segment_lines(lat_start, lon_start, lat_end, lon_end):
+        """
+        Return the routing segments as array of LineStrings
+        """
+        n_segments = len(lat_start)
+        start = np.column_stack((np.asarray(lon_start[:n_segments], dtype=float),
+                                 np.asarray(lat_start[:n_segments], dtype=float)))
+        end = np.column_stack((np.asarray(lon_end[:n_segments], dtype=float),
+                               np.asarray(lat_end[:n_segments], dtype=float)))
+        return shapely.linestrings(np.stack((start, end), axis=1))
+
 
 class RunTestContinuousChecks(ContinuousCheck):
+    supports_masking = False
+
     def __init__(self, test_dict):
         NegativeContraint.__init__(self, "ContinuousChecks")
         self.test_result_dict = test_dict
@@ -824,11 +1760,13 @@ class SeamarkCrossing(ContinuousCheck):
     tags : list
         Values of the seamark tags that need to be considered
     """
+    is_static = True
+    relative_cost = 200
     concat_tree: STRtree
     tags: list
 
-    def __init__(self, is_stay_on_map=None, map_size=None, db_engine=None):
-        super().__init__(db_engine=db_engine)
+    def __init__(self, is_stay_on_map=None, map_size=None, db_engine=None, spatial_cache=None):
+        super().__init__(db_engine=db_engine, spatial_cache=spatial_cache)
 
         if db_engine is None:
             seamark_query = self.build_seamark_query(is_stay_on_map, map_size)
@@ -892,7 +1830,7 @@ class SeamarkCrossing(ContinuousCheck):
         """
         # Define SQL query to retrieve list of tables
         # sql_query = "SELECT table_name FROM information_schema.tables WHERE table_schema = 'public'"
-        gdf = gpd.read_postgis(con=db_engine, sql=query, geom_col="geom", crs="epsg:4326")
+        gdf = self.read_postgis(db_engine, query, geom_col="geom", crs="epsg:4326")
         gdf = gdf[gdf["geom"] != None]
         return gdf
 
@@ -914,7 +1852,7 @@ class SeamarkCrossing(ContinuousCheck):
             gdf including all the features from public.ways table
         """
 
-        gdf = gpd.read_postgis(con=db_engine, sql=query, geom_col="geom", crs="epsg:4326")
+        gdf = self.read_postgis(db_engine, query, geom_col="geom", crs="epsg:4326")
         gdf = gdf[gdf["geom"] != None]
         return gdf
 
@@ -977,24 +1915,9 @@ class SeamarkCrossing(ContinuousCheck):
              bool of spatial relation result (True or False)
          """
 
-        query_tree = []
         if self.concat_tree is not None:
-            for i in range(len(lat_start)):
-                start_point = Point(lon_start[i], lat_start[i])
-                end_point = Point(lon_end[i], lat_end[i])
-                line = LineString([start_point, end_point])
-                route_df = gpd.GeoDataFrame(geometry=[line])
-
-                geom_object = self.concat_tree.query(route_df["geometry"], predicate='intersects').tolist()
-
-                if geom_object == [[], []] or geom_object == []:
-                    # if route is not constrained
-                    query_tree.append(False)
-                    logger.debug(f'NO CROSSING for  {line} in the query tree: {query_tree} ')
-                else:
-                    # if route is constrained
-                    query_tree.append(True)
-                    logger.debug(f'CROSSING for  {line} in the query tree: {query_tree} ')
+            query_tree = self.check_segments_in_tree(self.concat_tree, lat_start, lon_start, lat_end, lon_end)
+            logger.debug(f'CROSSING for {sum(query_tree)} of {len(query_tree)} segments')
 
             # returns a list bools (spatial relation)
             return query_tree
@@ -1004,12 +1927,32 @@ class LandPolygonsCrossing(ContinuousCheck):
     """
     Use the 'LandPolygonsCrossing' constraint cautiously.
     This class is yet to be tested.
+
+    On loading, land polygons that are larger than tile_size are split into pieces on a regular grid of tiles. Tiles
+    that are completely covered by land (interior tiles) are stored in a separate STRtree: segments that intersect an
+    interior tile cross land without any further test. Segments that do not intersect the bounding box of any piece
+    (exterior) are discarded by the STRtree. Only the remaining candidates are tested against the pieces, which are
+    small and prepared. Optionally, the polygons are simplified and buffered by simplify_tolerance (degree), such that
+    the simplified polygons contain the original ones.
+
+    Attributes
+    ----------
+
+    tile_size : float
+        size of the tiles (degree)
+
+    simplify_tolerance : float
+        tolerance for the simplification of the polygons (degree); None: no simplification
     """
+    is_static = True
     land_polygon_STRTree = None
+    interior_tile_STRTree = None
 
-    def __init__(self, map_size=None, db_engine=None):
-        super().__init__(db_engine=db_engine)
+    def __init__(self, map_size=None, db_engine=None, spatial_cache=None, tile_size=0.5, simplify_tolerance=None):
+        super().__init__(db_engine=db_engine, spatial_cache=spatial_cache)
         self.map_size = map_size
+        self.tile_size = tile_size
+        self.simplify_tolerance = simplify_tolerance
 
         if db_engine is None:
             landpolygon_query = self.build_landpolygon_query(map_size)
@@ -1024,9 +1967,55 @@ class LandPolygonsCrossing(ContinuousCheck):
 
     def set_landpolygon_STRTree(self, db_engine=None, query=None):
         land_polygon_gdf = self.query_land_polygons(db_engine, query)
-        land_STRTree = STRtree(land_polygon_gdf["geom"])
+        land_STRTree = self.build_tiled_index(land_polygon_gdf["geom"].values)
         return land_STRTree
 
+    def build_tiled_index(self, polygons):
+        """
+        Split the land polygons into tiles and set the STRtree of the interior tiles
+
+        Parameters
+        ----------
+        polygons : np.array
+            land polygons
+
+        Returns
+        ----------
+        land_STRTree : STRtree
+            tree of the prepared pieces of the land polygons
+        """
+        polygons = np.asarray(polygons, dtype=object)
+        polygons = polygons[~shapely.is_missing(polygons)]
+        if self.simplify_tolerance:
+            polygons = shapely.buffer(shapely.simplify(polygons, self.simplify_tolerance, preserve_topology=True),
+                                      self.simplify_tolerance)
+
+        pieces = []
+        interior_tiles = []
+        for polygon in polygons:
+            min_lon, min_lat, max_lon, max_lat = polygon.bounds
+            if max(max_lon - min_lon, max_lat - min_lat) <= self.tile_size:
+                pieces.append(polygon)
+                continue
+
+            tile_lons = np.arange(np.floor(min_lon / self.tile_size) * self.tile_size, max_lon, self.tile_size)
+            tile_lats = np.arange(np.floor(min_lat / self.tile_size) * self.tile_size, max_lat, self.tile_size)
+            tile_lons, tile_lats = np.meshgrid(tile_lons, tile_lats)
+            tiles = shapely.box(tile_lons, tile_lats, tile_lons + self.tile_size, tile_lats + self.tile_size).ravel()
+
+            shapely.prepare(polygon)
+            is_interior = shapely.covers(polygon, tiles)
+            is_boundary = ~is_interior & shapely.intersects(polygon, tiles)
+            interior_tiles.extend(tiles[is_interior])
+            pieces.extend(shapely.intersection(polygon, tiles[is_boundary]))
+
+        pieces = np.asarray(pieces, dtype=object)
+        shapely.prepare(pieces)
+        self.interior_tile_STRTree = STRtree(interior_tiles) if interior_tiles else None
+        logger.debug(f'{len(polygons)} land polygons split into {len(pieces)} pieces and {len(interior_tiles)} '
+                     f'interior tiles')
+        return STRtree(pieces)
+
     def query_land_polygons(self, db_engine, query):
         """
         Create new GeoDataFrame using public.ways table in the query
@@ -1045,7 +2034,7 @@ class LandPolygonsCrossing(ContinuousCheck):
             gdf including all the features from public.ways table
         """
 
-        gdf = gpd.read_postgis(sql=query, con=db_engine, geom_col="geom")  # .drop(columns=["GEOMETRY"])
+        gdf = self.read_postgis(db_engine, query, geom_col="geom")  # .drop(columns=["GEOMETRY"])
         gdf = gdf[gdf["geom"] != None]
 
         return gdf
@@ -1076,24 +2065,22 @@ class LandPolygonsCrossing(ContinuousCheck):
             bool of spatial relation result (True or False)
         """
 
-        query_tree = []
         if self.land_polygon_STRTree is not None:
-            # generating the LineString geometry from start and end point
-            for i in range(len(lat_start)):
-                start_point = Point(lon_start[i], lat_start[i])
-                end_point = Point(lon_end[i], lat_end[i])
-                line = LineString([start_point, end_point])
-
-                route_df = gpd.GeoDataFrame(geometry=[line])
-                geom_object = self.land_polygon_STRTree.query(route_df["geometry"], predicate="intersects").tolist()
-
-                # checks if there is spatial relation between routes and seamarks objects
-                if geom_object == [[], []] or geom_object == []:
-                    # if route is not constrained
-                    query_tree.append(False)
-                else:
-                    # if route is constrained
-                    query_tree.append(True)
+            lines = self.get_segment_lines(lat_start, lon_start, lat_end, lon_end)
+            is_constrained = np.full(lines.shape[0], False)
+
+            # segments crossing tiles that are completely covered by land
+            if self.interior_tile_STRTree is not None:
+                segment_index, _ = self.interior_tile_STRTree.query(lines, predicate='intersects')
+                is_constrained[segment_index] = True
+
+            # exact test of the remaining segments against the prepared pieces with intersecting bounding boxes
+            candidates = np.flatnonzero(~is_constrained)
+            segment_index, piece_index = self.land_polygon_STRTree.query(lines[candidates])
+            pieces = self.land_polygon_STRTree.geometries.take(piece_index)
+            shapely.prepare(pieces)
+            is_crossing = shapely.intersects(pieces, lines[candidates][segment_index])
+            is_constrained[candidates[segment_index[is_crossing]]] = True
 
             # returns a list bools (spatial relation)
-            return query_tree
+            return is_constrained.tolist()
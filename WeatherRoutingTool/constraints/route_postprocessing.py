@@ -12,6 +12,7 @@ from geovectorslib import geod
 from shapely.geometry import box, LineString, Point
 from shapely.ops import polygonize_full
 
+from WeatherRoutingTool.constraints.spatial_cache import SpatialQueryCache
 from WeatherRoutingTool.routeparams import RouteParams
 from WeatherRoutingTool.ship.ship import Boat
 
@@ -29,9 +30,11 @@ class RoutePostprocessing:
     starttime_per_step: list
     ship_speed: list
     boat: Boat
+    spatial_cache: SpatialQueryCache  # local cache for the query results (optional)
 
-    def __init__(self, min_fuel_route, boat, db_engine=None):
+    def __init__(self, min_fuel_route, boat, db_engine=None, spatial_cache=None):
         self.set_data(min_fuel_route, boat)
+        self.spatial_cache = spatial_cache
 
         if db_engine is not None:
             self.engine = db_engine
@@ -42,7 +45,10 @@ class RoutePostprocessing:
             self.password = os.getenv("WRT_DB_PASSWORD")
             self.schema = os.getenv("POSTGRES_SCHEMA")
             self.port = os.getenv("WRT_DB_PORT")
-            self.engine = self.connect_database()
+            if spatial_cache is not None and spatial_cache.offline:
+                self.engine = None
+            else:
+                self.engine = self.connect_database()
 
     def set_data(self, route, boat):
         self.route = route
@@ -158,6 +164,8 @@ class RoutePostprocessing:
         return bbox
 
     def query_data(self, query, engine):
+        if self.spatial_cache is not None:
+            return self.spatial_cache.read_postgis(query, engine)
         gdf_seamark = gpd.read_postgis(query, engine)
         return gdf_seamark
 
@@ -434,7 +442,7 @@ class RoutePostprocessing:
         courses = route_dict['courses']
         dists = route_dict['dist']
         start_times = route_dict['start_times']
-        arrival_time = start_times[-1] + timedelta(seconds=dists[-1].value / boat_speed.value)
+        arrival_time = start_times[-1] + np.timedelta64(round(dists[-1].value / boat_speed.value), 's')
 
         travel_times = np.append(travel_times, -99 * u.second)
         courses = np.append(courses, -99 * u.degree)
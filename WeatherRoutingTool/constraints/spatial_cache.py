@@ -0,0 +1,148 @@
+import hashlib
+import json
+import logging
+import os
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+
+import WeatherRoutingTool.utils.formatting as form
+
+logger = logging.getLogger('WRT.SpatialCache')
+
+
+class SpatialCacheMissError(RuntimeError):
+    pass
+
+
+class SpatialQueryCache:
+    """
+    Local cache for the results of spatial database queries (e.g. seamarks and land polygons).
+
+    The result of every query is stored as compressed numpy archive that is read without pickle, such that tampered
+    cache files can not execute code: the geometries and other bytes columns are stored as concatenated bytes with the
+    length of every element, numeric, boolean and datetime columns as numpy arrays and all other columns as JSON
+    strings. The cache files are
+    identified by the query (which contains the bounding box) and the version of
+    the data in the database; changing SPATIAL_DATA_VERSION after an update of the database invalidates all cached
+    results. In offline mode, the database is never queried and a SpatialCacheMissError is raised for queries that
+    are not cached.
+    """
+
+    cache_folder: str  # folder for the cache files
+    data_version: str  # version of the data in the database
+    offline: bool  # read only from the cache
+
+    def __init__(self, cache_folder, data_version='', offline=False):
+        self.cache_folder = cache_folder
+        self.data_version = data_version
+        self.offline = offline
+
+    def get_cache_file(self, query):
+        key = hashlib.sha1((str(self.data_version) + '\n' + query).encode()).hexdigest()
+        return os.path.join(self.cache_folder, 'query_' + key + '.npz')
+
+    def read_postgis(self, query, engine, geom_col='geom', crs=None):
+        """
+        Return the result of the query as GeoDataFrame, from the cache if available and from the database otherwise.
+        Arguments are the same as for geopandas.read_postgis.
+        """
+        cache_file = self.get_cache_file(query)
+        if os.path.isfile(cache_file):
+            logger.debug('Reading query result from ' + cache_file)
+            return self.read_cache_file(cache_file, geom_col, crs)
+        if self.offline:
+            raise SpatialCacheMissError('No cached result for query "' + query + '" in ' + self.cache_folder +
+                                        ' (offline mode)')
+
+        gdf = gpd.read_postgis(sql=query, con=engine, geom_col=geom_col, crs=crs)
+        self.write_cache_file(gdf, cache_file, geom_col)
+        logger.info(form.get_log_step('Writing query result to ' + cache_file, 1))
+        return gdf
+
+    def write_cache_file(self, gdf, cache_file, geom_col):
+        arrays = {'columns': np.array(json.dumps([str(column) for column in gdf.columns])),
+                  'crs': np.array(gdf.crs.to_string() if gdf.crs is not None else '')}
+        self.encode_values(gdf.index.to_numpy(), 'index', arrays)
+        self.encode_values(gdf[geom_col].to_wkb().to_numpy(), 'geometry', arrays)
+        for icolumn, column in enumerate(gdf.columns):
+            if column != geom_col:
+                self.encode_values(gdf[column].to_numpy(), 'column_' + str(icolumn), arrays)
+
+        os.makedirs(self.cache_folder, exist_ok=True)
+        # write to a temporary file first such that concurrent runs never read incomplete files
+        tmp_file = cache_file + '.' + str(os.getpid()) + '.tmp'
+        with open(tmp_file, 'wb') as file:
+            np.savez_compressed(file, **arrays)
+        os.replace(tmp_file, cache_file)
+
+    @staticmethod
+    def encode_values(values, key, arrays):
+        """
+        Store the values in arrays[key] without numpy object arrays: numeric, boolean and datetime arrays are stored
+        unchanged, bytes (e.g. WKB) are concatenated with the length of every element in arrays[key + '_lengths']
+        (-1 for missing values) and all other values are stored as JSON strings. The encoding is stored in
+        arrays[key + '_encoding'].
+        """
+        if values.dtype.kind in 'biufcmM':
+            encoding = 'array'
+            arrays[key] = values
+        elif all(isinstance(value, bytes) or value is None for value in values):
+            encoding = 'bytes'
+            arrays[key] = np.frombuffer(b''.join(value for value in values if value is not None), dtype=np.uint8)
+            arrays[key + '_lengths'] = np.array([len(value) if value is not None else -1 for value in values],
+                                                dtype=np.int64)
+        else:
+            encoding = 'json'
+            arrays[key] = np.array([json.dumps(value, default=str) for value in values], dtype=str)
+        arrays[key + '_encoding'] = np.array(encoding)
+
+    @staticmethod
+    def decode_values(data, key):
+        """
+        Return the values stored by encode_values; bytes and JSON values are returned as numpy object array.
+        """
+        encoding = str(data[key + '_encoding'])
+        if encoding == 'array':
+            return data[key]
+        if encoding == 'bytes':
+            buffer = data[key].tobytes()
+            lengths = data[key + '_lengths']
+            offsets = np.cumsum(np.maximum(lengths, 0)) - np.maximum(lengths, 0)
+            values = [buffer[offset:offset + length] if length >= 0 else None for offset, length in
+                      zip(offsets, lengths)]
+        else:
+            values = [json.loads(value) for value in data[key]]
+        decoded = np.empty(len(values), dtype=object)
+        decoded[:] = values
+        return decoded
+
+    @staticmethod
+    def read_cache_file(cache_file, geom_col, crs=None):
+        with np.load(cache_file, allow_pickle=False) as data:
+            columns = json.loads(str(data['columns']))
+            if crs is None:
+                crs = str(data['crs']) or None
+            index = SpatialQueryCache.decode_values(data, 'index')
+            attributes = {}
+            for icolumn, column in enumerate(columns):
+                if column == geom_col:
+                    attributes[column] = gpd.GeoSeries.from_wkb(SpatialQueryCache.decode_values(data, 'geometry'),
+                                                                index=index, crs=crs)
+                else:
+                    attributes[column] = SpatialQueryCache.decode_values(data, 'column_' + str(icolumn))
+
+        df = pd.DataFrame(attributes, index=index, columns=columns)
+        return gpd.GeoDataFrame(df, geometry=geom_col, crs=crs)
+
+
+def get_spatial_cache(config):
+    """
+    Return the SpatialQueryCache configured by SPATIAL_CACHE_PATH or None if no cache is configured.
+    """
+    if config.SPATIAL_CACHE_PATH is None:
+        if config.SPATIAL_CACHE_OFFLINE:
+            raise ValueError('SPATIAL_CACHE_OFFLINE requires SPATIAL_CACHE_PATH to be set.')
+        return None
+    return SpatialQueryCache(config.SPATIAL_CACHE_PATH, config.SPATIAL_DATA_VERSION, config.SPATIAL_CACHE_OFFLINE)
@@ -0,0 +1,117 @@
+import copy
+import logging
+import os
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+import WeatherRoutingTool.utils.formatting as form
+from WeatherRoutingTool.algorithms.routingalg_factory import RoutingAlgFactory
+from WeatherRoutingTool.constraints.constraints import ConstraintsList, ConstraintsListFactory
+from WeatherRoutingTool.routeparams import RouteParams
+from WeatherRoutingTool.ship.ship import Boat
+from WeatherRoutingTool.ship.ship_factory import ShipFactory
+from WeatherRoutingTool.utils.maps import Map
+from WeatherRoutingTool.weather_factory import WeatherFactory
+
+logger = logging.getLogger('WRT.DepartureSweep')
+
+
+class DepartureSweep:
+    """
+    Comparison of the routes for DEPARTURE_TIME_SWEEP_SLOTS departure times that are DEPARTURE_TIME_SWEEP_INTERVAL
+    hours apart, starting at DEPARTURE_TIME.
+
+    Weather data, boat and constraints are loaded once and are shared by the routings for all departure times. The
+    weather data is requested for the full time range of the sweep. The route of every departure time is written to
+    ROUTE_PATH/departure_sweep and a table of fuel consumption vs. departure time to ROUTE_PATH/departure_sweep.csv.
+    """
+
+    config: object
+    boat: Boat
+    constraints_list: ConstraintsList
+    departure_times: list  # departure times of the sweep
+
+    def __init__(self, config, boat=None, constraints_list=None):
+        self.config = config
+
+        first_departure = datetime.strptime(config.DEPARTURE_TIME, '%Y-%m-%dT%H:%MZ')
+        self.departure_times = [first_departure + timedelta(hours=islot * config.DEPARTURE_TIME_SWEEP_INTERVAL)
+                                for islot in range(config.DEPARTURE_TIME_SWEEP_SLOTS)]
+
+        self.boat = boat
+        if self.boat is None:
+            self.boat = ShipFactory.get_ship(config)
+
+        self.constraints_list = constraints_list
+        if self.constraints_list is None:
+            self.constraints_list = ConstraintsListFactory.from_config(config, self.boat)
+
+    def print_init(self):
+        logger.info('Departure-time sweep with ' + str(len(self.departure_times)) + ' departure times:')
+        for departure_time in self.departure_times:
+            logger.info(form.get_log_step(str(departure_time), 1))
+
+    def execute_sweep(self):
+        """
+        Run the routing for all departure times.
+
+        :return: table of fuel consumption vs. departure time (pandas.DataFrame), list of routes (RouteParams)
+        """
+        self.print_init()
+
+        lat1, lon1, lat2, lon2 = self.config.DEFAULT_MAP
+        sweep_hours = (self.departure_times[-1] - self.departure_times[0]).total_seconds() / 3600
+        wt = WeatherFactory.get_weather(self.config.DATA_MODE, self.config.WEATHER_DATA, self.departure_times[0],
+                                        self.config.TIME_FORECAST + sweep_hours, self.config.DELTA_TIME_FORECAST,
+                                        Map(lat1, lon1, lat2, lon2))
+
+        output_folder = os.path.join(self.config.ROUTE_PATH, 'departure_sweep')
+        os.makedirs(output_folder, exist_ok=True)
+
+        routes = []
+        for departure_time in self.departure_times:
+            logger.info(form.get_line_string())
+            logger.info('Routing for departure time ' + str(departure_time))
+
+            slot_config = copy.copy(self.config)
+            slot_config.DEPARTURE_TIME = departure_time.strftime('%Y-%m-%dT%H:%MZ')
+            alg = RoutingAlgFactory.get_routing_alg(slot_config)
+            # per-step figures of the different departure times would overwrite each other
+            alg.disable_figures()
+
+            route = alg.execute_routing(self.boat, wt, self.constraints_list)
+            route.return_route_to_API(os.path.join(output_folder,
+                                                   'route_' + departure_time.strftime('%Y%m%dT%H%M') + '.json'))
+            routes.append(route)
+
+        summary = self.get_summary(routes)
+        summary_path = os.path.join(self.config.ROUTE_PATH, 'departure_sweep.csv')
+        summary.to_csv(summary_path, index=False)
+        logger.info('Write fuel consumption vs. departure time to ' + summary_path)
+        logger.info('\n' + summary.to_string(index=False))
+        return summary, routes
+
+    def get_summary(self, routes):
+        """
+        Return the table of fuel consumption, travel time and distance vs. departure time. Routes that do not reach
+        the destination are marked accordingly.
+        """
+        finish = self.config.DEFAULT_ROUTE[2:4]
+        rows = []
+        for departure_time, route in zip(self.departure_times, routes):
+            travel_time = np.sum(route.get_time_passed_per_step()).value
+            rows.append({
+                'departure_time': departure_time.strftime('%Y-%m-%dT%H:%MZ'),
+                'arrival_time': (departure_time + timedelta(seconds=travel_time)).strftime('%Y-%m-%dT%H:%MZ'),
+                'fuel_kg': route.get_full_fuel().value,
+                'travel_time_h': travel_time / 3600,
+                'distance_km': route.get_full_dist().value / 1000,
+                'reached_destination': self.reached_destination(route, finish),
+            })
+        return pd.DataFrame(rows)
+
+    @staticmethod
+    def reached_destination(route: RouteParams, finish):
+        return bool(np.isclose(route.lats_per_step[-1], finish[0]) and np.isclose(route.lons_per_step[-1], finish[1]))
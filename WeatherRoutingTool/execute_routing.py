@@ -7,6 +7,7 @@ from WeatherRoutingTool.ship.ship_factory import ShipFactory
 from WeatherRoutingTool.weather_factory import WeatherFactory
 from WeatherRoutingTool.constraints.constraints import ConstraintsListFactory, WaterDepth
 from WeatherRoutingTool.constraints.route_postprocessing import RoutePostprocessing
+from WeatherRoutingTool.constraints.spatial_cache import get_spatial_cache
 from WeatherRoutingTool.algorithms.routingalg_factory import RoutingAlgFactory
 from WeatherRoutingTool.utils.maps import Map
 from compare_routes import do_plot_route_function
@@ -42,13 +43,10 @@ def execute_routing(config):
 
     # *******************************************
     # initialise constraints
+    spatial_cache = get_spatial_cache(config)
     water_depth = WaterDepth(config.DATA_MODE, boat.get_required_water_depth(),
                              default_map, depthfile)
-    constraint_list = ConstraintsListFactory.get_constraints_list(
-        constraints_string_list=config.CONSTRAINTS_LIST, data_mode=config.DATA_MODE,
-        min_depth=boat.get_required_water_depth(),
-        map_size=default_map, depthfile=depthfile, waypoints=config.INTERMEDIATE_WAYPOINTS,
-        courses_path=config.COURSES_FILE)
+    constraint_list = ConstraintsListFactory.from_config(config, boat)
 
     # *******************************************
     # initialise route
@@ -66,7 +64,7 @@ def execute_routing(config):
     rp_str_list = [rp_1_str]
     do_plot_route_function(rp_read, rp_list, rp_str_list, depthfile, True)
     if config.ROUTE_POSTPROCESSING:
-        postprocessed_route = RoutePostprocessing(min_fuel_route, boat)
+        postprocessed_route = RoutePostprocessing(min_fuel_route, boat, spatial_cache=spatial_cache)
         min_fuel_route_postprocessed = postprocessed_route.post_process_route()
         min_fuel_route_postprocessed.return_route_to_API(routepath + '/' + str(min_fuel_route_postprocessed.route_type)
                                                          + '_postprocessed' + ".json")
@@ -0,0 +1,130 @@
+import copy
+import json
+import logging
+import os
+from datetime import datetime
+
+import numpy as np
+from geovectorslib import geod
+
+import WeatherRoutingTool.utils.formatting as form
+from WeatherRoutingTool.algorithms.routingalg_factory import RoutingAlgFactory
+from WeatherRoutingTool.constraints.constraints import ConstraintsList, ConstraintsListFactory, RouteCorridor
+from WeatherRoutingTool.routeparams import RouteParams
+from WeatherRoutingTool.ship.ship import Boat
+from WeatherRoutingTool.ship.ship_factory import ShipFactory
+from WeatherRoutingTool.utils.maps import Map
+from WeatherRoutingTool.weather_factory import WeatherFactory
+
+logger = logging.getLogger('WRT.Rerouting')
+
+
+class Rerouting:
+    """
+    Update of a route from the current position of the vessel whenever a new weather forecast is available.
+
+    The boat and the constraints list are initialised once and are reused for every update such that static data (e.g.
+    depth data and land masks) is not loaded again. The search is restricted to a corridor around the remaining part
+    of the previous route (RouteCorridor constraint). For the genetic algorithm, the remaining part of the previous
+    route is additionally used to seed the initial population.
+    """
+
+    config: object  # configuration of the original routing
+    boat: Boat
+    constraints_list: ConstraintsList
+    corridor_half_width: float  # half width of the corridor around the previous route (m)
+
+    def __init__(self, config, boat=None, constraints_list=None):
+        self.config = config
+        self.corridor_half_width = config.REROUTING_CORRIDOR_WIDTH / 2
+
+        self.boat = boat
+        if self.boat is None:
+            self.boat = ShipFactory.get_ship(config)
+
+        self.constraints_list = constraints_list
+        if self.constraints_list is None:
+            self.constraints_list = ConstraintsListFactory.from_config(config, self.boat)
+
+    def reroute(self, previous_route: RouteParams, position, current_time: datetime, weather_path):
+        """
+        Determine a new route from the current position of the vessel to the destination of the previous route.
+
+        :param previous_route: route that is currently followed by the vessel
+        :param position: current position of the vessel (lat, lon)
+        :param current_time: current time which is used as departure time of the new route
+        :param weather_path: path to the netCDF file of the new weather forecast
+        :return: updated route
+        """
+        logger.info(form.get_line_string())
+        logger.info('Re-routing from ' + str(position) + ' at ' + str(current_time))
+
+        remaining_lats, remaining_lons = self.get_remaining_route(previous_route, position)
+        config = self.get_rerouting_config(position, (remaining_lats[-1], remaining_lons[-1]), current_time,
+                                           weather_path)
+
+        lat1, lon1, lat2, lon2 = config.DEFAULT_MAP
+        departure_time = datetime.strptime(config.DEPARTURE_TIME, '%Y-%m-%dT%H:%MZ')
+        wt = WeatherFactory.get_weather(config.DATA_MODE, weather_path, departure_time, config.TIME_FORECAST,
+                                        config.DELTA_TIME_FORECAST, Map(lat1, lon1, lat2, lon2))
+        self.boat.set_weather_path(weather_path)
+        self.boat.load_data()
+
+        if config.ALGORITHM_TYPE == 'genetic':
+            config.ROUTE_PATH = self.write_seed_route(remaining_lats, remaining_lons)
+            config.GENETIC_POPULATION_TYPE = 'from_geojson'
+
+        corridor = RouteCorridor(remaining_lats, remaining_lons, self.corridor_half_width)
+        corridor.print_info()
+        self.constraints_list.add_neg_constraint(corridor)
+        try:
+            alg = RoutingAlgFactory.get_routing_alg(config)
+            new_route = alg.execute_routing(self.boat, wt, self.constraints_list)
+        finally:
+            self.constraints_list.remove_neg_constraint(corridor)
+
+        return new_route
+
+    def get_rerouting_config(self, position, destination, current_time, weather_path):
+        """
+        Return a copy of the config for the route from the current position to the destination of the previous route.
+        """
+        config = copy.copy(self.config)
+        config.DEFAULT_ROUTE = [position[0], position[1], destination[0], destination[1]]
+        config.DEPARTURE_TIME = current_time.strftime('%Y-%m-%dT%H:%MZ')
+        config.WEATHER_DATA = weather_path
+        return config
+
+    @staticmethod
+    def get_remaining_route(previous_route: RouteParams, position):
+        """
+        Return the part of the previous route that has not yet been travelled. The waypoint closest to the current
+        position and all waypoints before it are replaced by the current position.
+
+        :return: lats, lons of the remaining route starting at the current position
+        """
+        lats = np.asarray(previous_route.lats_per_step, dtype=float)
+        lons = np.asarray(previous_route.lons_per_step, dtype=float)
+
+        dist = geod.inverse(np.full(lats.shape, position[0]), np.full(lons.shape, position[1]), lats, lons)['s12']
+        idx_closest = min(int(np.argmin(dist)), lats.shape[0] - 2)
+
+        remaining_lats = np.concatenate(([position[0]], lats[idx_closest + 1:]))
+        remaining_lons = np.concatenate(([position[1]], lons[idx_closest + 1:]))
+        return remaining_lats, remaining_lons
+
+    def write_seed_route(self, lats, lons):
+        """
+        Write the remaining part of the previous route to route_1.json of a 'rerouting' subfolder of ROUTE_PATH such
+        that it can be read by FromGeojsonPopulation.
+
+        :return: path to the folder containing the seed route
+        """
+        seed_folder = os.path.join(self.config.ROUTE_PATH, 'rerouting')
+        os.makedirs(seed_folder, exist_ok=True)
+
+        features = [{'type': 'Feature', 'geometry': {'type': 'Point', 'coordinates': [lon, lat]}, 'properties': {}}
+                    for lat, lon in zip(lats.tolist(), lons.tolist())]
+        with open(os.path.join(seed_folder, 'route_1.json'), 'w') as file:
+            json.dump({'type': 'FeatureCollection', 'features': features}, file, indent=4)
+        return seed_folder
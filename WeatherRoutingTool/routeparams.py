@@ -216,7 +216,7 @@ class RouteParams():
 
         lats_per_step = np.full(count, -99.)
         lons_per_step = np.full(count, -99.)
-        start_time_per_step = np.full(count, datetime.now())
+        start_time_per_step = np.full(count, np.datetime64('NaT'), dtype='datetime64[s]')
         speed = np.full(count, -99.)
         power = np.full(count, -99.)
         fuel_rate = np.full(count, -99.)
@@ -299,7 +299,7 @@ class RouteParams():
         finish = (lats_per_step[count - 1], lons_per_step[count - 1])
         gcr = -99
         route_type = 'read_from_file'
-        time = start_time_per_step[count - 1] - start_time_per_step[0]
+        time = (start_time_per_step[count - 1] - start_time_per_step[0]).item()
         dists_per_step = cls.get_dist_from_coords(cls, lats_per_step, lons_per_step)
         dists_per_step = dists_per_step[:-1]
 
@@ -497,15 +497,8 @@ class RouteParams():
         plt.xticks()
 
     def get_fuel_per_dist(self):
-        fuel_per_second = self.ship_params_per_step.fuel_rate
-        delta_time = np.full(self.count, timedelta(seconds=0))
-        fuel = np.array([]) * u.kg
-
-        for i in range(0, self.count):
-            delta_time[i] = self.starttime_per_step[i + 1] - self.starttime_per_step[i]
-            delta_time[i] = delta_time[i].total_seconds() * u.second
-            fuel = np.append(fuel, fuel_per_second[i] * delta_time[i])
-
+        fuel_per_second = self.ship_params_per_step.fuel_rate[:self.count]
+        fuel = fuel_per_second * self.get_time_passed_per_step()
         return fuel
 
     def set_ship_params(self, ship_params):
@@ -583,13 +576,10 @@ class RouteParams():
         courses = move["azi1"] * u.degree
         travel_times = dist / bs
 
-        start_times = np.full(npoints - 1, datetime.strptime('1970-01-01T00:00Z', '%Y-%m-%dT%H:%MZ'))
-        for ipoint in range(0, npoints - 1):
-            if ipoint == 0:
-                start_times[ipoint] = start_time
-            else:
-                start_times[ipoint] = (start_times[ipoint - 1] +
-                                       timedelta(seconds=travel_times[ipoint - 1].to(u.second).value))
+        # accumulate the travel times before rounding to full seconds such that rounding errors do not add up
+        time_since_start = np.zeros(npoints - 1)
+        time_since_start[1:] = np.cumsum(travel_times[:-1].to(u.second).value)
+        start_times = np.datetime64(start_time, 's') + np.rint(time_since_start).astype('timedelta64[s]')
         # ToDo: use logger.debug and args.debug
         if debug:
             print('dists: ', dist)
@@ -614,14 +604,18 @@ class RouteParams():
         return self.time
 
     def get_full_fuel(self):
-        full_fuel = 0
-        for ipoint in range(0, self.count):
-            time_passed = (self.starttime_per_step[ipoint + 1] - self.starttime_per_step[ipoint]).total_seconds()
-            fuel_per_step = self.ship_params_per_step.fuel_rate[ipoint] * time_passed * u.second
-            full_fuel = full_fuel + fuel_per_step
-
+        full_fuel = np.sum(self.get_fuel_per_dist())
         return full_fuel
 
+    def get_time_passed_per_step(self):
+        """
+        Return the time passed between the start of every routing step and the start of the next one. Works for
+        datetime64 arrays as well as for arrays of datetime objects.
+        """
+        starttime = np.asarray(self.starttime_per_step[:self.count + 1], dtype='datetime64[s]')
+        time_passed = np.diff(starttime) / np.timedelta64(1, 's')
+        return time_passed * u.second
+
     @classmethod
     def from_gzip_file(cls, filename):
         data = pandas.read_parquet(filename)
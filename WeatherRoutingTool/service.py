@@ -0,0 +1,263 @@
+import copy
+import itertools
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import WeatherRoutingTool.utils.formatting as form
+from WeatherRoutingTool.algorithms.routingalg_factory import RoutingAlgFactory
+from WeatherRoutingTool.config import (MANDATORY_CONFIG_VARIABLES, OPTIONAL_CONFIG_VARIABLES,
+                                       RECOMMENDED_CONFIG_VARIABLES)
+from WeatherRoutingTool.constraints.constraints import ConstraintsListFactory
+from WeatherRoutingTool.ship.ship_factory import ShipFactory
+from WeatherRoutingTool.utils.maps import Map
+from WeatherRoutingTool.weather_factory import WeatherFactory
+
+logger = logging.getLogger('WRT.Service')
+
+# config variables that determine the loaded environment and can therefore not be changed by a single job
+ENVIRONMENT_CONFIG_VARIABLES = ['BOAT_TYPE', 'CONFIG_PATH', 'CONSTRAINTS_LIST', 'CONSTRAINT_CACHE_PRECISION',
+                                'CONSTRAINT_CACHE_SIZE', 'CONSTRAINT_RASTER_CACHE', 'CONSTRAINT_RASTER_RESOLUTION',
+                                'COURSES_FILE', 'DATA_MODE', 'DEFAULT_MAP', 'DELTA_TIME_FORECAST', 'DEPTH_DATA',
+                                'INTERMEDIATE_WAYPOINTS', 'SPATIAL_CACHE_OFFLINE', 'SPATIAL_CACHE_PATH',
+                                'SPATIAL_DATA_VERSION', 'TIME_FORECAST', 'WEATHER_DATA']
+
+
+class JobSpecError(ValueError):
+    pass
+
+
+class RoutingService:
+    """
+    Resident routing service which loads weather data, boat and constraints once and accepts routing jobs.
+
+    A job is specified as dictionary of config variables (same names as for Config) that overwrite the config the
+    service has been started with, e.g. {"DEFAULT_ROUTE": [...], "DEPARTURE_TIME": "..."}. Variables which determine
+    the loaded environment (ENVIRONMENT_CONFIG_VARIABLES) can not be changed by a job; the weather forecast can be
+    replaced for all subsequent jobs via update_forecast. Jobs that are already running keep the forecast they
+    started with.
+
+    The service can be accessed via HTTP (see serve):
+        - GET  /status: loaded forecast and number of jobs
+        - POST /route: run a routing job; the body is the job specification, the response contains the route
+        - POST /forecast: replace the weather forecast; the body is {"WEATHER_DATA": <path>}
+    """
+
+    config: object  # config the service has been started with
+    environment: dict  # weather data, boat and constraints shared by all jobs
+    output_folder: str  # folder to which the routes of the jobs are written
+
+    def __init__(self, config, wt=None, boat=None, constraints_list=None):
+        self.config = config
+        self.output_folder = os.path.join(config.ROUTE_PATH, 'service')
+        self.lock = threading.Lock()
+        self.job_counter = itertools.count(1)
+        self.running_jobs = 0
+        self.finished_jobs = 0
+
+        if boat is None:
+            boat = ShipFactory.get_ship(config)
+        if constraints_list is None:
+            constraints_list = ConstraintsListFactory.from_config(config, boat)
+        if wt is None:
+            wt = self.load_weather(config.WEATHER_DATA)
+
+        self.environment = {'weather_path': config.WEATHER_DATA, 'wt': wt, 'boat': boat,
+                            'constraints_list': constraints_list}
+
+    def get_map(self):
+        lat1, lon1, lat2, lon2 = self.config.DEFAULT_MAP
+        return Map(lat1, lon1, lat2, lon2)
+
+    def load_weather(self, weather_path):
+        departure_time = datetime.strptime(self.config.DEPARTURE_TIME, '%Y-%m-%dT%H:%MZ')
+        return WeatherFactory.get_weather(self.config.DATA_MODE, weather_path, departure_time,
+                                          self.config.TIME_FORECAST, self.config.DELTA_TIME_FORECAST, self.get_map())
+
+    def update_forecast(self, weather_path):
+        """
+        Load a new weather forecast which is used by all jobs that start afterwards.
+        """
+        logger.info('Loading new forecast ' + weather_path)
+        wt = self.load_weather(weather_path)
+        boat = copy.copy(self.environment['boat'])
+        boat.set_weather_path(weather_path)
+        boat.load_data()
+
+        environment = dict(self.environment)
+        environment.update({'weather_path': weather_path, 'wt': wt, 'boat': boat})
+        # jobs pick up the environment once at their start, so replacing the reference swaps the forecast atomically
+        self.environment = environment
+
+    def get_job_config(self, job_spec):
+        """
+        Return a copy of the config of the service that is updated with the variables of the job specification.
+        """
+        valid_variables = (set(MANDATORY_CONFIG_VARIABLES) | set(RECOMMENDED_CONFIG_VARIABLES) |
+                           set(OPTIONAL_CONFIG_VARIABLES))
+        if not isinstance(job_spec, dict):
+            raise JobSpecError('The job specification has to be a dictionary of config variables.')
+        unknown = sorted(set(job_spec) - valid_variables)
+        if unknown:
+            raise JobSpecError('Unknown config variables: ' + str(unknown))
+        fixed = sorted(set(job_spec) & set(ENVIRONMENT_CONFIG_VARIABLES))
+        if fixed:
+            raise JobSpecError('Config variables ' + str(fixed) + ' are fixed by the environment of the service.')
+
+        job_config = copy.copy(self.config)
+        for var, value in job_spec.items():
+            setattr(job_config, var, value)
+        return job_config
+
+    @staticmethod
+    def get_job_courses_path(boat, job_id):
+        """
+        Return the path of the courses netCDF of a job if the boat exchanges courses and ship parameters with the
+        hydrodynamic model via this file (Tanker). Returns None for all other boats.
+        """
+        if not hasattr(boat, 'set_courses_path'):
+            return None
+        root, ext = os.path.splitext(boat.courses_path)
+        return root + '_job_' + str(job_id) + ext
+
+    @staticmethod
+    def get_boat(environment, courses_path):
+        """
+        Return the boat of the environment for a job. Boats that write the courses netCDF are copied such that
+        concurrent jobs do not overwrite each others files.
+        """
+        boat = environment['boat']
+        if courses_path is None:
+            return boat
+        boat = copy.copy(boat)
+        boat.set_courses_path(courses_path)
+        return boat
+
+    @staticmethod
+    def get_constraints_list(environment, courses_path):
+        """
+        Return a copy of the constraints list which shares the (read-only) constraints of the environment but has its
+        own routing state such that several jobs can run concurrently.
+        """
+        constraints_list = environment['constraints_list'].get_routing_copy()
+        if courses_path is not None:
+            constraints_list.set_courses_path(courses_path)
+        return constraints_list
+
+    @staticmethod
+    def check_departure_time(job_config, environment):
+        """
+        Raise a JobSpecError if the departure time of the job is not within the time range of the loaded forecast.
+        """
+        try:
+            departure_time = datetime.strptime(job_config.DEPARTURE_TIME, '%Y-%m-%dT%H:%MZ')
+        except (TypeError, ValueError):
+            raise JobSpecError('DEPARTURE_TIME ' + str(job_config.DEPARTURE_TIME) + ' does not match the format '
+                               'yyyy-mm-ddThh:mmZ.')
+        wt = environment['wt']
+        if not (wt.time_start <= departure_time < wt.time_end):
+            raise JobSpecError('DEPARTURE_TIME ' + job_config.DEPARTURE_TIME + ' is outside of the loaded forecast ('
+                               + str(wt.time_start) + ' to ' + str(wt.time_end) + ').')
+
+    def run_job(self, job_spec):
+        """
+        Run a routing job.
+
+        :param job_spec: dictionary of config variables that overwrite the config of the service
+        :return: dictionary with job id, forecast, fuel consumption, runtime and route (GeoJSON)
+        """
+        job_config = self.get_job_config(job_spec)
+        environment = self.environment
+        self.check_departure_time(job_config, environment)
+
+        with self.lock:
+            job_id = next(self.job_counter)
+            self.running_jobs += 1
+        logger.info(form.get_line_string())
+        logger.info('Starting job ' + str(job_id) + ' for route ' + str(job_config.DEFAULT_ROUTE))
+
+        start_time = time.time()
+        courses_path = self.get_job_courses_path(environment['boat'], job_id)
+        try:
+            alg = RoutingAlgFactory.get_routing_alg(job_config)
+            # per-step figures of concurrent jobs would overwrite each other
+            alg.disable_figures()
+            route = alg.execute_routing(self.get_boat(environment, courses_path), environment['wt'],
+                                        self.get_constraints_list(environment, courses_path))
+
+            os.makedirs(self.output_folder, exist_ok=True)
+            route_file = os.path.join(self.output_folder, 'job_' + str(job_id) + '.json')
+            route.return_route_to_API(route_file)
+            with open(route_file) as file:
+                route_dict = json.load(file)
+        finally:
+            if courses_path is not None and os.path.exists(courses_path):
+                os.remove(courses_path)
+            with self.lock:
+                self.running_jobs -= 1
+                self.finished_jobs += 1
+
+        return {'job_id': job_id, 'weather_path': environment['weather_path'],
+                'fuel_kg': route.get_full_fuel().value, 'runtime_s': time.time() - start_time, 'route': route_dict}
+
+    def get_status(self):
+        with self.lock:
+            return {'weather_path': self.environment['weather_path'], 'running_jobs': self.running_jobs,
+                    'finished_jobs': self.finished_jobs}
+
+    def make_server(self, host='127.0.0.1', port=8080):
+        """
+        Return an HTTP server which handles every request in a separate thread.
+        """
+        service = self
+
+        class RequestHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == '/status':
+                    self.send_json(200, service.get_status())
+                else:
+                    self.send_json(404, {'error': 'Unknown endpoint ' + self.path})
+
+            def do_POST(self):
+                try:
+                    length = int(self.headers.get('Content-Length', 0))
+                    body = json.loads(self.rfile.read(length) or b'{}')
+                    if self.path == '/route':
+                        self.send_json(200, service.run_job(body))
+                    elif self.path == '/forecast':
+                        if 'WEATHER_DATA' not in body:
+                            raise JobSpecError('Path to the new forecast has to be provided as WEATHER_DATA.')
+                        service.update_forecast(body['WEATHER_DATA'])
+                        self.send_json(200, service.get_status())
+                    else:
+                        self.send_json(404, {'error': 'Unknown endpoint ' + self.path})
+                except (JobSpecError, json.JSONDecodeError) as err:
+                    self.send_json(400, {'error': str(err)})
+                except Exception as err:
+                    logger.exception('Request ' + self.path + ' failed')
+                    self.send_json(500, {'error': repr(err)})
+
+            def send_json(self, code, content):
+                body = json.dumps(content, cls=form.NumpyArrayEncoder).encode()
+                self.send_response(code)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                logger.debug(format % args)
+
+        return ThreadingHTTPServer((host, port), RequestHandler)
+
+    def serve(self, host='127.0.0.1', port=8080):
+        server = self.make_server(host, port)
+        logger.info('Routing service listening on http://' + host + ':' + str(server.server_address[1]))
+        try:
+            server.serve_forever()
+        finally:
+            server.server_close()
@@ -50,12 +50,27 @@ class Boat:
     def get_boat_speed(self):
         return self.speed
 
+    def get_fuel_rate_lower_bound(self):
+        """
+        Return a lower bound on the fuel rate that holds for all weather conditions of the loaded weather data. It is
+        used by the bound-based pruning of the isobased algorithms. Returns None if the boat model can not guarantee
+        such a bound.
+        """
+        return None
+
     def print_init(self):
         pass
 
     def set_boat_speed(self, speed):
         self.speed = speed
 
+    def set_weather_path(self, path):
+        """
+        Set the path to the weather data. load_data needs to be called afterwards such that data derived from the
+        weather data (e.g. the converted weather data of the Tanker) is updated.
+        """
+        self.weather_path = path
+
     def evaluate_weather(self, ship_params, lats, lons, time):
         weather_data = xr.open_dataset(self.weather_path)
         n_coords = len(lats)
@@ -455,6 +470,76 @@ class DirectPowerBoat(Boat):
         P = self.power_at_sp * (Plin + self.power_at_sp) / (Plin * self.overload_factor + self.power_at_sp)
         return P
 
+    def get_min_wind_coeff(self, n_angles=18001):
+        """
+            calculate the minimum of the wind coefficient C_AA over all apparent wind angles [0°,180°]
+        """
+        wind_fac_small = self.get_wind_factors_small_angle(0)
+        wind_fac_large = self.get_wind_factors_large_angle(180)
+        psi_arr = np.linspace(0, 180, n_angles)
+
+        wind_coeff_arr = []
+        for psi in psi_arr:
+            wind_coeff_small = self.get_wind_coeff(psi, wind_fac_small['CLF'], wind_fac_small['CXLI'],
+                                                   wind_fac_small['CALF'])
+            wind_coeff_large = self.get_wind_coeff(psi, wind_fac_large['CLF'], wind_fac_large['CXLI'],
+                                                   wind_fac_large['CALF'])
+            if psi < 90:
+                wind_coeff_arr.append(wind_coeff_small)
+            elif psi > 90:
+                wind_coeff_arr.append(wind_coeff_large)
+            else:
+                # consider both branches and their average which is used for psi = 90°
+                wind_coeff_arr.append(min(wind_coeff_small, wind_coeff_large))
+        return min(wind_coeff_arr)
+
+    def get_max_wind_speed(self):
+        """
+            calculate the maximum true wind speed within the weather data
+        """
+        weather_data = xr.open_dataset(self.weather_path)
+        u_wind = weather_data['u-component_of_wind_height_above_ground']
+        v_wind = weather_data['v-component_of_wind_height_above_ground']
+        u_wind = u_wind.sel(height_above_ground=10, method='nearest').fillna(0)
+        v_wind = v_wind.sel(height_above_ground=10, method='nearest').fillna(0)
+        max_wind_speed = float(np.sqrt(u_wind * u_wind + v_wind * v_wind).max())
+        weather_data.close()
+        return max_wind_speed * u.meter / u.second
+
+    def get_min_added_resistance(self):
+        """
+            calculate the most negative added resistance that can be reached within the weather data
+
+            Only the wind resistance contributes. It is negative if the wind coefficient is negative (following
+            winds) and its magnitude is limited by the maximum apparent wind speed, i.e. the sum of the boat speed and
+            the maximum true wind speed.
+        """
+        min_wind_coeff = min(self.get_min_wind_coeff(), 0)
+        max_app_wind_speed = self.speed + self.get_max_wind_speed()
+        r_wind = 1 / 2 * self.air_mass_density * min_wind_coeff * self.Axv * max_app_wind_speed * max_app_wind_speed
+        return r_wind.to(u.Newton)
+
+    def get_fuel_rate_lower_bound(self):
+        """
+            calculate a lower bound on the fuel rate from the minimum power that can be reached within the weather data
+
+            The power is a monotonic function of the added resistance as long as the denominator of get_power does not
+            change sign. Thus, the minimum power is reached either for the most negative added resistance or (for
+            overload factors > 1) in the limit of large added resistances. Returns None if the denominator can change
+            sign within the range of added resistances such that no bound can be guaranteed.
+        """
+        min_added_resistance = self.get_min_added_resistance()
+        Plin_min = min_added_resistance * self.speed / self.eta_prop
+        if self.overload_factor < 0 or Plin_min * self.overload_factor + self.power_at_sp <= 0:
+            return None
+
+        if self.overload_factor <= 1:
+            P_min = self.get_power(min_added_resistance)
+        else:
+            P_min = self.power_at_sp / self.overload_factor
+        P_min = max(P_min.to(u.Watt), 0 * u.Watt)
+        return (self.fuel_rate * P_min).to(u.kg / u.second)
+
     def get_ship_parameters(self, courses, lats, lons, time, speed=None, unique_coords=False):
         debug = False
         n_requests = len(courses)
@@ -522,6 +607,9 @@ class ConstantFuelBoat(Boat):
         logger.info(form.get_log_step('boat speed' + str(self.speed), 1))
         logger.info(form.get_log_step('boat fuel rate' + str(self.fuel_rate), 1))
 
+    def get_fuel_rate_lower_bound(self):
+        return self.fuel_rate
+
     def get_ship_parameters(self, courses, lats, lons, time, speed=None, unique_coords=False):
         debug = False
         n_requests = len(courses)
@@ -0,0 +1,246 @@
+import logging
+
+import numpy as np
+from geovectorslib import geod
+
+import WeatherRoutingTool.utils.formatting as form
+
+logger = logging.getLogger('WRT.Geodesics')
+
+# WGS84
+EARTH_SEMI_MAJOR_AXIS = 6378137.0  # (m)
+EARTH_FLATTENING = 1 / 298.257223563
+EARTH_ECCENTRICITY_SQ = EARTH_FLATTENING * (2 - EARTH_FLATTENING)
+EARTH_MEAN_RADIUS = 6371008.8  # (m)
+# relative deviation of the radii of curvature of the ellipsoid from the mean radius (max. 5/3 f at the equator) plus
+# margin for the deviation of the azimuths
+HAVERSINE_RELATIVE_ERROR = 2 * EARTH_FLATTENING
+
+
+class GeodesicSolver:
+    """
+    Solves the direct and the inverse geodesic problem for arrays of points. The following methods are available:
+        - 'exact': Vincenty's approach on the WGS84 ellipsoid (geovectorslib.geod)
+        - 'haversine': spherical earth with mean radius
+        - 'local': equirectangular projection with the ellipsoidal radii of curvature at the mean latitude of every
+          leg. Only used for legs shorter than approx_max_dist, longer legs are computed exactly.
+    Independent of the method, legs which start or end within approx_max_dist of one of the exact points (destination
+    and intermediate waypoints) are always computed exactly. Points coinciding with an exact point do not trigger
+    this rule as they are the fixed anchor of the leg.
+
+    For every approximated leg, the worst-case deviation from the exact solution is estimated analytically (see
+    get_position_error_bound); the largest value (m) is stored in position_error_bound. Additionally, the leg with the
+    largest bound of every call is recomputed exactly and the largest deviation found (m) is stored in
+    sampled_position_error. The latter is only a diagnostic for how tight the bound is.
+    """
+    method: str  # 'exact', 'haversine' or 'local'
+    approx_max_dist: float  # maximum leg length for method 'local' and radius around exact points (m)
+    exact_lats: np.ndarray  # latitudes of points in the vicinity of which the exact solution is used
+    exact_lons: np.ndarray  # longitudes of points in the vicinity of which the exact solution is used
+    position_error_bound: float  # largest worst-case deviation from the exact solution of all approximated legs (m)
+    sampled_position_error: float  # largest deviation from the exact solution of the sampled legs (m)
+    n_exact: int  # number of legs computed exactly
+    n_approx: int  # number of legs computed with the approximative method
+
+    def __init__(self, method='exact', approx_max_dist=50000):
+        if method not in ['exact', 'haversine', 'local']:
+            raise ValueError('Geodesic method ' + str(method) + ' is not available! Options are: exact, haversine, '
+                                                                'local.')
+        self.method = method
+        self.approx_max_dist = approx_max_dist
+        self.exact_lats = np.array([])
+        self.exact_lons = np.array([])
+        self.position_error_bound = 0.
+        self.sampled_position_error = 0.
+        self.n_exact = 0
+        self.n_approx = 0
+
+    def print_init(self):
+        logger.info(form.get_log_step('geodesic method: ' + self.method, 1))
+        if self.method != 'exact':
+            logger.info(form.get_log_step('exact solution within ' + str(self.approx_max_dist) + ' m of: ' +
+                                          str(list(zip(self.exact_lats, self.exact_lons))), 2))
+
+    def print_error_summary(self):
+        if self.method == 'exact':
+            return
+        logger.info('Geodesic method ' + self.method + ': ' + str(self.n_approx) + ' legs approximated, ' +
+                    str(self.n_exact) + ' legs computed exactly, bound on the position error: ' +
+                    '{:.2f}'.format(self.position_error_bound) + ' m (largest error of the sampled legs: ' +
+                    '{:.2f}'.format(self.sampled_position_error) + ' m)')
+
+    def set_exact_points(self, lats, lons):
+        self.exact_lats = np.asarray(lats, dtype=float)
+        self.exact_lons = np.asarray(lons, dtype=float)
+
+    def direct(self, lats1, lons1, brgs, dists):
+        """
+        Same interface as geovectorslib.geod.direct: returns a dict with 'lat2', 'lon2' and 'azi2' for start points
+        (lats1, lons1), initial bearings brgs (degree) and distances dists (m).
+        """
+        lats1, lons1, brgs, dists = [np.atleast_1d(np.asarray(arr, dtype=float)) for arr in [lats1, lons1, brgs,
+                                                                                             dists]]
+        if self.method == 'exact':
+            return geod.direct(lats1, lons1, brgs, dists)
+
+        if self.method == 'haversine':
+            move = self.direct_haversine(lats1, lons1, brgs, dists)
+            use_approx = np.full(lats1.shape, True)
+        else:
+            move = self.direct_local(lats1, lons1, brgs, dists)
+            use_approx = dists < self.approx_max_dist
+        use_approx = use_approx & ~self.is_near_exact_point(lats1, lons1) & ~self.is_near_exact_point(move['lat2'],
+                                                                                                      move['lon2'])
+        if not use_approx.all():
+            move_exact = geod.direct(lats1[~use_approx], lons1[~use_approx], brgs[~use_approx], dists[~use_approx])
+            for key in ['lat2', 'lon2', 'azi2']:
+                move[key][~use_approx] = move_exact[key]
+
+        if use_approx.any():
+            error_bound = self.get_position_error_bound(lats1, move['lat2'], dists)[use_approx]
+            self.position_error_bound = max(self.position_error_bound, float(np.max(error_bound)))
+            idx = np.flatnonzero(use_approx)[np.argmax(error_bound)]
+            move_check = geod.direct(lats1[[idx]], lons1[[idx]], brgs[[idx]], dists[[idx]])
+            error = self.get_local_dist(move['lat2'][idx], move['lon2'][idx], move_check['lat2'][0],
+                                        move_check['lon2'][0])
+            self.sampled_position_error = max(self.sampled_position_error, float(error))
+
+        self.count_legs(use_approx)
+        return move
+
+    def inverse(self, lats1, lons1, lats2, lons2):
+        """
+        Same interface as geovectorslib.geod.inverse: returns a dict with 's12' (m), 'azi1' and 'azi2' (degree) for
+        the geodesics connecting (lats1, lons1) and (lats2, lons2).
+        """
+        lats1, lons1, lats2, lons2 = [np.atleast_1d(np.asarray(arr, dtype=float)) for arr in [lats1, lons1, lats2,
+                                                                                              lons2]]
+        if self.method == 'exact':
+            return geod.inverse(lats1, lons1, lats2, lons2)
+
+        if self.method == 'haversine':
+            dist = self.inverse_haversine(lats1, lons1, lats2, lons2)
+            use_approx = np.full(lats1.shape, True)
+        else:
+            dist = self.inverse_local(lats1, lons1, lats2, lons2)
+            use_approx = dist['s12'] < self.approx_max_dist
+        use_approx = use_approx & ~self.is_near_exact_point(lats1, lons1) & ~self.is_near_exact_point(lats2, lons2)
+
+        if not use_approx.all():
+            dist_exact = geod.inverse(lats1[~use_approx], lons1[~use_approx], lats2[~use_approx], lons2[~use_approx])
+            for key in ['s12', 'azi1', 'azi2']:
+                dist[key][~use_approx] = dist_exact[key]
+
+        if use_approx.any():
+            error_bound = self.get_position_error_bound(lats1, lats2, dist['s12'])[use_approx]
+            self.position_error_bound = max(self.position_error_bound, float(np.max(error_bound)))
+            idx = np.flatnonzero(use_approx)[np.argmax(error_bound)]
+            dist_check = geod.inverse(lats1[[idx]], lons1[[idx]], lats2[[idx]], lons2[[idx]])
+            delta_azi = np.radians(np.abs((dist['azi1'][idx] - dist_check['azi1'][0] + 180) % 360 - 180))
+            error = max(abs(dist['s12'][idx] - dist_check['s12'][0]), dist_check['s12'][0] * delta_azi)
+            self.sampled_position_error = max(self.sampled_position_error, float(error))
+
+        self.count_legs(use_approx)
+        return dist
+
+    def direct_haversine(self, lats1, lons1, brgs, dists):
+        lat1, lon1, brg = np.radians(lats1), np.radians(lons1), np.radians(brgs)
+        delta = dists / EARTH_MEAN_RADIUS
+
+        lat2 = np.arcsin(np.sin(lat1) * np.cos(delta) + np.cos(lat1) * np.sin(delta) * np.cos(brg))
+        lon2 = lon1 + np.arctan2(np.sin(brg) * np.sin(delta) * np.cos(lat1),
+                                 np.cos(delta) - np.sin(lat1) * np.sin(lat2))
+        back_azi = self.get_spherical_azimuth(lat2, lon2, lat1, lon1)
+
+        return {'lat2': np.degrees(lat2), 'lon2': self.wrap_lon(np.degrees(lon2)), 'azi2': (back_azi + 180) % 360}
+
+    def inverse_haversine(self, lats1, lons1, lats2, lons2):
+        lat1, lon1, lat2, lon2 = np.radians(lats1), np.radians(lons1), np.radians(lats2), np.radians(lons2)
+
+        hav = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+        s12 = 2 * EARTH_MEAN_RADIUS * np.arctan2(np.sqrt(hav), np.sqrt(1 - hav))
+        azi1 = self.get_spherical_azimuth(lat1, lon1, lat2, lon2)
+        azi2 = (self.get_spherical_azimuth(lat2, lon2, lat1, lon1) + 180) % 360
+        return {'s12': s12, 'azi1': azi1, 'azi2': azi2}
+
+    def direct_local(self, lats1, lons1, brgs, dists):
+        # first guess with radii at starting point, second pass at mean latitude and mean bearing
+        lat1 = np.radians(lats1)
+        brg = np.radians(brgs)
+        lat2 = lat1
+        delta_lon = np.zeros(lat1.shape)
+
+        for _ in range(2):
+            lat_mean = (lat1 + lat2) / 2
+            rad_meridian, rad_normal = self.get_radii_of_curvature(lat_mean)
+            brg_mean = brg + delta_lon * np.sin(lat_mean) / 2
+            lat2 = lat1 + dists * np.cos(brg_mean) / rad_meridian
+            delta_lon = dists * np.sin(brg_mean) / (rad_normal * np.cos((lat1 + lat2) / 2))
+
+        lat_mean = (lat1 + lat2) / 2
+        azi2 = np.degrees(brg + delta_lon * np.sin(lat_mean)) % 360
+        return {'lat2': np.degrees(lat2), 'lon2': self.wrap_lon(lons1 + np.degrees(delta_lon)), 'azi2': azi2}
+
+    def inverse_local(self, lats1, lons1, lats2, lons2):
+        lat_mean = np.radians(lats1 + lats2) / 2
+        delta_lon = np.radians(self.wrap_lon(lons2 - lons1))
+        rad_meridian, rad_normal = self.get_radii_of_curvature(lat_mean)
+
+        north = np.radians(lats2 - lats1) * rad_meridian
+        east = delta_lon * rad_normal * np.cos(lat_mean)
+        azi_mean = np.degrees(np.arctan2(east, north))
+        convergence = np.degrees(delta_lon * np.sin(lat_mean))
+
+        return {'s12': np.hypot(north, east), 'azi1': (azi_mean - convergence / 2) % 360,
+                'azi2': (azi_mean + convergence / 2) % 360}
+
+    def is_near_exact_point(self, lats, lons):
+        if self.exact_lats.shape[0] == 0:
+            return np.full(lats.shape, False)
+        dist = self.get_local_dist(lats[:, np.newaxis], lons[:, np.newaxis], self.exact_lats[np.newaxis, :],
+                                   self.exact_lons[np.newaxis, :])
+        return ((dist > 0) & (dist < self.approx_max_dist)).any(axis=1)
+
+    def get_position_error_bound(self, lats1, lats2, dists):
+        """
+        Worst-case deviation (m) of the end point (direct problem) or of distance and azimuth times distance (inverse
+        problem) from the exact solution for legs of length dists between latitudes lats1 and lats2:
+            - 'haversine': the sphere deviates from the ellipsoid by O(f) in length and direction, i.e. the error
+              grows linearly with the leg length (HAVERSINE_RELATIVE_ERROR * d)
+            - 'local': truncation of the projection. Evaluating the radii of curvature at the mean latitude leaves a
+              second-order term of the order of the flattening (f * d^2 / R); the meridian convergence adds a
+              third-order term that grows with 1 / cos^2 of the latitude (d^3 / (R^2 * cos^2(lat)))
+        """
+        if self.method == 'haversine':
+            return HAVERSINE_RELATIVE_ERROR * dists
+        cos_lat = np.cos(np.radians(np.maximum(np.abs(lats1), np.abs(lats2))))
+        return dists ** 2 / EARTH_MEAN_RADIUS * (EARTH_FLATTENING + dists / (EARTH_MEAN_RADIUS * cos_lat ** 2))
+
+    def count_legs(self, use_approx):
+        self.n_approx += int(np.count_nonzero(use_approx))
+        self.n_exact += int(use_approx.shape[0] - np.count_nonzero(use_approx))
+
+    @staticmethod
+    def get_local_dist(lats1, lons1, lats2, lons2):
+        lat_mean = np.radians(lats1 + lats2) / 2
+        rad_meridian, rad_normal = GeodesicSolver.get_radii_of_curvature(lat_mean)
+        north = np.radians(lats2 - lats1) * rad_meridian
+        east = np.radians(GeodesicSolver.wrap_lon(lons2 - lons1)) * rad_normal * np.cos(lat_mean)
+        return np.hypot(north, east)
+
+    @staticmethod
+    def get_radii_of_curvature(lat):
+        denominator = 1 - EARTH_ECCENTRICITY_SQ * np.sin(lat) ** 2
+        rad_meridian = EARTH_SEMI_MAJOR_AXIS * (1 - EARTH_ECCENTRICITY_SQ) / denominator ** 1.5
+        rad_normal = EARTH_SEMI_MAJOR_AXIS / np.sqrt(denominator)
+        return rad_meridian, rad_normal
+
+    @staticmethod
+    def get_spherical_azimuth(lat1, lon1, lat2, lon2):
+        azi = np.arctan2(np.sin(lon2 - lon1) * np.cos(lat2),
+                         np.cos(lat1) * np.sin(lat2) - np.sin(lat1) * np.cos(lat2) * np.cos(lon2 - lon1))
+        return np.degrees(azi) % 360
+
+    @staticmethod
+    def wrap_lon(lon):
+        return (lon + 180) % 360 - 180
@@ -1,3 +1,7 @@
+import logging
+import queue
+import threading
+
 import cartopy.crs as ccrs
 import cartopy.feature as cf
 import matplotlib.pyplot as plt
@@ -6,9 +10,12 @@ import numpy as np
 import os
 from astropy import units as u
 from geovectorslib import geod
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 from matplotlib.figure import Figure
 from PIL import Image
 
+logger = logging.getLogger('WRT.graphics')
+
 graphics_options = {'font_size': 20, 'fig_size': (12, 10)}
 
 
@@ -308,11 +315,77 @@ def generate_basemap(fig, depth, start=None, finish=None, title='', show_depth=T
         lons_gcr = [x[1] for x in gcr]
         ax.plot(lons_gcr, lats_gcr, color="red")
 
-    plt.title(title)
+    ax.set_title(title)
 
     return fig, ax
 
 
+class FigureRenderer:
+    """
+    Renders figures of the routing process in a background thread such that the routing does not wait for the
+    figures to be written.
+
+    The basemap (land, coastlines and depth) is rendered once. For every figure, the background is restored from the
+    rendered basemap and only the lines of the respective snapshot are drawn on top. Snapshots are passed via a queue
+    and consist of copies of the coordinates to be plotted, so the routing can modify its arrays right away.
+    """
+
+    def __init__(self, depth, start, finish, show_depth=True):
+        self.queue = queue.Queue()
+        self.thread = threading.Thread(target=self.run, args=(depth, start, finish, show_depth), daemon=True)
+        self.thread.start()
+
+    def submit(self, filename, lines=()):
+        """
+        Queue a figure for rendering.
+
+        :param filename: path of the figure
+        :param lines: list of tuples (lons, lats, plot_kwargs); for 2D arrays, every column is plotted as one line
+        """
+        lines = [(np.array(lons, dtype=float), np.array(lats, dtype=float), dict(kwargs))
+                 for lons, lats, kwargs in lines]
+        self.queue.put((filename, lines))
+
+    def close(self):
+        """
+        Wait until all queued figures are written and stop the rendering thread.
+        """
+        self.queue.put(None)
+        self.thread.join()
+
+    def run(self, depth, start, finish, show_depth):
+        try:
+            fig = Figure(figsize=get_standard('fig_size'))
+            canvas = FigureCanvasAgg(fig)
+            fig, ax = generate_basemap(fig, depth, start, finish, show_depth=show_depth)
+            # the extent of the basemap is kept such that the rendered background stays valid
+            ax.set_autoscale_on(False)
+            canvas.draw()
+            background = canvas.copy_from_bbox(fig.bbox)
+        except Exception:
+            logger.exception('Rendering of the basemap failed. No figures are written.')
+            return
+
+        while True:
+            snapshot = self.queue.get()
+            if snapshot is None:
+                break
+            filename, lines = snapshot
+            try:
+                canvas.restore_region(background)
+                artists = []
+                for lons, lats, kwargs in lines:
+                    artists.extend(ax.plot(lons, lats, **kwargs))
+                for artist in artists:
+                    ax.draw_artist(artist)
+                plt.imsave(filename, np.asarray(canvas.buffer_rgba()))
+                for artist in artists:
+                    artist.remove()
+                logger.info('Saved figure ' + filename)
+            except Exception:
+                logger.exception('Rendering of figure ' + filename + ' failed')
+
+
 def plot_genetic_algorithm_initial_population(src, dest, routes):
     figure_path = get_figure_path()
     if figure_path is not None:
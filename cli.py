@@ -1,7 +1,10 @@
 import argparse
 import warnings
 
+from WeatherRoutingTool.batch_routing import BatchRouting
+from WeatherRoutingTool.departure_sweep import DepartureSweep
 from WeatherRoutingTool.execute_routing import execute_routing
+from WeatherRoutingTool.service import RoutingService
 from WeatherRoutingTool.config import Config, set_up_logging
 
 if __name__ == "__main__":
@@ -15,6 +18,12 @@ if __name__ == "__main__":
                         required=False, type=str, default='False')
     parser.add_argument('--filter-warnings', help="Filter action. <default|error|ignore|always|module|once>."
                         "Defaults to 'default'.", required=False, type=str, default='default')
+    parser.add_argument('--routes-file', help="CSV or JSON file with a list of routes (absolute path) for batch "
+                        "routing. Overwrites DEFAULT_ROUTE.", required=False, type=str)
+    parser.add_argument('--processes', help="Number of processes for batch routing. Defaults to 1.",
+                        required=False, type=int, default=1)
+    parser.add_argument('--service-port', help="Start the routing service on the given port of localhost instead of "
+                        "calculating a single route.", required=False, type=int)
     args = parser.parse_args()
     if not args.file:
         raise RuntimeError("No config file name provided!")
@@ -43,4 +52,11 @@ if __name__ == "__main__":
 
     ##
     # run route optimization
-    execute_routing(config_obj)
+    if args.service_port:
+        RoutingService(config_obj).serve(port=args.service_port)
+    elif args.routes_file:
+        BatchRouting(config_obj, args.routes_file, args.processes).execute_batch()
+    elif config_obj.DEPARTURE_TIME_SWEEP_SLOTS > 1:
+        DepartureSweep(config_obj).execute_sweep()
+    else:
+        execute_routing(config_obj)
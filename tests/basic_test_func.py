@@ -1,4 +1,9 @@
+import json
 import os
+import time
+
+import numpy as np
+import xarray as xr
 
 from WeatherRoutingTool.algorithms.isobased import IsoBased
 from WeatherRoutingTool.algorithms.isofuel import IsoFuel
@@ -60,6 +65,38 @@ def create_dummy_Direct_Power_Ship(ship_config_path):
     return pol
 
 
+class CoursesFileBoat(DirectPowerBoat):
+    """
+    Direct power boat which writes the courses netCDF and reads it back like the Tanker does for the communication
+    with mariPower. The status of all courses is OK such that the StatusCodeError constraint does not discard any
+    route segment.
+    """
+
+    def set_courses_path(self, path):
+        self.courses_path = path
+
+    def get_ship_parameters(self, courses, lats, lons, time_arr, speed=None, unique_coords=False):
+        ds = xr.Dataset({'Status': (['it_pos', 'it_course'], np.ones((len(lats), 1)))},
+                        coords={'it_pos': np.arange(len(lats)), 'it_course': [0]})
+        ds['lat'] = (['it_pos'], np.asarray(lats, dtype=float))
+        ds['lon'] = (['it_pos'], np.asarray(lons, dtype=float))
+        ds.to_netcdf(self.courses_path)
+        # give concurrent routings the chance to overwrite the file
+        time.sleep(0.01)
+        ds_read = xr.load_dataset(self.courses_path)
+        assert np.array_equal(ds_read['lat'].to_numpy(), np.asarray(lats, dtype=float))
+        return super().get_ship_parameters(courses, lats, lons, time_arr, speed, unique_coords)
+
+
+def create_dummy_courses_file_boat(courses_path):
+    dirname = os.path.dirname(__file__)
+    boat = CoursesFileBoat(file_name=os.path.join(dirname, 'config.tests_simpleship.json'))
+    boat.weather_path = os.path.join(dirname, 'data/reduced_testdata_weather.nc')
+    boat.courses_path = courses_path
+    boat.load_data()
+    return boat
+
+
 def create_dummy_SeamarkCrossing_object(db_engine):
     seamark_obj = SeamarkCrossing(db_engine=db_engine)
     return seamark_obj
@@ -68,3 +105,31 @@ def create_dummy_SeamarkCrossing_object(db_engine):
 def create_dummy_landpolygonsCrossing_object(db_engine):
     landpolygoncrossing_obj = LandPolygonsCrossing(db_engine=db_engine)
     return landpolygoncrossing_obj
+
+
+def create_dummy_routing_config(route_path):
+    """
+    Config for a complete routing on the reduced test data (Baltic Sea between Rügen and Bornholm). The config is
+    written to route_path such that it can also be used to initialise the boat.
+    """
+    dirname = os.path.dirname(__file__)
+    with open(os.path.join(dirname, 'config.tests_simpleship.json')) as file:
+        config_dict = json.load(file)
+    config_dict.update({
+        'DEFAULT_ROUTE': [54.7, 13.6, 55.5, 14.4],
+        'DEFAULT_MAP': [54.1, 13.1, 56.0, 16.0],
+        'DEPARTURE_TIME': '2023-07-20T10:00Z',
+        'TIME_FORECAST': 24,
+        'DELTA_FUEL': 1000,
+        'ROUTER_HDGS_SEGMENTS': 10,
+        'ROUTER_HDGS_INCREMENTS_DEG': 6,
+        'ISOCHRONE_PRUNE_SEGMENTS': 10,
+        'CONSTRAINTS_LIST': ['land_crossing_global_land_mask', 'on_map'],
+        'WEATHER_DATA': os.path.join(dirname, 'data/reduced_testdata_weather.nc'),
+        'DEPTH_DATA': os.path.join(dirname, 'data/reduced_testdata_depth.nc'),
+        'ROUTE_PATH': str(route_path),
+    })
+    config_path = os.path.join(route_path, 'config.json')
+    with open(config_path, 'w') as file:
+        json.dump(config_dict, file)
+    return Config(file_name=config_path)
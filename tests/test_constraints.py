@@ -2,10 +2,12 @@ import os
 
 import numpy as np
 import xarray as xr
+from global_land_mask import globe
 
 import tests.basic_test_func as basic_test_func
 from WeatherRoutingTool.constraints.constraints import (ConstraintsList, ConstraintPars, LandCrossing,
-                                                        RunTestContinuousChecks, WaterDepth, WaveHeight,
+                                                        NegativeContraint, RouteCorridor, RunTestContinuousChecks,
+                                                        StaticConstraintRaster, StayOnMap, WaterDepth, WaveHeight,
                                                         StatusCodeError)
 from WeatherRoutingTool.utils.maps import Map
 
@@ -232,3 +234,329 @@ def test_check_crossing_status_errror():
     is_constrained = constraint_list.negative_constraints_continuous[0].check_crossing(ref_lat, ref_lon)
 
     assert np.array_equal(ref_is_constrained, is_constrained)
+
+
+'''
+    test whether RouteCorridor constrains points and route segments that leave the corridor around a route
+'''
+
+
+def test_route_corridor():
+    corridor = RouteCorridor(np.array([54., 54., 55.]), np.array([10., 12., 12.]), 20000.)
+
+    lat = np.array([54.1, 54.3, 54.5, 53.9, 55.5])
+    lon = np.array([11., 11., 12.2, 9.9, 12.])
+    dist = corridor.get_dist_to_route(lat, lon)
+    dist_test = np.array([11119.5, 33358.5, 12914.2, 12906.0, 55597.5])
+    assert np.allclose(dist, dist_test, rtol=0.01)
+    assert np.array_equal(corridor.constraint_on_point(lat, lon, None), np.array([False, True, False, False, True]))
+
+    is_constrained = [False, False]
+    constraint_list = generate_dummy_constraint_list()
+    constraint_list.add_neg_constraint(corridor)
+    is_constrained = constraint_list.safe_crossing(np.array([54., 54.]), np.array([10.5, 10.5]),
+                                                   np.array([54.1, 54.5]), np.array([11.5, 11.5]), None,
+                                                   is_constrained)
+    assert is_constrained[0] == 0
+    assert is_constrained[1] == 1
+
+
+'''
+    test whether the batched evaluation of all substeps in safe_crossing_discrete gives the same result as checking
+    the substeps one after another via safe_endpoint
+'''
+
+
+def test_safe_crossing_discrete_batched():
+    lat_start = np.array([54., 54., 54.5, 53.95])
+    lon_start = np.array([10.5, 10.5, 11.9, 10.1])
+    lat_end = np.array([54.1, 54.5, 55.3, 54.05])
+    lon_end = np.array([11.5, 11.5, 12.1, 10.6])
+    time = np.array([np.datetime64('2023-08-16T12:00')] * 4)
+
+    constraint_list = generate_dummy_constraint_list()
+    constraint_list.add_neg_constraint(RouteCorridor(np.array([54., 54., 55.]), np.array([10., 12., 12.]), 20000.))
+    is_constrained = constraint_list.safe_crossing_discrete(lat_start, lon_start, lat_end, lon_end, time,
+                                                            [False, False, False, False])
+
+    is_constrained_loop = np.full(4, False)
+    for fraction in np.arange(1, 11) / 10:
+        is_constrained_loop = constraint_list.safe_endpoint(lat_start + (lat_end - lat_start) * fraction,
+                                                            lon_start + (lon_end - lon_start) * fraction, time,
+                                                            is_constrained_loop)
+
+    assert np.array_equal(is_constrained, is_constrained_loop)
+    assert np.array_equal(is_constrained, np.array([False, True, True, False]))
+
+
+'''
+    test whether the raster of static constraints gives the same results as the exact constraints and whether it is
+    read from the cache folder
+'''
+
+
+def test_static_constraint_raster(tmp_path):
+    map_size = Map(53.0, 3.5, 55.5, 8.5)
+    on_map = StayOnMap()
+    on_map.set_map(map_size.lat1, map_size.lon1, map_size.lat2, map_size.lon2)
+    constraint_list = generate_dummy_constraint_list()
+    constraint_list.add_neg_constraint(LandCrossing())
+    constraint_list.add_neg_constraint(on_map)
+    constraint_list.add_neg_constraint(RouteCorridor(np.array([54., 54.]), np.array([3., 9.]), 100000.))
+
+    rng = np.random.default_rng(42)
+    lat = rng.uniform(52.8, 55.7, 2000)
+    lon = rng.uniform(3.3, 8.7, 2000)
+    is_constrained_exact = constraint_list.safe_endpoint(lat, lon, None, np.full(2000, False))
+
+    constraint_list.init_static_raster(map_size, 0.02, str(tmp_path))
+    raster = constraint_list.negative_constraints_discrete[0]
+    assert isinstance(raster, StaticConstraintRaster)
+    assert constraint_list.neg_dis_size == 2
+    assert np.any(raster.cells == StaticConstraintRaster.FREE)
+    assert np.any(raster.cells == StaticConstraintRaster.CONSTRAINED)
+    assert np.array_equal(constraint_list.safe_endpoint(lat, lon, None, np.full(2000, False)), is_constrained_exact)
+
+    assert len(os.listdir(tmp_path)) == 1
+    raster_cached = StaticConstraintRaster(raster.constraints, map_size, 0.02, str(tmp_path))
+    assert np.array_equal(raster_cached.cells, raster.cells)
+
+
+class ThinBand(NegativeContraint):
+    is_static = True
+
+    def __init__(self):
+        NegativeContraint.__init__(self, "ThinBand")
+
+    def constraint_on_point(self, lat, lon, time):
+        return (lat >= 54.02) & (lat < 54.03)
+
+
+'''
+    test whether the traversal of the raster cells detects features that are missed by the sampling of the segments
+    and agrees with a dense sampling of the segments
+'''
+
+
+def test_static_constraint_raster_crossing():
+    map_size = Map(53.0, 3.5, 55.5, 8.5)
+    lat_start = np.array([53.5, 53.5, 54.5])
+    lon_start = np.array([6., 6., 4.])
+    lat_end = np.array([54.5, 53.9, 54.5])
+    lon_end = np.array([6.3, 7., 8.])
+
+    constraint_list = generate_dummy_constraint_list()
+    constraint_list.add_neg_constraint(ThinBand())
+    is_constrained = constraint_list.safe_crossing_discrete(lat_start, lon_start, lat_end, lon_end, None,
+                                                            [False, False, False])
+    assert np.array_equal(is_constrained, np.array([False, False, False]))
+
+    constraint_list.init_static_raster(map_size, 0.05)
+    is_constrained = constraint_list.safe_crossing_discrete(lat_start, lon_start, lat_end, lon_end, None,
+                                                            [False, False, False])
+    assert np.array_equal(is_constrained, np.array([True, False, False]))
+
+    on_map = StayOnMap()
+    on_map.set_map(map_size.lat1, map_size.lon1, map_size.lat2, map_size.lon2)
+    raster = StaticConstraintRaster([LandCrossing(), on_map], map_size, 0.02)
+    rng = np.random.default_rng(42)
+    lat_start = rng.uniform(52.9, 55.6, 300)
+    lon_start = rng.uniform(3.4, 8.6, 300)
+    lat_end = lat_start + rng.uniform(-0.3, 0.3, 300)
+    lon_end = lon_start + rng.uniform(-0.3, 0.3, 300)
+
+    fractions = np.linspace(0, 1, 2001)
+    lat_dense = lat_start[:, np.newaxis] + (lat_end - lat_start)[:, np.newaxis] * fractions
+    lon_dense = lon_start[:, np.newaxis] + (lon_end - lon_start)[:, np.newaxis] * fractions
+    is_constrained_dense = raster.check_exact(lat_dense.ravel(), lon_dense.ravel()).reshape(300, 2001).any(axis=1)
+    assert np.array_equal(raster.check_crossing(lat_start, lon_start, lat_end, lon_end), is_constrained_dense)
+
+
+'''
+    test whether an island of one pixel of the land mask, which is smaller than the distance of the points at which
+    the cells would be sampled, is resolved by the raster for points and segments, and whether the raster agrees with
+    the exact constraints for coarse cells
+'''
+
+
+def test_static_constraint_raster_small_island():
+    map_size = Map(53.0, 3.5, 55.5, 8.5)
+    land_crossing = LandCrossing()
+    # land pixel at 53.775-53.7833N, 7.9583-7.9667E surrounded by water
+    lat_island = 53.78333 - 1 / 240
+    lon_island = 7.95833 + 1 / 240
+    assert land_crossing.constraint_on_point(np.array([lat_island]), np.array([lon_island]), None)[0]
+    assert not land_crossing.constraint_on_point(np.array([lat_island - 1 / 120, lat_island + 1 / 120]),
+                                                 np.array([lon_island, lon_island]), None).any()
+
+    raster = StaticConstraintRaster([land_crossing], map_size, 0.1, oversampling=4)
+    assert raster.get_cells(np.array([lat_island]), np.array([lon_island]))[0] == StaticConstraintRaster.BOUNDARY
+    assert raster.constraint_on_point(lat_island, lon_island, None)[0]
+    lat_start = np.array([lat_island - 0.04, lat_island - 0.04])
+    lon_start = np.array([lon_island, lon_island + 0.02])
+    lat_end = np.array([lat_island + 0.1, lat_island + 0.1])
+    lon_end = np.array([lon_island, lon_island + 0.02])
+    assert np.array_equal(raster.check_crossing(lat_start, lon_start, lat_end, lon_end), np.array([True, False]))
+
+    raster = StaticConstraintRaster([land_crossing], map_size, 0.25)
+    rng = np.random.default_rng(42)
+    lat = rng.uniform(53.0, 55.5, 200000)
+    lon = rng.uniform(3.5, 8.5, 200000)
+    assert np.array_equal(raster.constraint_on_point(lat, lon, None), land_crossing.constraint_on_point(lat, lon, None))
+
+
+'''
+    test whether the raster classifies the cells from the depth grid such that it agrees with the interpolated depth
+    for cells that are much larger than the grid spacing of the depth data
+'''
+
+
+def test_static_constraint_raster_water_depth():
+    dirname = os.path.dirname(__file__)
+    depthfile = os.path.join(dirname, 'data/reduced_testdata_depth.nc')
+    map_size = Map(51.5, 2.2, 52.5, 2.8)
+    waterdepth = WaterDepth("from_file", 45, map_size, depthfile)
+
+    raster = StaticConstraintRaster([waterdepth], map_size, 0.05)
+    assert np.any(raster.cells == StaticConstraintRaster.FREE)
+    assert np.any(raster.cells == StaticConstraintRaster.CONSTRAINED)
+    rng = np.random.default_rng(42)
+    lat = rng.uniform(51.4, 52.6, 100000)
+    lon = rng.uniform(2.1, 2.9, 100000)
+    assert np.array_equal(raster.constraint_on_point(lat, lon, None), waterdepth.constraint_on_point(lat, lon, None))
+
+
+'''
+    test whether the depth data is cropped to the map and whether the bilinear interpolation on the depth grid agrees
+    with the interpolation by xarray
+'''
+
+
+def test_waterdepth_depth_grid():
+    dirname = os.path.dirname(__file__)
+    depthfile = os.path.join(dirname, 'data/reduced_testdata_depth.nc')
+    waterdepth = WaterDepth("from_file", 20, Map(51.5, 2.2, 52.5, 2.8), depthfile)
+
+    assert waterdepth.depth_grid.dtype == np.float32
+    assert waterdepth.depth_grid.flags['C_CONTIGUOUS']
+    assert waterdepth.depth_grid.shape == (124, 76)
+
+    rng = np.random.default_rng(42)
+    lat = rng.uniform(51.5, 52.5, 1000)
+    lon = rng.uniform(2.2, 2.8, 1000)
+    ds_depth = xr.open_dataset(depthfile)
+    depth_xr = ds_depth['z'].interp(latitude=xr.DataArray(lat, dims='dummy'),
+                                    longitude=xr.DataArray(lon, dims='dummy'), method='linear').to_numpy()
+
+    assert np.allclose(waterdepth.get_current_depth(lat, lon), depth_xr, atol=1e-3)
+    assert np.array_equal(waterdepth.constraint_on_point(lat, lon, None), depth_xr > -20)
+
+    waterdepth.set_draught(5)
+    assert np.array_equal(waterdepth.constraint_on_point(lat, lon, None), depth_xr > -5)
+
+
+'''
+    test whether the land mask cropped to the map gives the same results as the global land mask
+'''
+
+
+def test_land_crossing_cropped_mask():
+    map_size = Map(53.0, 3.5, 55.5, 8.5)
+    land_crossing = LandCrossing(map_size)
+    assert land_crossing.land_mask.shape == (303, 603)
+    assert LandCrossing(map_size).land_mask is land_crossing.land_mask
+
+    rng = np.random.default_rng(42)
+    lat = rng.uniform(52., 56.5, 5000)
+    lon = rng.uniform(2.5, 9.5, 5000)
+    assert np.array_equal(land_crossing.constraint_on_point(lat, lon, None), globe.is_land(lat, lon))
+
+
+'''
+    test whether the cache of static constraints gives the same results as the exact checks, counts hits and misses
+    and always evaluates constraints which are not static
+'''
+
+
+def test_constraint_result_cache():
+    constraint_list = generate_dummy_constraint_list()
+    constraint_list.add_neg_constraint(LandCrossing())
+    route_corridor = RouteCorridor(np.array([54., 54.]), np.array([3., 9.]), 100000.)
+    constraint_list.add_neg_constraint(route_corridor)
+
+    rng = np.random.default_rng(42)
+    lat_start = np.round(rng.uniform(53.0, 55.5, 500), 3)
+    lon_start = np.round(rng.uniform(3.5, 8.5, 500), 3)
+    lat_end = np.round(lat_start + rng.uniform(-0.2, 0.2, 500), 3)
+    lon_end = np.round(lon_start + rng.uniform(-0.2, 0.2, 500), 3)
+    is_constrained = [False] * 500
+    is_constrained_exact = constraint_list.safe_crossing(lat_start, lon_start, lat_end, lon_end, None,
+                                                         is_constrained)
+
+    constraint_list.init_result_cache(1000, 1e-5)
+    cache = constraint_list.result_cache
+    assert np.array_equal(constraint_list.safe_crossing(lat_start, lon_start, lat_end, lon_end, None,
+                                                        is_constrained), is_constrained_exact)
+    assert (cache.hits, cache.misses) == (0, 500)
+    assert np.array_equal(constraint_list.safe_crossing(lat_start + 1e-7, lon_start, lat_end, lon_end - 1e-7, None,
+                                                        is_constrained), is_constrained_exact)
+    assert (cache.hits, cache.misses) == (500, 500)
+
+    # the route corridor is not static and has to be evaluated with its current settings
+    route_corridor.half_width = 1000.
+    is_constrained_narrow = constraint_list.safe_crossing(lat_start, lon_start, lat_end, lon_end, None,
+                                                          is_constrained)
+    assert (cache.hits, cache.misses) == (1000, 500)
+    constraint_list.result_cache = None
+    assert np.array_equal(constraint_list.safe_crossing(lat_start, lon_start, lat_end, lon_end, None,
+                                                        is_constrained), is_constrained_narrow)
+    assert not np.array_equal(is_constrained_narrow, is_constrained_exact)
+
+    # least recently used segments are discarded
+    constraint_list.init_result_cache(100, 1e-5)
+    constraint_list.safe_crossing(lat_start, lon_start, lat_end, lon_end, None, is_constrained)
+    assert len(constraint_list.result_cache.results) == 100
+    constraint_list.safe_crossing(lat_start[-100:], lon_start[-100:], lat_end[-100:], lon_end[-100:], None,
+                                  is_constrained[-100:])
+    assert constraint_list.result_cache.hits == 100
+
+
+class PointCounter(NegativeContraint):
+    relative_cost = 50
+
+    def __init__(self):
+        NegativeContraint.__init__(self, "PointCounter")
+        self.n_points = 0
+
+    def constraint_on_point(self, lat, lon, time):
+        self.n_points += lat.shape[0]
+        return lon > 8.
+
+
+'''
+    test whether the constraints are checked in the order of their relative cost and expensive constraints are only
+    evaluated for segments that have not been constrained by cheaper ones
+'''
+
+
+def test_safe_crossing_cost_order():
+    map_size = Map(53.0, 3.5, 55.5, 8.5)
+    on_map = StayOnMap()
+    on_map.set_map(map_size.lat1, map_size.lon1, map_size.lat2, map_size.lon2)
+    point_counter = PointCounter()
+    constraint_list = generate_dummy_constraint_list()
+    constraint_list.add_neg_constraint(point_counter)
+    constraint_list.add_neg_constraint(on_map)
+    assert constraint_list.get_ordered_constraints(constraint_list.negative_constraints_discrete) == [on_map,
+                                                                                                      point_counter]
+
+    lat_start = np.array([54., 54., 54., 54.])
+    lon_start = np.array([4., 8., 9., 4.])
+    lat_end = np.array([54.5, 54.5, 54.5, 56.])
+    lon_end = np.array([5., 8.4, 10., 5.])
+    is_constrained = constraint_list.safe_crossing(lat_start, lon_start, lat_end, lon_end, None, [False] * 4)
+
+    assert isinstance(is_constrained, np.ndarray)
+    assert np.array_equal(is_constrained, np.array([False, True, True, True]))
+    n_steps = int(1.0 / constraint_list.pars.resolution)
+    assert point_counter.n_points == 2 * n_steps
@@ -1,11 +1,15 @@
+import os
+
 import geopandas as gpd
 import numpy as np
 import pandas as pd
+import pytest
 import sqlalchemy as db
-from shapely.geometry import LineString, Point, box
+from shapely.geometry import LineString, Point, Polygon, box
 from shapely.strtree import STRtree
 
-from WeatherRoutingTool.constraints.constraints import ContinuousCheck
+from WeatherRoutingTool.constraints.constraints import ContinuousCheck, LandPolygonsCrossing, SeamarkCrossing
+from WeatherRoutingTool.constraints.spatial_cache import SpatialCacheMissError, SpatialQueryCache
 from WeatherRoutingTool.utils.maps import Map
 import tests.basic_test_func as basic_test_func
 
@@ -328,6 +332,92 @@ class TestContinuousCheck:
         for i in range(len(check_list)):
             assert isinstance(check_list[i], bool)
 
+    def test_land_crossing_tiled_index(self):
+        # large polygon with a bay and a hole (lake) and a small island
+        land = Polygon([(0, 0), (3, 0), (3, 3), (0, 3)], holes=[[(1.2, 1.2), (1.8, 1.2), (1.8, 1.8), (1.2, 1.8)]])
+        land = land.difference(box(2.6, 0.9, 3.1, 1.1))
+        island = box(4, 4, 4.2, 4.2)
+
+        with engine.connect() as conn:
+            landpolygoncrossing_obj = LandPolygonsCrossing(db_engine=conn.connection, tile_size=0.5)
+        landpolygoncrossing_obj.land_polygon_STRTree = landpolygoncrossing_obj.build_tiled_index(
+            np.array([land, island]))
+        assert landpolygoncrossing_obj.interior_tile_STRTree is not None
+        assert len(landpolygoncrossing_obj.interior_tile_STRTree.geometries) == 30
+
+        rng = np.random.default_rng(42)
+        lon_start = rng.uniform(-1, 5, 500)
+        lat_start = rng.uniform(-1, 5, 500)
+        lon_end = lon_start + rng.uniform(-0.5, 0.5, 500)
+        lat_end = lat_start + rng.uniform(-0.5, 0.5, 500)
+        check_list = landpolygoncrossing_obj.check_crossing(lat_start=lat_start, lon_start=lon_start,
+                                                            lat_end=lat_end, lon_end=lon_end)
+
+        test_list = ContinuousCheck.check_segments_in_tree(STRtree([land, island]), lat_start, lon_start, lat_end,
+                                                           lon_end)
+        assert check_list == test_list
+        assert 0 < sum(check_list) < 500
+
+    def test_check_segments_in_tree(self):
+        # overlapping polygons, a line and a point; the diagonal segment only crosses the bounding box of the triangle
+        geometries = [box(0, 0, 2, 2), box(1, 1, 3, 3), LineString([(0, 4), (4, 4)]), Point(5, 1),
+                      Polygon([(6, 0), (8, 0), (6, 2)])]
+        tree = STRtree(geometries)
+
+        lon_start = np.array((-1, 0.5, 2.5, 5, -1, 7.5, 5, 4.5, 10))
+        lat_start = np.array((-1, 1.5, 5, 0, 5, 1.5, 0.5, 0.5, 10))
+        lon_end = np.array((4, 0.5, 2.5, 5, 5, 8.5, 5, 4.5, 11))
+        lat_end = np.array((4, 1.5, -1, 3, 5, 2.5, 0.9, 0.5, 11))
+        n_segments = lat_start.shape[0]
+
+        # single query per segment as done before the bulk query was introduced
+        test_list = []
+        for i in range(n_segments):
+            line = LineString([Point(lon_start[i], lat_start[i]), Point(lon_end[i], lat_end[i])])
+            route_df = gpd.GeoDataFrame(geometry=[line])
+            geom_object = tree.query(route_df["geometry"], predicate='intersects').tolist()
+            test_list.append(not (geom_object == [[], []] or geom_object == []))
+
+        check_list = ContinuousCheck.check_segments_in_tree(tree, lat_start, lon_start, lat_end, lon_end)
+
+        assert check_list == test_list
+        assert check_list == [True, True, True, True, False, False, False, False, False]
+        for i in range(n_segments):
+            assert isinstance(check_list[i], bool)
+
+        # segments hitting several geometries are counted only once
+        segment_index, _ = tree.query(ContinuousCheck.get_segment_lines(lat_start, lon_start, lat_end, lon_end),
+                                      predicate='intersects')
+        assert np.bincount(segment_index)[0] == 3
+        assert np.bincount(segment_index)[2] == 2
+
+    def test_spatial_cache(self, tmp_path):
+        query = "SELECT *, geometry AS geom FROM ways"
+        cache = SpatialQueryCache(str(tmp_path), data_version='v1')
+        with engine.connect() as conn:
+            seamark_obj = SeamarkCrossing(db_engine=conn.connection, spatial_cache=cache)
+            gdf = seamark_obj.query_ways(conn.connection, query)
+        assert len(os.listdir(tmp_path)) == 1
+
+        # the cache file does not contain pickled objects
+        cache_file = cache.get_cache_file(query)
+        assert cache_file.endswith('.npz')
+        with np.load(cache_file, allow_pickle=False) as data:
+            assert all(data[key].dtype != object for key in data.files)
+
+        # offline mode: no database connection, results are read from the cache
+        offline_cache = SpatialQueryCache(str(tmp_path), data_version='v1', offline=True)
+        gdf_cached = offline_cache.read_postgis(query, None, geom_col="geom", crs="epsg:4326")
+        assert isinstance(gdf_cached, gpd.GeoDataFrame)
+        assert gdf_cached.crs == gdf.crs
+        assert gdf_cached["geom"].geom_equals(gdf["geom"]).all()
+        pd.testing.assert_frame_equal(pd.DataFrame(gdf_cached.drop(columns="geom")),
+                                      pd.DataFrame(gdf.drop(columns="geom")))
+
+        # a new data version invalidates the cache
+        with pytest.raises(SpatialCacheMissError):
+            SpatialQueryCache(str(tmp_path), data_version='v2', offline=True).read_postgis(query, None)
+
 
 # Closing engine
 engine.dispose()
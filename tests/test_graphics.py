@@ -1,4 +1,5 @@
 import datetime
+import os
 
 import numpy as np
 import matplotlib.pyplot as plt
@@ -73,3 +74,34 @@ def test_get_hist_values_from_widths():
 
     assert np.array_equal(bin_centres_test, hist_values['bin_centres'])
     assert np.array_equal(bin_content_normalised_test, hist_values['bin_contents'])
+
+
+'''
+    test whether FigureRenderer writes all queued figures and plots copies of the coordinates such that the routing
+    arrays can be modified right after submitting a figure
+'''
+
+
+def test_figure_renderer(tmp_path, monkeypatch):
+    def generate_plain_basemap(fig, depth, start=None, finish=None, title='', show_depth=True, show_gcr=False):
+        # basemap without land and coastlines which would need to be downloaded
+        ax = fig.add_subplot(111)
+        ax.set_xlim(5, 15)
+        ax.set_ylim(50, 60)
+        return fig, ax
+
+    monkeypatch.setattr(graphics, 'generate_basemap', generate_plain_basemap)
+
+    lats = np.array([[54., 54.], [55., 56.]])
+    lons = np.array([[10., 10.], [11., 11.5]])
+    renderer = graphics.FigureRenderer(None, (54, 10), (58, 12), show_depth=False)
+    renderer.submit(os.path.join(tmp_path, 'fig0.png'))
+    renderer.submit(os.path.join(tmp_path, 'fig1.png'), [(lons, lats, {'color': 'orange'})])
+    lats[:] = 0
+    renderer.close()
+
+    assert sorted(os.listdir(tmp_path)) == ['fig0.png', 'fig1.png']
+    fig0 = plt.imread(os.path.join(tmp_path, 'fig0.png'))
+    fig1 = plt.imread(os.path.join(tmp_path, 'fig1.png'))
+    assert fig0.shape == fig1.shape
+    assert not np.array_equal(fig0, fig1)
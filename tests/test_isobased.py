@@ -2,6 +2,9 @@ import os
 from datetime import datetime
 
 import numpy as np
+import pandas as pd
+import pytest
+import xarray as xr
 from astropy import units as u
 from geovectorslib import geod
 
@@ -512,3 +515,351 @@ def test_branch_based_pruning():
     idxs_test = [2, 4]
 
     assert np.array_equal(np.array(idxs), np.array(idxs_test))
+
+
+'''
+    test whether the cached geodesics between the current front and the temporary start and destination agree with
+    the results of geod.inverse after the front has been repeated (definition of courses) and after route segments have
+    been selected (pruning), and whether they are reused instead of being recomputed
+'''
+
+
+def test_front_geometry_matches_fresh_geodesics(monkeypatch):
+    ra = basic_test_func.create_dummy_IsoBased_object()
+    ra.start_temp = (37.0, -123.5)
+    ra.finish_temp = (38.2, -122.9)
+    ra.lats_per_step = np.array([[37.3, 37.5, 37.4], [37.0, 37.0, 37.0]])
+    ra.lons_per_step = np.array([[-123.4, -123.2, -122.8], [-123.5, -123.5, -123.5]])
+
+    def get_fresh_geometry():
+        front_lats = ra.lats_per_step[0]
+        front_lons = ra.lons_per_step[0]
+        return {'from_start': geod.inverse(np.full(front_lats.shape, ra.start_temp[0]),
+                                           np.full(front_lons.shape, ra.start_temp[1]), front_lats, front_lons),
+                'to_dest': geod.inverse(front_lats, front_lons, np.full(front_lats.shape, ra.finish_temp[0]),
+                                        np.full(front_lons.shape, ra.finish_temp[1]))}
+
+    def assert_cache_matches_fresh_geometry():
+        fresh_geometry = get_fresh_geometry()
+        for key in ['from_start', 'to_dest']:
+            for var in ['s12', 'azi1', 'azi2']:
+                assert np.allclose(ra.get_front_geometry(key)[var], fresh_geometry[key][var])
+
+    fresh_geometry = get_fresh_geometry()
+    ra.set_front_geometry(fresh_geometry['from_start'], fresh_geometry['to_dest'])
+
+    def inverse_not_expected(*args):
+        raise AssertionError('cached front geometry is recomputed')
+
+    monkeypatch.setattr(ra.geodesic, 'inverse', inverse_not_expected)
+    assert_cache_matches_fresh_geometry()
+
+    # repetition of the front for the definition of new courses
+    ra.lats_per_step = np.repeat(ra.lats_per_step, 4, axis=1)
+    ra.lons_per_step = np.repeat(ra.lons_per_step, 4, axis=1)
+    ra.repeat_front_geometry(4)
+    assert_cache_matches_fresh_geometry()
+
+    # selection of route segments by the pruning (unsorted, with repetitions)
+    idxs = [9, 0, 5, 5, 11]
+    ra.lats_per_step = ra.lats_per_step[:, idxs]
+    ra.lons_per_step = ra.lons_per_step[:, idxs]
+    ra.select_front_geometry(idxs)
+    assert_cache_matches_fresh_geometry()
+
+    # a new temporary destination invalidates the cache
+    monkeypatch.undo()
+    ra.finish_temp = (37.9, -123.0)
+    assert_cache_matches_fresh_geometry()
+
+
+'''
+    test whether IsoBased.get_origin_groups() and IsoBased.get_first_in_groups() agree with the groups of a pandas
+    groupby over the points of origin (repeated and unsorted origins, a single group) and whether
+    IsoBased.branch_based_pruning() selects the same route segments as the previous groupby-based implementation
+'''
+
+
+@pytest.mark.parametrize("origin_lats,origin_lons", [
+    ([37.43, 37.42, 37.43, 37.42, 37.40, 37.43, 37.42], [-123.23, -123.61, -123.23, -123.61, -123.0, -123.5, -123.61]),
+    ([37.42, 37.42, 37.42, 37.42], [-123.61, -123.61, -123.61, -123.61])])
+def test_origin_groups_match_pandas_groupby(origin_lats, origin_lons):
+    nof_segments = len(origin_lats)
+    ra = basic_test_func.create_dummy_IsoBased_object()
+    ra.lats_per_step = np.array([np.linspace(37.6, 37.7, nof_segments), origin_lats])
+    ra.lons_per_step = np.array([np.linspace(-123.1, -123.0, nof_segments), origin_lons])
+    ra.full_dist_traveled = np.array([1, 3, 3, 0, 0, 2, 3])[:nof_segments]
+    mask = ra.full_dist_traveled == 3
+
+    df = pd.DataFrame({'st_index': np.arange(nof_segments), 'st_lat': origin_lats, 'st_lon': origin_lons,
+                       'dist': ra.full_dist_traveled, 'mask': mask})
+    df_grouped = df.groupby(['st_lat', 'st_lon'])
+
+    group_ids, order, group_starts = ra.get_origin_groups()
+    first_in_groups = ra.get_first_in_groups(mask[order], group_starts)
+    assert np.array_equal(group_ids, df_grouped.ngroup().to_numpy())
+    assert group_starts.shape[0] == df_grouped.ngroups
+
+    group_ends = np.append(group_starts[1:], nof_segments)
+    for igroup, (key, group) in enumerate(df_grouped):
+        assert np.array_equal(order[group_starts[igroup]:group_ends[igroup]], group['st_index'].to_numpy())
+        if group['mask'].any():
+            assert order[first_in_groups[igroup]] == group[group['mask']]['st_index'].iloc[0]
+        else:
+            assert first_in_groups[igroup] == nof_segments
+
+    # previous implementation of branch_based_pruning
+    idxs_groupby = []
+    for key, group in df_grouped:
+        max_dist = group['dist'].max()
+        if max_dist == 0.:
+            continue
+        idxs_groupby.append(group[group['dist'] == max_dist]['st_index'].iloc[0])
+    assert ra.branch_based_pruning() == idxs_groupby
+
+
+'''
+    test whether IsoBased.bound_based_pruning() discards route segments for which the consumed fuel plus the lower
+    bound on the remaining fuel exceeds the upper bound, and whether it keeps all route segments if none of them could
+    beat the upper bound
+'''
+
+
+def test_bound_based_pruning():
+    ra = basic_test_func.create_dummy_IsoBased_object()
+    ra.finish_temp = (38.0, -123.0)
+    ra.lats_per_step = np.array([[37.99, 37.9, 37.5, 37.8],
+                                 [37.4, 37.4, 37.4, 37.4]])
+    ra.lons_per_step = np.array([[-123.0, -123.0, -123.0, -123.0],
+                                 [-123.0, -123.0, -123.0, -123.0]])
+    ra.absolutefuel_per_step = np.array([[10, 10, 5, 1], [5, 5, 5, 5]]) * u.kg
+    ra.full_dist_traveled = np.array([1, 2, 3, 0])
+    ra.fuel_per_dist_lower_bound = 0.001 * u.kg / u.meter
+
+    # fuel estimates: 16.1 kg, 26.1 kg, 65.5 kg; the last route segment is constrained
+    ra.fuel_upper_bound = 20 * u.kg
+    ra.bound_based_pruning()
+    assert np.array_equal(ra.full_dist_traveled, np.array([1, 0, 0, 0]))
+
+    ra.full_dist_traveled = np.array([1, 2, 3, 0])
+    ra.fuel_upper_bound = 5 * u.kg
+    ra.bound_based_pruning()
+    assert np.array_equal(ra.full_dist_traveled, np.array([1, 2, 3, 0]))
+
+
+'''
+    test whether IsoBased.init_fuel_bounds() provides bounds for which the bound-based pruning keeps the optimal route
+    segment if the boat travels in following winds, i.e. consumes less fuel than in calm water
+'''
+
+
+def test_bound_based_pruning_keeps_optimal_segment_in_tailwind(tmp_path):
+    dirname = os.path.dirname(__file__)
+    weather_data = xr.open_dataset(os.path.join(dirname, 'data/reduced_testdata_weather.nc'))
+    weather_data['u-component_of_wind_height_above_ground'][:] = 0
+    weather_data['v-component_of_wind_height_above_ground'][:] = -20
+    weather_path = os.path.join(tmp_path, 'tailwind_weather.nc')
+    weather_data.to_netcdf(weather_path)
+
+    boat = basic_test_func.create_dummy_Direct_Power_Ship('simpleship')
+    boat.set_weather_path(weather_path)
+    boat.load_data()
+    constraint_list = basic_test_func.generate_dummy_constraint_list()
+
+    # great circle route heading south, i.e. the wind is blowing from behind
+    ra = basic_test_func.create_dummy_IsoBased_object()
+    ra.departure_time = datetime.strptime('2023-07-20T10:00Z', '%Y-%m-%dT%H:%MZ')
+    ra.start = ra.start_temp = (55.0, 13.5)
+    ra.finish = ra.finish_temp = (54.1, 13.5)
+    ra.init_fuel_bounds(boat, constraint_list)
+    assert not np.isinf(ra.fuel_upper_bound)
+
+    calm_water_fuel_per_dist = boat.fuel_rate * boat.get_power(0 * u.N) / boat.get_boat_speed()
+    gcr_dist = geod.inverse([ra.start[0]], [ra.start[1]], [ra.finish[0]], [ra.finish[1]])['s12'][0] * u.meter
+    assert ra.fuel_upper_bound < gcr_dist * calm_water_fuel_per_dist
+
+    # route segments: halfway along the great circle route (optimal), back at the start after consuming the same
+    # amount of fuel (discarded) and at the destination without fuel consumption (kept)
+    half_way = geod.direct([ra.start[0]], [ra.start[1]], [180], [gcr_dist.value / 2])
+    ra.finish = (half_way['lat2'][0], half_way['lon2'][0])
+    fuel_half_way = ra.get_gcr_fuel(boat, constraint_list)
+    ra.finish = ra.finish_temp
+
+    ra.lats_per_step = np.array([[half_way['lat2'][0], ra.start[0], ra.finish[0]]])
+    ra.lons_per_step = np.array([[half_way['lon2'][0], ra.start[1], ra.finish[1]]])
+    ra.absolutefuel_per_step = np.array([[fuel_half_way.value, fuel_half_way.value, 0]]) * u.kg
+    ra.full_dist_traveled = np.array([1, 1, 1])
+    ra.bound_based_pruning()
+    assert np.array_equal(ra.full_dist_traveled, np.array([1, 0, 1]))
+
+
+'''
+    test whether IsoBased.grid_based_pruning() keeps the route segment with the largest full_dist_traveled per grid cell
+    and discards constrained route segments
+'''
+
+
+def test_grid_based_pruning():
+    ra = basic_test_func.create_dummy_IsoBased_object()
+    ra.prune_segments = 2
+    ra.lats_per_step = np.array([[37.0, 37.01, 38.0, 38.02, 37.0, 37.99]])
+    ra.lons_per_step = np.array([[-123.0, -123.01, -123.0, -122.99, -122.0, -122.01]])
+    ra.full_dist_traveled = np.array([1, 2, 5, 3, 4, 0])
+
+    idxs = ra.grid_based_pruning()
+    idxs_test = [1, 2, 4]
+
+    assert np.array_equal(np.array(idxs), np.array(idxs_test))
+
+
+'''
+    test whether IsoBased.adapt_course_fan() widens the course fan if courses at its edge survive the pruning and
+    narrows and refines it otherwise
+'''
+
+
+def test_adapt_course_fan():
+    ra = basic_test_func.create_dummy_IsoBased_object()
+    ra.adaptive_courses = True
+    ra.course_segments_min = 4
+    ra.course_segments_max = 30
+    ra.course_increments_deg_min = 1 * u.degree
+    ra.course_increments_deg_max = 6 * u.degree
+
+    # surviving course at the edge of the fan: widen
+    ra.set_course_segments(10, 6)
+    ra.course_offsets = np.array([-30, 0, 12]) * u.degree
+    ra.adapt_course_fan()
+    assert ra.course_segments == 20
+    assert ra.course_increments_deg == 6 * u.degree
+
+    # surviving courses close to the gcr: narrow and refine
+    ra.course_offsets = np.array([-6, 0, 6]) * u.degree
+    ra.adapt_course_fan()
+    assert ra.course_segments == 4
+    assert np.isclose(ra.course_increments_deg.value, 6)
+
+    ra.course_offsets = np.array([0]) * u.degree
+    ra.adapt_course_fan()
+    assert ra.course_segments == 4
+    assert np.isclose(ra.course_increments_deg.value, 3)
+
+
+'''
+    test whether IsoFuel.adapt_step_size() halves delta_fuel for constrained route segments or strong weather changes
+    and doubles it otherwise, within the configured limits
+'''
+
+
+def test_adapt_step_size():
+    ra = basic_test_func.create_dummy_IsoFuel_object()
+    ra.delta_fuel_adaptive = True
+    ra.delta_fuel_factor_min = 0.25
+    ra.delta_fuel_factor_max = 2
+    ra.count = 1
+
+    ra.shipparams_per_step.u_wind_speed = np.array([[5, 5, 5], [0, 0, 0]]) * u.meter / u.second
+    ra.shipparams_per_step.v_wind_speed = np.array([[0, 0, 0], [0, 0, 0]]) * u.meter / u.second
+    ra.shipparams_per_step.wave_height = np.array([[1, 1, 1], [0, 0, 0]]) * u.meter
+
+    sp = ShipParams.set_default_array()
+    sp.u_wind_speed = np.array([5.5, 5, 4.5]) * u.meter / u.second
+    sp.v_wind_speed = np.array([0, 0, 0]) * u.meter / u.second
+    sp.wave_height = np.array([1, 1.1, 1]) * u.meter
+
+    # steady weather, no constraints
+    ra.adapt_step_size(sp, [False, False, False])
+    assert ra.delta_fuel == 2 * ra.delta_fuel_base
+    ra.adapt_step_size(sp, [False, False, False])
+    assert ra.delta_fuel == 2 * ra.delta_fuel_base
+
+    # constrained route segment
+    ra.adapt_step_size(sp, [False, True, False])
+    assert ra.delta_fuel == ra.delta_fuel_base
+
+    # strong change of wave height
+    sp.wave_height = np.array([1, 2, 1]) * u.meter
+    ra.adapt_step_size(sp, [False, False, False])
+    ra.adapt_step_size(sp, [False, False, False])
+    ra.adapt_step_size(sp, [False, False, False])
+    assert ra.delta_fuel == 0.25 * ra.delta_fuel_base
+
+
+'''
+    test whether the isochrone state written to a checkpoint is restored when resuming, whereby the pruning settings
+    of the resumed run are kept
+'''
+
+
+def test_checkpoint_write_and_resume(tmp_path):
+    ra = basic_test_func.create_dummy_IsoFuel_object()
+    constraints_list = basic_test_func.generate_dummy_constraint_list()
+    ra.path_to_route_folder = str(tmp_path)
+    ra.count = 2
+    ra.lats_per_step = np.array([[1.2, 1.3], [1.1, 1.1], [1, 1]])
+    ra.lons_per_step = np.array([[2.2, 2.3], [2.1, 2.1], [2, 2]])
+    ra.course_per_step = np.array([[10, 20], [15, 15], [0, 0]]) * u.degree
+    ra.dist_per_step = np.array([[100, 110], [90, 90], [0, 0]]) * u.meter
+    ra.absolutefuel_per_step = np.array([[30, 31], [20, 20], [0, 0]]) * u.kg
+    ra.starttime_per_step = np.array([['2023-11-11T13:00', '2023-11-11T13:10'], ['2023-11-11T12:00'] * 2,
+                                      ['2023-11-11T11:11'] * 2], dtype='datetime64[s]')
+    ra.time = ra.starttime_per_step[0, :]
+    ra.full_time_traveled = np.array([6540, 7140]) * u.second
+    ra.full_dist_traveled = np.array([190, 200]) * u.meter
+    ra.shipparams_per_step.wave_height = np.array([[1.5, 1.6], [1, 1], [0, 0]]) * u.meter
+    for key, value in vars(ra.shipparams_per_step).items():
+        if isinstance(value, u.Quantity) and key != 'wave_height':
+            setattr(ra.shipparams_per_step, key, np.full((3, 2), 2.) * value.unit)
+    ra.shipparams_per_step.status = np.zeros((3, 2), dtype=int)
+    ra.shipparams_per_step.message = np.array([['', 'error'], ['', ''], ['', '']])
+    # a route that reached the destination at the previous step consists of count + 2 points
+    ra.count = 1
+    ra.route_list = [ra.make_route_object(1)]
+    ra.count = 2
+    ra.current_number_of_routes = 1
+    ra.write_checkpoint(constraints_list)
+
+    checkpoint = os.path.join(tmp_path, 'checkpoints', 'isochrone_step_2.npz')
+    assert os.path.isfile(checkpoint)
+
+    ra_resumed = basic_test_func.create_dummy_IsoFuel_object()
+    ra_resumed.prune_segments = 50
+    ra_resumed.read_checkpoint(checkpoint, basic_test_func.generate_dummy_constraint_list())
+    assert ra_resumed.count == 2
+    assert ra_resumed.prune_segments == 50
+    assert np.array_equal(ra_resumed.lats_per_step, ra.lats_per_step)
+    assert np.array_equal(ra_resumed.starttime_per_step, ra.starttime_per_step)
+    assert np.array_equal(ra_resumed.time, ra.time)
+    assert np.all(ra_resumed.course_per_step == ra.course_per_step)
+    assert np.all(ra_resumed.absolutefuel_per_step == ra.absolutefuel_per_step)
+    assert np.all(ra_resumed.full_time_traveled == ra.full_time_traveled)
+    assert np.all(ra_resumed.shipparams_per_step.wave_height == ra.shipparams_per_step.wave_height)
+    assert np.array_equal(ra_resumed.shipparams_per_step.message, ra.shipparams_per_step.message)
+    assert ra_resumed.current_number_of_routes == 1
+    assert len(ra_resumed.route_list) == 1
+    assert np.allclose(ra_resumed.route_list[0].lats_per_step, ra.route_list[0].lats_per_step)
+    assert np.isclose(ra_resumed.route_list[0].get_full_fuel(), ra.route_list[0].get_full_fuel())
+
+    os.remove(os.path.join(tmp_path, 'checkpoints', 'isochrone_step_2_route_1.json'))
+    with pytest.raises(ValueError):
+        basic_test_func.create_dummy_IsoFuel_object().read_checkpoint(checkpoint,
+                                                                      basic_test_func.generate_dummy_constraint_list())
+
+    ra_other_route = basic_test_func.create_dummy_IsoFuel_object()
+    ra_other_route.start = (10, 10)
+    with pytest.raises(ValueError):
+        ra_other_route.read_checkpoint(checkpoint, basic_test_func.generate_dummy_constraint_list())
+
+
+'''
+    test whether no checkpoints are written if no ROUTE_PATH is set
+'''
+
+
+def test_checkpoint_without_route_path():
+    ra = basic_test_func.create_dummy_IsoFuel_object()
+    ra.path_to_route_folder = None
+    ra.prune_segments = 10
+    ra.checkpoint_steps = 2
+    ra.check_settings()
+    assert ra.checkpoint_steps == 0
@@ -74,3 +74,70 @@ def test_get_acc_variables():
     assert test_fuel == rp_test.get_full_fuel()
     assert np.allclose(test_dist, rp_test.get_full_dist())
     assert test_time == rp_test.get_full_travel_time()
+
+
+'''
+    test whether start times stored as datetime64 survive a round trip via RouteParams.return_route_to_API and
+    RouteParams.from_file, whether the per-step durations are derived correctly from them, and whether the start times
+    are initialised with NaT which is propagated to the per-step durations
+'''
+
+
+def test_starttime_datetime64_round_trip(tmp_path):
+    lats = np.array([54.7, 54.9, 55.2, 55.5])
+    lons = np.array([13.6, 13.8, 14.1, 14.4])
+    start_time = np.array(['2023-07-20T10:00:00', '2023-07-20T10:47:13', '2023-07-20T11:30:05',
+                           '2023-07-20T12:00:00'], dtype='datetime64[s]')
+    dummy = np.array([0, 0, 0])
+
+    sp = ShipParams(
+        fuel_rate=np.array([1.12, 1.13, 1.15]) * u.kg/u.s,
+        power=dummy * u.Watt,
+        rpm=dummy * u.Hz,
+        speed=dummy * u.m/u.s,
+        r_calm=dummy * u.N,
+        r_wind=dummy * u.N,
+        r_waves=dummy * u.N,
+        r_shallow=dummy * u.N,
+        r_roughness=dummy * u.N,
+        wave_height=dummy * u.m,
+        wave_direction=dummy * u.rad,
+        wave_period=dummy * u.second,
+        u_currents=dummy * u.m/u.s,
+        v_currents=dummy * u.m/u.s,
+        u_wind_speed=dummy * u.m/u.s,
+        v_wind_speed=dummy * u.m/u.s,
+        pressure=dummy * u.kg/u.meter/u.second**2,
+        air_temperature=dummy * u.deg_C,
+        salinity=dummy * u.dimensionless_unscaled,
+        water_temperature=dummy * u.deg_C,
+        message=dummy,
+        status=dummy
+    )
+
+    rp = RouteParams(count=2, start=(lats[0], lons[0]), finish=(lats[-1], lons[-1]), gcr=None, route_type='test',
+                     time=start_time[-1] - start_time[0], lats_per_step=lats, lons_per_step=lons,
+                     course_per_step=dummy, dists_per_step=dummy * u.meter, starttime_per_step=start_time,
+                     ship_params_per_step=sp)
+    time_passed = np.array([47 * 60 + 13, 42 * 60 + 52, 29 * 60 + 55]) * u.second
+    # count is the number of routing steps before the final one, hence only the first two durations are considered
+    assert np.array_equal(rp.get_time_passed_per_step(), time_passed[:2])
+
+    filename = os.path.join(tmp_path, 'route.json')
+    rp.return_route_to_API(filename)
+    rp_read = RouteParams.from_file(filename)
+
+    # from_file initialises the start times with NaT, all of them need to be overwritten by the values from the file
+    assert rp_read.starttime_per_step.dtype == np.dtype('datetime64[s]')
+    assert not np.any(np.isnat(rp_read.starttime_per_step))
+    assert np.array_equal(rp_read.starttime_per_step, start_time)
+    assert np.array_equal(rp_read.get_time_passed_per_step(), time_passed)
+    assert rp_read.get_full_travel_time() == timedelta(hours=2)
+
+    # start times that are not (yet) known
+    starttime_unknown = np.full(4, np.datetime64('NaT'), dtype='datetime64[s]')
+    starttime_unknown[:2] = start_time[:2]
+    rp.starttime_per_step = starttime_unknown
+    time_passed_unknown = rp.get_time_passed_per_step()
+    assert time_passed_unknown[0] == time_passed[0]
+    assert np.all(np.isnan(time_passed_unknown[1:]))
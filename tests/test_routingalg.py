@@ -1,7 +1,24 @@
+import json
+import os
+from datetime import datetime
+
 import numpy as np
+import pandas as pd
+import pytest
 
 import tests.basic_test_func as basic_test_func
+from WeatherRoutingTool.batch_routing import BatchRouting
+from WeatherRoutingTool.algorithms.coarse_to_fine import CoarseToFineIsoFuel
+from WeatherRoutingTool.algorithms.routingalg_factory import RoutingAlgFactory
+from WeatherRoutingTool.config import Config
+from WeatherRoutingTool.constraints.constraints import ConstraintsListFactory, StayOnMap
+from WeatherRoutingTool.departure_sweep import DepartureSweep
+from WeatherRoutingTool.rerouting import Rerouting
+from WeatherRoutingTool.routeparams import RouteParams
+from WeatherRoutingTool.ship.ship_factory import ShipFactory
 from WeatherRoutingTool.ship.shipparams import ShipParams
+from WeatherRoutingTool.utils.maps import Map
+from WeatherRoutingTool.weather_factory import WeatherFactory
 
 
 #
@@ -119,3 +136,271 @@ def test_update_ship_params():
     assert np.array_equal(water_temperature_test, ra.shipparams_per_step.get_water_temperature())
     assert np.array_equal(status_test, ra.shipparams_per_step.get_status())
     assert np.array_equal(message_test, ra.shipparams_per_step.get_message())
+
+
+'''
+    test whether the config of the coarse pass of CoarseToFineIsoFuel keeps the angular range of the courses and
+    increases the amount of fuel per routing step
+'''
+
+
+def test_coarse_to_fine_config():
+    dirname = os.path.dirname(__file__)
+    config = Config(file_name=os.path.join(dirname, 'config.tests.json'))
+    config.ROUTER_HDGS_SEGMENTS = 30
+    config.ROUTER_HDGS_INCREMENTS_DEG = 2
+    config.ISOCHRONE_COARSE_HDGS_SEGMENTS = 10
+    config.ISOCHRONE_COARSE_DELTA_FUEL_FACTOR = 4
+    config.ISOCHRONE_CHECKPOINT_STEPS = 5
+    config.ISOCHRONE_RESUME_FILE = 'checkpoints/isochrone_step_5.npz'
+
+    coarse_config = CoarseToFineIsoFuel.get_coarse_config(config)
+    assert coarse_config.ROUTER_HDGS_SEGMENTS == 10
+    assert coarse_config.ROUTER_HDGS_INCREMENTS_DEG == 6
+    assert coarse_config.DELTA_FUEL == 4 * config.DELTA_FUEL
+    assert coarse_config.ISOCHRONE_CHECKPOINT_STEPS == 0
+    assert coarse_config.ISOCHRONE_RESUME_FILE is None
+    assert config.ROUTER_HDGS_SEGMENTS == 30
+    assert config.DELTA_FUEL == 3000
+    assert config.ISOCHRONE_CHECKPOINT_STEPS == 5
+
+
+'''
+    test whether the coarse-to-fine routing reaches the destination and removes the corridor of the coarse pass from
+    the constraints list afterwards
+'''
+
+
+def test_coarse_to_fine_removes_corridor(tmp_path):
+    config = basic_test_func.create_dummy_routing_config(tmp_path)
+    config.ISOCHRONE_COARSE_TO_FINE = True
+    boat = basic_test_func.create_dummy_Direct_Power_Ship('simpleship')
+    lat1, lon1, lat2, lon2 = config.DEFAULT_MAP
+    departure_time = datetime.strptime(config.DEPARTURE_TIME, '%Y-%m-%dT%H:%MZ')
+    wt = WeatherFactory.get_weather(config.DATA_MODE, config.WEATHER_DATA, departure_time, config.TIME_FORECAST,
+                                    config.DELTA_TIME_FORECAST, Map(lat1, lon1, lat2, lon2))
+    constraints_list = ConstraintsListFactory.from_config(config, boat)
+    constraints = list(constraints_list.negative_constraints_discrete)
+
+    alg = RoutingAlgFactory.get_routing_alg(config)
+    assert isinstance(alg, CoarseToFineIsoFuel)
+    route = alg.execute_routing(boat, wt, constraints_list)
+    assert alg.reached_destination(route)
+    assert constraints_list.negative_constraints_discrete == constraints
+    assert constraints_list.neg_dis_size == len(constraints)
+
+
+'''
+    test whether the routes of the last routing step can be plotted if all routes are constrained before reaching
+    the destination and more than one route is searched, and whether the figure renderer is closed afterwards, also
+    if the routing raises
+'''
+
+
+def test_isofuel_plots_routes_of_previous_step(tmp_path, monkeypatch):
+    figure_path = os.path.join(tmp_path, 'figures')
+    os.makedirs(figure_path)
+    monkeypatch.setenv('WRT_FIGURE_PATH', figure_path)
+    config = basic_test_func.create_dummy_routing_config(tmp_path)
+    config.ISOCHRONE_NUMBER_OF_ROUTES = 2
+    boat = basic_test_func.create_dummy_Direct_Power_Ship('simpleship')
+    lat1, lon1, lat2, lon2 = config.DEFAULT_MAP
+    departure_time = datetime.strptime(config.DEPARTURE_TIME, '%Y-%m-%dT%H:%MZ')
+    wt = WeatherFactory.get_weather(config.DATA_MODE, config.WEATHER_DATA, departure_time, config.TIME_FORECAST,
+                                    config.DELTA_TIME_FORECAST, Map(lat1, lon1, lat2, lon2))
+    constraints_list = ConstraintsListFactory.from_config(config, boat)
+    # the destination lies beyond the northern boundary of this map
+    barrier = StayOnMap()
+    barrier.set_map(lat1, lon1, 55.0, lon2)
+    constraints_list.add_neg_constraint(barrier)
+
+    alg = RoutingAlgFactory.get_routing_alg(config)
+    alg.init_fig(water_depth=None, map_size=Map(lat1, lon1, lat2, lon2), showDepth=False)
+    alg.execute_routing(boat, wt, constraints_list)
+    assert alg.pruning_error
+    assert len(alg.route_list) > 0
+    assert alg.figure_renderer is None
+
+    def move_boat_failing(*args):
+        raise RuntimeError('routing failed')
+
+    alg = RoutingAlgFactory.get_routing_alg(config)
+    alg.init_fig(water_depth=None, map_size=Map(lat1, lon1, lat2, lon2), showDepth=False)
+    monkeypatch.setattr(alg, 'move_boat_direct', move_boat_failing)
+    with pytest.raises(RuntimeError):
+        alg.execute_routing(boat, wt, constraints_list)
+    assert alg.figure_renderer is None
+
+
+'''
+    test whether the remaining part of the previous route starts at the current position and skips the waypoints
+    that have already been passed
+'''
+
+
+def test_get_remaining_route():
+    lats = np.array([54.0, 54.0, 54.0, 54.0])
+    lons = np.array([10.0, 11.0, 12.0, 13.0])
+    rp = RouteParams(count=2, start=(lats[0], lons[0]), finish=(lats[-1], lons[-1]), gcr=None, route_type='test',
+                     time=None, lats_per_step=lats, lons_per_step=lons, course_per_step=None, dists_per_step=None,
+                     starttime_per_step=None, ship_params_per_step=None)
+
+    remaining_lats, remaining_lons = Rerouting.get_remaining_route(rp, (54.1, 11.2))
+    assert np.array_equal(remaining_lats, np.array([54.1, 54.0, 54.0]))
+    assert np.array_equal(remaining_lons, np.array([11.2, 12.0, 13.0]))
+
+    remaining_lats, remaining_lons = Rerouting.get_remaining_route(rp, (54.0, 12.9))
+    assert np.array_equal(remaining_lats, np.array([54.0, 54.0]))
+    assert np.array_equal(remaining_lons, np.array([12.9, 13.0]))
+
+
+'''
+    test whether the new route of Rerouting.reroute starts at the current position and ends at the destination of the
+    previous route and whether the corridor around the previous route is removed from the constraints list afterwards
+'''
+
+
+def test_reroute(tmp_path):
+    config = basic_test_func.create_dummy_routing_config(tmp_path)
+    rerouting = Rerouting(config, boat=basic_test_func.create_dummy_Direct_Power_Ship('simpleship'))
+    constraints = list(rerouting.constraints_list.negative_constraints_discrete)
+
+    lats = np.array([54.7, 54.9, 55.1, 55.3, 55.5])
+    lons = np.array([13.6, 13.8, 14.0, 14.2, 14.4])
+    previous_route = RouteParams(count=3, start=(lats[0], lons[0]), finish=(lats[-1], lons[-1]), gcr=None,
+                                 route_type='test', time=None, lats_per_step=lats, lons_per_step=lons,
+                                 course_per_step=None, dists_per_step=None, starttime_per_step=None,
+                                 ship_params_per_step=None)
+    position = (54.92, 13.83)
+
+    route = rerouting.reroute(previous_route, position, datetime(2023, 7, 20, 12), config.WEATHER_DATA)
+    assert route.lats_per_step[0] == position[0]
+    assert route.lons_per_step[0] == position[1]
+    assert route.lats_per_step[-1] == lats[-1]
+    assert route.lons_per_step[-1] == lons[-1]
+    assert rerouting.constraints_list.negative_constraints_discrete == constraints
+    assert rerouting.constraints_list.neg_dis_size == len(constraints)
+
+
+'''
+    test whether the departure times of the departure-time sweep start at DEPARTURE_TIME and are separated by
+    DEPARTURE_TIME_SWEEP_INTERVAL
+'''
+
+
+def test_departure_sweep_times():
+    dirname = os.path.dirname(__file__)
+    config = Config(file_name=os.path.join(dirname, 'config.tests.json'))
+    config.DEPARTURE_TIME = '2023-11-11T11:00Z'
+    config.DEPARTURE_TIME_SWEEP_SLOTS = 3
+    config.DEPARTURE_TIME_SWEEP_INTERVAL = 6
+
+    sweep = DepartureSweep(config, boat=basic_test_func.create_dummy_Direct_Power_Ship('simpleship'),
+                           constraints_list=basic_test_func.generate_dummy_constraint_list())
+    assert sweep.departure_times == [datetime(2023, 11, 11, 11), datetime(2023, 11, 11, 17),
+                                     datetime(2023, 11, 11, 23)]
+
+
+'''
+    test whether the departure-time sweep routes all departure times (with per-step figures requested but disabled for
+    the sweep) and writes the table of fuel consumption vs. departure time
+'''
+
+
+def test_departure_sweep_execute(tmp_path, monkeypatch):
+    figure_path = os.path.join(tmp_path, 'figures')
+    os.makedirs(figure_path)
+    monkeypatch.setenv('WRT_FIGURE_PATH', figure_path)
+    config = basic_test_func.create_dummy_routing_config(tmp_path)
+    config.ISOCHRONE_COARSE_TO_FINE = True
+    config.DEPARTURE_TIME_SWEEP_SLOTS = 2
+    config.DEPARTURE_TIME_SWEEP_INTERVAL = 3
+
+    sweep = DepartureSweep(config, boat=basic_test_func.create_dummy_Direct_Power_Ship('simpleship'))
+    summary, routes = sweep.execute_sweep()
+
+    assert len(routes) == 2
+    summary_file = pd.read_csv(os.path.join(tmp_path, 'departure_sweep.csv'))
+    assert summary_file['departure_time'].tolist() == ['2023-07-20T10:00Z', '2023-07-20T13:00Z']
+    assert summary_file['reached_destination'].all()
+    assert (summary_file['fuel_kg'] > 0).all()
+    assert len(os.listdir(os.path.join(tmp_path, 'departure_sweep'))) == 2
+    assert os.listdir(figure_path) == []
+
+
+'''
+    test whether the list of routes for batch routing is read from CSV and JSON files and whether names are assigned
+    to unnamed routes
+'''
+
+
+def test_batch_routing_read_routes(tmp_path):
+    csv_file = os.path.join(tmp_path, 'routes.csv')
+    with open(csv_file, 'w') as file:
+        file.write('name,lat_start,lon_start,lat_end,lon_end\nkiel_oslo,54.3,10.1,59.9,10.7\n')
+    routes = BatchRouting.read_routes(csv_file)
+    assert routes['name'].tolist() == ['kiel_oslo']
+    assert routes[['lat_start', 'lon_start', 'lat_end', 'lon_end']].to_numpy().tolist() == [[54.3, 10.1, 59.9, 10.7]]
+
+    json_file = os.path.join(tmp_path, 'routes.json')
+    with open(json_file, 'w') as file:
+        json.dump([{'lat_start': 54.3, 'lon_start': 10.1, 'lat_end': 59.9, 'lon_end': 10.7},
+                   {'lat_start': 55.0, 'lon_start': 11.0, 'lat_end': 57.0, 'lon_end': 11.5}], file)
+    routes = BatchRouting.read_routes(json_file)
+    assert routes['name'].tolist() == ['route_0', 'route_1']
+    assert routes['lat_end'].tolist() == [59.9, 57.0]
+
+
+'''
+    test whether the batch routing routes several origin-destination pairs one after another with the shared
+    environment and writes the summary of all routes
+'''
+
+
+def test_batch_routing_execute(tmp_path, monkeypatch):
+    figure_path = os.path.join(tmp_path, 'figures')
+    os.makedirs(figure_path)
+    monkeypatch.setenv('WRT_FIGURE_PATH', figure_path)
+    config = basic_test_func.create_dummy_routing_config(tmp_path)
+    config.ISOCHRONE_COARSE_TO_FINE = True
+    routes_file = os.path.join(tmp_path, 'routes.csv')
+    with open(routes_file, 'w') as file:
+        file.write('name,lat_start,lon_start,lat_end,lon_end\nnorth,54.7,13.6,55.5,14.4\neast,54.7,13.6,54.9,15.5\n')
+
+    BatchRouting(config, routes_file).execute_batch()
+
+    summary = pd.read_csv(os.path.join(tmp_path, 'batch_summary.csv'))
+    assert summary['name'].tolist() == ['north', 'east']
+    assert (summary['status'] == 'ok').all()
+    assert summary['reached_destination'].all()
+    assert sorted(os.listdir(os.path.join(tmp_path, 'batch'))) == ['east.json', 'north.json']
+    assert os.listdir(figure_path) == []
+
+
+'''
+    test whether the batch routing routes several origin-destination pairs in forked worker processes if the boat and
+    the StatusCodeError constraint exchange data via the courses netCDF, which needs to be separate for every worker
+'''
+
+
+def test_batch_routing_execute_forked(tmp_path, monkeypatch):
+    config = basic_test_func.create_dummy_routing_config(tmp_path)
+    courses_path = os.path.join(tmp_path, 'CoursesRoute.nc')
+    config.COURSES_FILE = courses_path
+    config.CONSTRAINTS_LIST = config.CONSTRAINTS_LIST + ['status_error']
+    monkeypatch.setattr(ShipFactory, 'get_ship', lambda config: basic_test_func.create_dummy_courses_file_boat(
+        courses_path))
+    routes_file = os.path.join(tmp_path, 'routes.csv')
+    with open(routes_file, 'w') as file:
+        file.write('name,lat_start,lon_start,lat_end,lon_end\nnorth,54.7,13.6,55.5,14.4\neast,54.7,13.6,54.9,15.5\n')
+
+    batch_routing = BatchRouting(config, routes_file, processes=2)
+    assert batch_routing.processes == 2
+    batch_routing.execute_batch()
+
+    summary = pd.read_csv(os.path.join(tmp_path, 'batch_summary.csv'))
+    assert summary['name'].tolist() == ['north', 'east']
+    assert (summary['status'] == 'ok').all()
+    assert summary['reached_destination'].all()
+    assert sorted(os.listdir(os.path.join(tmp_path, 'batch'))) == ['east.json', 'north.json']
+    assert not any(file.startswith('CoursesRoute') for file in os.listdir(tmp_path))
@@ -0,0 +1,135 @@
+import json
+import os
+import threading
+from http.client import HTTPConnection
+
+import tests.basic_test_func as basic_test_func
+from WeatherRoutingTool.config import Config
+from WeatherRoutingTool.service import RoutingService
+
+
+def create_dummy_service():
+    dirname = os.path.dirname(__file__)
+    config = Config(file_name=os.path.join(dirname, 'config.tests.json'))
+    boat = basic_test_func.create_dummy_Direct_Power_Ship('simpleship')
+    constraints_list = basic_test_func.generate_dummy_constraint_list()
+    return RoutingService(config, wt=object(), boat=boat, constraints_list=constraints_list)
+
+
+def request(server, method, path, body=None, timeout=10):
+    connection = HTTPConnection('127.0.0.1', server.server_address[1], timeout=timeout)
+    connection.request(method, path, body=json.dumps(body) if body is not None else None)
+    response = connection.getresponse()
+    content = json.loads(response.read())
+    connection.close()
+    return response.status, content
+
+
+'''
+    test whether the service can be driven via HTTP and rejects job specifications with unknown config variables or
+    variables that are fixed by the loaded environment
+'''
+
+
+def test_service_http_requests():
+    service = create_dummy_service()
+    server = service.make_server(port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    try:
+        status, content = request(server, 'GET', '/status')
+        assert status == 200
+        assert content == {'weather_path': service.config.WEATHER_DATA, 'running_jobs': 0, 'finished_jobs': 0}
+
+        status, content = request(server, 'POST', '/route', {'NOT_A_CONFIG_VARIABLE': 1})
+        assert status == 400
+        assert 'NOT_A_CONFIG_VARIABLE' in content['error']
+
+        status, content = request(server, 'POST', '/route', {'DEPTH_DATA': '/tmp/depth.nc'})
+        assert status == 400
+        assert 'DEPTH_DATA' in content['error']
+
+        status, content = request(server, 'POST', '/route', {'TIME_FORECAST': 12})
+        assert status == 400
+        assert 'TIME_FORECAST' in content['error']
+
+        status, content = request(server, 'GET', '/unknown')
+        assert status == 404
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+'''
+    test whether replacing the forecast keeps the environment of running jobs and updates the boat of subsequent jobs
+'''
+
+
+def test_service_update_forecast():
+    service = create_dummy_service()
+    old_environment = service.environment
+    weather_path = os.path.join(os.path.dirname(__file__), 'data/reduced_testdata_weather.nc')
+
+    service.update_forecast(weather_path)
+    assert service.environment['weather_path'] == weather_path
+    assert service.environment['boat'].weather_path == weather_path
+    assert service.environment['boat'] is not old_environment['boat']
+    assert old_environment['weather_path'] == service.config.WEATHER_DATA
+    assert service.environment['constraints_list'] is old_environment['constraints_list']
+
+    job_config = service.get_job_config({'DEFAULT_ROUTE': [54.0, 10.0, 55.0, 11.0]})
+    assert job_config.DEFAULT_ROUTE == [54.0, 10.0, 55.0, 11.0]
+    assert service.config.DEFAULT_ROUTE == [30, 45, 0, 20]
+
+
+'''
+    test whether the service calculates routes for concurrent jobs on the reduced test data and rejects jobs with a
+    departure time outside of the loaded forecast. The boat and the StatusCodeError constraint exchange data via the
+    courses netCDF which needs to be separate for every job.
+'''
+
+
+def test_service_route_jobs(tmp_path):
+    config = basic_test_func.create_dummy_routing_config(tmp_path)
+    courses_path = os.path.join(tmp_path, 'CoursesRoute.nc')
+    config.COURSES_FILE = courses_path
+    config.CONSTRAINTS_LIST = config.CONSTRAINTS_LIST + ['status_error']
+    service = RoutingService(config, boat=basic_test_func.create_dummy_courses_file_boat(courses_path))
+    server = service.make_server(port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    jobs = [{'DEFAULT_ROUTE': [54.7, 13.6, 55.5, 14.4]},
+            {'DEFAULT_ROUTE': [54.7, 13.6, 54.9, 15.5], 'DEPARTURE_TIME': '2023-07-20T13:00Z'}]
+    responses = [None] * len(jobs)
+
+    def post_job(ijob):
+        responses[ijob] = request(server, 'POST', '/route', jobs[ijob], timeout=300)
+
+    try:
+        job_threads = [threading.Thread(target=post_job, args=(ijob,)) for ijob in range(len(jobs))]
+        for job_thread in job_threads:
+            job_thread.start()
+        for job_thread in job_threads:
+            job_thread.join()
+
+        for job, (status, content) in zip(jobs, responses):
+            assert status == 200
+            assert content['fuel_kg'] > 0
+            coords = content['route']['features'][-1]['geometry']['coordinates']
+            assert coords[1] == job['DEFAULT_ROUTE'][2] and coords[0] == job['DEFAULT_ROUTE'][3]
+        assert sorted(response[1]['job_id'] for response in responses) == [1, 2]
+        assert len(os.listdir(os.path.join(tmp_path, 'service'))) == 2
+        assert not any(file.startswith('CoursesRoute') for file in os.listdir(tmp_path))
+
+        status, content = request(server, 'POST', '/route', {'DEPARTURE_TIME': '2023-07-22T10:00Z'})
+        assert status == 400
+        assert 'DEPARTURE_TIME' in content['error']
+
+        status, content = request(server, 'GET', '/status')
+        assert content['running_jobs'] == 0
+        assert content['finished_jobs'] == 2
+    finally:
+        server.shutdown()
+        server.server_close()
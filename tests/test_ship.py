@@ -692,6 +692,30 @@ def test_get_power_for_direct_power_method(DeltaR, speed, design_power):
     assert 'W' == Ptest.unit
 
 
+'''
+    DIRECT POWER METHOD: check whether the lower bound on the fuel rate is not exceeded for any combination of course
+    and wind speed (up to the maximum wind speed of the weather data) including following winds
+'''
+
+
+def test_fuel_rate_lower_bound_for_direct_power_method():
+    pol = basic_test_func.create_dummy_Direct_Power_Ship('simpleship')
+    pol.load_data()
+    fuel_rate_lower_bound = pol.get_fuel_rate_lower_bound()
+    max_wind_speed = pol.get_max_wind_speed()
+
+    calm_water_fuel_rate = pol.fuel_rate * pol.get_power(0 * u.N)
+    assert fuel_rate_lower_bound < calm_water_fuel_rate
+
+    courses = np.linspace(0, 350, 36) * u.degree
+    for wind_speed in np.linspace(0, 1, 11) * max_wind_speed:
+        u_wind_speed = np.zeros(courses.shape) * u.meter / u.second
+        v_wind_speed = np.full(courses.shape, -wind_speed.value) * u.meter / u.second
+        r_wind = pol.get_wind_resistance(u_wind_speed, v_wind_speed, courses)
+        fuel_rate = pol.fuel_rate * pol.get_power(r_wind['r_wind'])
+        assert np.all(fuel_rate >= fuel_rate_lower_bound)
+
+
 '''
     DIRECT POWER METHOD: check whether relative angle between wind direction and course of the ship is correctly
     calculated from u_wind and v_wind
@@ -4,6 +4,9 @@ from astropy import units as u
 
 import WeatherRoutingTool.utils.unit_conversion as unit
 import pandas as pd
+from geovectorslib import geod
+
+from WeatherRoutingTool.utils.geodesics import GeodesicSolver
 
 
 def test_get_angle_bins_2greater360():
@@ -75,3 +78,59 @@ def test_downsample_dataframe():
 
     assert np.allclose(var_1_test, var_1_returned, 0.00001)
     assert np.allclose(var_2_test, var_2_returned, 0.00001)
+
+
+'''
+    test whether the approximative geodesic methods agree with the exact solution for short legs, whether the
+    deviation of every leg is within the analytic bound and whether the bound and the deviation of the sampled legs
+    are tracked in position_error_bound and sampled_position_error
+'''
+
+
+def test_geodesic_solver_approximations():
+    lats = np.array([54.1, 10.5, -40.2, 0., 78.3, -65.0])
+    lons = np.array([13.3, -60.1, 170.2, 179.9, 15.6, -60.0])
+    brgs = np.array([10., 95., 230., 90., 75., 300.])
+    dists = np.array([20000., 35000., 5000., 30000., 45000., 40000.])
+
+    move_exact = geod.direct(lats, lons, brgs, dists)
+
+    for method, tolerance in [('haversine', 0.006), ('local', 0.0001)]:
+        solver = GeodesicSolver(method, 50000)
+        move = solver.direct(lats, lons, brgs, dists)
+        error = solver.get_local_dist(move['lat2'], move['lon2'], move_exact['lat2'], move_exact['lon2'])
+        error_bound = solver.get_position_error_bound(lats, move_exact['lat2'], dists)
+        assert np.all(error < tolerance * dists)
+        assert np.all(error <= error_bound)
+        assert 0 < solver.sampled_position_error <= solver.position_error_bound
+        assert np.isclose(solver.position_error_bound, np.max(error_bound))
+
+        dist = solver.inverse(lats, lons, move_exact['lat2'], move_exact['lon2'])
+        delta_azi = np.radians(np.abs((dist['azi1'] - brgs + 180) % 360 - 180))
+        assert np.allclose(dist['s12'], dists, tolerance)
+        assert np.all(np.abs(dist['s12'] - dists) <= error_bound)
+        assert np.all(dists * delta_azi <= error_bound)
+        assert solver.n_approx == 12
+
+
+'''
+    test whether legs in the vicinity of exact points and long legs for method 'local' are computed exactly
+'''
+
+
+def test_geodesic_solver_exact_near_waypoints():
+    solver = GeodesicSolver('local', 50000)
+    solver.set_exact_points([54.5], [13.5])
+
+    lats = np.array([54.4, 30., 30.])
+    lons = np.array([13.5, 20., 20.])
+    brgs = np.array([0., 0., 45.])
+    dists = np.array([1000., 1000., 100000.])
+
+    move = solver.direct(lats, lons, brgs, dists)
+    move_exact = geod.direct(lats, lons, brgs, dists)
+
+    assert solver.n_exact == 2
+    assert solver.n_approx == 1
+    assert move['lat2'][0] == move_exact['lat2'][0]
+    assert move['lat2'][2] == move_exact['lat2'][2]